@@ -1,453 +1,2647 @@
-import time
-import numpy as np
 import os
-import warnings
-import string
 import re
+import linecache
+import time
+import json
+import itertools
+import heapq
+import bisect
+import sys
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+
+# register numbers of the CPU variables
+REGISTER_FILE = {
+    "$0": 0b00000,
+    "$zero": 0b00000,
+    "$at": 0b00001,
+    "$v0": 0b00010,
+    "$v1": 0b00011,
+    "$a0": 0b00100,
+    "$a1": 0b00101,
+    "$a2": 0b00110,
+    "$a3": 0b00111,
+    "$t0": 0b01000,
+    "$t1": 0b01001,
+    "$t2": 0b01010,
+    "$t3": 0b01011,
+    "$t4": 0b01100,
+    "$t5": 0b01101,
+    "$t6": 0b01110,
+    "$t7": 0b01111,
+    "$s0": 0b10000,
+    "$s1": 0b10001,
+    "$s2": 0b10010,
+    "$s3": 0b10011,
+    "$s4": 0b10100,
+    "$s5": 0b10101,
+    "$s6": 0b10110,
+    "$s7": 0b10111,
+    "$t8": 0b11000,
+    "$t9": 0b11001,
+    "$k0": 0b11010,
+    "$k1": 0b11011,
+    "$gp": 0b11100,
+    "$sp": 0b11101,
+    "$fp": 0b11110,
+    "$ra": 0b11111
+}
+
+# Instruction descriptors of the supported MIPS instructions. Each mnemonic keeps its
+# opcode, the fixed rt selector of REGIMM branches, the funct code and the field that
+# every source operand is placed into.
+INSTRUCTION_FORMATS = {
+    # mnemonic: (opcode, rt, funct, operands)
+    "add": (0b000000, 0b00000, 0b100000, ("rd", "rs", "rt")),
+    "addi": (0b001000, 0b00000, 0b000000, ("rt", "rs", "imm")),
+    "addiu": (0b001001, 0b00000, 0b000000, ("rt", "rs", "imm")),
+    "addu": (0b000000, 0b00000, 0b100001, ("rd", "rs", "rt")),
+    "and": (0b000000, 0b00000, 0b100100, ("rd", "rs", "rt")),
+    "andi": (0b001100, 0b00000, 0b000000, ("rt", "rs", "imm")),
+    "beq": (0b000100, 0b00000, 0b000000, ("rs", "rt", "label")),
+    "bgez": (0b000001, 0b00001, 0b000000, ("rs", "label")),
+    "bgezal": (0b000001, 0b10001, 0b000000, ("rs", "label")),
+    "bgtz": (0b000111, 0b00000, 0b000000, ("rs", "label")),
+    "blez": (0b000110, 0b00000, 0b000000, ("rs", "label")),
+    "bltz": (0b000001, 0b00000, 0b000000, ("rs", "label")),
+    "bltzal": (0b000001, 0b10000, 0b000000, ("rs", "label")),
+    "bne": (0b000101, 0b00000, 0b000000, ("rs", "rt", "label")),
+    "div": (0b000000, 0b00000, 0b011010, ("rs", "rt")),
+    "divu": (0b000000, 0b00000, 0b011011, ("rs", "rt")),
+    "j": (0b000010, 0b00000, 0b000000, ("target",)),
+    "jal": (0b000011, 0b00000, 0b000000, ("target",)),
+    "jr": (0b000000, 0b00000, 0b001000, ("rs",)),
+    "lb": (0b100000, 0b00000, 0b000000, ("rt", "offset")),
+    "lui": (0b001111, 0b00000, 0b000000, ("rt", "imm")),
+    "lw": (0b100011, 0b00000, 0b000000, ("rt", "offset")),
+    "mfhi": (0b000000, 0b00000, 0b010000, ("rd",)),
+    "mflo": (0b000000, 0b00000, 0b010010, ("rd",)),
+    "mult": (0b000000, 0b00000, 0b011000, ("rs", "rt")),
+    "multu": (0b000000, 0b00000, 0b011001, ("rs", "rt")),
+    "noop": (0b000000, 0b00000, 0b000000, ()),
+    "nor": (0b000000, 0b00000, 0b100111, ("rd", "rs", "rt")),
+    "or": (0b000000, 0b00000, 0b100101, ("rd", "rs", "rt")),
+    "ori": (0b001101, 0b00000, 0b000000, ("rt", "rs", "imm")),
+    "sb": (0b101000, 0b00000, 0b000000, ("rt", "offset")),
+    "sll": (0b000000, 0b00000, 0b000000, ("rd", "rt", "shamt")),
+    "sllv": (0b000000, 0b00000, 0b000100, ("rd", "rt", "rs")),
+    "slt": (0b000000, 0b00000, 0b101010, ("rd", "rs", "rt")),
+    "slti": (0b001010, 0b00000, 0b000000, ("rt", "rs", "imm")),
+    "sltiu": (0b001011, 0b00000, 0b000000, ("rt", "rs", "imm")),
+    "sltu": (0b000000, 0b00000, 0b101011, ("rd", "rs", "rt")),
+    "sra": (0b000000, 0b00000, 0b000011, ("rd", "rt", "shamt")),
+    "srlv": (0b000000, 0b00000, 0b000110, ("rd", "rt", "rs")),
+    "sub": (0b000000, 0b00000, 0b100010, ("rd", "rs", "rt")),
+    "subu": (0b000000, 0b00000, 0b100011, ("rd", "rs", "rt")),
+    "sw": (0b101011, 0b00000, 0b000000, ("rt", "offset")),
+    "syscall": (0b000000, 0b00000, 0b001100, ()),
+    "xor": (0b000000, 0b00000, 0b100110, ("rd", "rs", "rt")),
+    "xori": (0b001110, 0b00000, 0b000000, ("rt", "rs", "imm")),
+    # forms of lui and ori that take the upper and lower half of a label address for la,
+    # the source can not name them since a mnemonic can not have a percent sign
+    "lui%hi": (0b001111, 0b00000, 0b000000, ("rt", "high")),
+    "ori%lo": (0b001101, 0b00000, 0b000000, ("rt", "rs", "low")),
+    # forms of the branches that take their offset in words as an immediate, the relaxation
+    # of a far branch skips over its jump with the inverted branch
+    "beq%skip": (0b000100, 0b00000, 0b000000, ("rs", "rt", "imm")),
+    "bgez%skip": (0b000001, 0b00001, 0b000000, ("rs", "imm")),
+    "bgtz%skip": (0b000111, 0b00000, 0b000000, ("rs", "imm")),
+    "blez%skip": (0b000110, 0b00000, 0b000000, ("rs", "imm")),
+    "bltz%skip": (0b000001, 0b00000, 0b000000, ("rs", "imm")),
+    "bne%skip": (0b000101, 0b00000, 0b000000, ("rs", "rt", "imm"))
+}
+
+# branch that is taken exactly when the given branch is not, the branches that link can not
+# be relaxed since the inverted branch would not link
+INVERTED_BRANCHES = {"beq": "bne", "bne": "beq", "bgez": "bltz", "bltz": "bgez", "bgtz": "blez", "blez": "bgtz"}
+
+# operand fields whose values are symbols instead of numbers and their types of convertLabel
+SYMBOL_FIELDS = {"label": "I", "target": "J", "high": "H", "low": "L"}
+
+# conditions of the immediates for choosing the expansion of a pseudo instruction
+IMMEDIATE_CONDITIONS = {
+    "signed16": lambda value: -0x8000 <= value < 0x8000,
+    "unsigned16": lambda value: 0 <= value <= 0xFFFF,
+    "upper16": lambda value: value & 0xFFFF == 0
+}
+
+# Pseudo instructions and their expansions. The first expansion whose condition holds for
+# the last operand is used, so the shortest one comes first. In the templates, integers
+# are the indexes of the operands, ("hi", index) and ("lo", index) are the upper and lower
+# half of an operand, and the names starting with "$" are registers.
+PSEUDO_INSTRUCTIONS = {
+    # mnemonic: (operand kinds, [(condition, templates)])
+    "move": (("register", "register"), [(None, [("addu", 0, "$zero", 1)])]),
+    "nop": ((), [(None, [("noop",)])]),
+    "not": (("register", "register"), [(None, [("nor", 0, 1, "$zero")])]),
+    "neg": (("register", "register"), [(None, [("sub", 0, "$zero", 1)])]),
+    "negu": (("register", "register"), [(None, [("subu", 0, "$zero", 1)])]),
+    "li": (("register", "immediate"), [
+        ("signed16", [("addiu", 0, "$zero", 1)]),
+        ("unsigned16", [("ori", 0, "$zero", 1)]),
+        ("upper16", [("lui", 0, ("hi", 1))]),
+        (None, [("lui", 0, ("hi", 1)), ("ori", 0, 0, ("lo", 1))])
+    ]),
+    "la": (("register", "symbol"), [(None, [("lui%hi", 0, 1), ("ori%lo", 0, 0, 1)])]),
+    "blt": (("register", "register", "symbol"), [(None, [("slt", "$at", 0, 1), ("bne", "$at", "$zero", 2)])]),
+    "bgt": (("register", "register", "symbol"), [(None, [("slt", "$at", 1, 0), ("bne", "$at", "$zero", 2)])]),
+    "ble": (("register", "register", "symbol"), [(None, [("slt", "$at", 1, 0), ("beq", "$at", "$zero", 2)])]),
+    "bge": (("register", "register", "symbol"), [(None, [("slt", "$at", 0, 1), ("beq", "$at", "$zero", 2)])])
+}
+
+# instructions whose immediate is loaded into $at and used by their register form if it
+# does not fit into the 16 bit field
+PSEUDO_INSTRUCTIONS.update({
+    mnemonic: (("register", "register", "immediate"), [
+        (condition, [(mnemonic, 0, 1, 2)]),
+        (None, [("lui", "$at", ("hi", 2)), ("ori", "$at", "$at", ("lo", 2)), (registerForm, 0, 1, "$at")])
+    ])
+    for mnemonic, registerForm, condition in [
+        ("addi", "add", "signed16"), ("addiu", "addu", "signed16"), ("slti", "slt", "signed16"),
+        ("sltiu", "sltu", "signed16"), ("andi", "and", "unsigned16"), ("ori", "or", "unsigned16"),
+        ("xori", "xor", "unsigned16")
+    ]
+})
+
+# fixed bits of each instruction word and its operand fields, built once at import time
+INSTRUCTION_SET = {
+    mnemonic: (opcode << 26 | rt << 16 | funct, operands)
+    for mnemonic, (opcode, rt, funct, operands) in INSTRUCTION_FORMATS.items()
+}
+
+# mnemonics in the order of their numbers in the program columns
+MNEMONICS = list(INSTRUCTION_SET)
+MNEMONIC_NUMBERS = {mnemonic: number for number, mnemonic in enumerate(MNEMONICS)}
+
+# mnemonic number of the lines that are not valid instructions
+INVALID_MNEMONIC = 0xFFFF
+
+# fixed bits of each numbered instruction and the field of each of its operand columns,
+# an offset operand takes two columns as its displacement and base register
+INSTRUCTION_PLANS = [
+    (word, tuple(itertools.chain.from_iterable(("imm", "rs") if field == "offset" else (field,)
+                                               for field in operands)))
+    for word, operands in INSTRUCTION_SET.values()
+]
+
+# bit positions of the register fields in the instruction word
+FIELD_SHIFTS = {"rs": 21, "rt": 16, "rd": 11}
+
+# numbers of the operand fields for the vectorized encoder, zero is an unused column
+FIELD_NUMBERS = {"rs": 1, "rt": 2, "rd": 3, "shamt": 4, "imm": 5, "label": 6, "target": 7, "high": 8, "low": 9}
+
+# value mask and bit position of each numbered field, symbol fields are resolved separately
+FIELD_MASKS = [0, 0x1F, 0x1F, 0x1F, 0x1F, 0xFFFF, 0, 0, 0, 0]
+FIELD_POSITIONS = [0, 21, 16, 11, 6, 0, 0, 0, 0, 0]
+
+# field number of each operand column of each numbered instruction
+COLUMN_FIELDS = [
+    [FIELD_NUMBERS[fields[column]] if column < len(fields) else 0 for _, fields in INSTRUCTION_PLANS]
+    for column in range(3)
+]
+
+# instructions whose only effect is writing their first operand register
+REGISTER_WRITERS = {
+    "add", "addi", "addiu", "addu", "and", "andi", "lb", "lui", "lw", "mfhi", "mflo", "nor", "or",
+    "ori", "sll", "sllv", "slt", "slti", "sltiu", "sltu", "sra", "srlv", "sub", "subu", "xor", "xori",
+    "lui%hi", "ori%lo"
+}
+
+# registers that are written or read by the instructions without naming them, 32 and 33
+# stand for HI and LO
+FIXED_WRITES = {"mult": (32, 33), "multu": (32, 33), "div": (32, 33), "divu": (32, 33), "jal": (31,),
+                "bgezal": (31,), "bltzal": (31,)}
+FIXED_READS = {"mfhi": (32,), "mflo": (33,)}
+
+# memory access of the load and store instructions
+MEMORY_ACCESSES = {"lw": "load", "lb": "load", "sw": "store", "sb": "store"}
+
+# cycles until the result of an instruction can be used by the next one on a five stage
+# pipeline with forwarding, a load takes a stall cycle and HI and LO wait for the multiplier
+RESULT_LATENCIES = {"lw": 2, "lb": 2, "mult": 5, "multu": 5, "div": 35, "divu": 35}
+
+
+def dependencePlan(mnemonic, fields):
+    '''
+    dependencePlan function returns how the given instruction depends on the others for the
+    scheduler as (written columns, read columns, fixed written registers, fixed read registers,
+    memory access, result latency, kind). The kind is "control" for branches and jumps,
+    "barrier" for the instructions that nothing is moved across and "normal" for the rest
+
+    Returns Tuple
+    '''
+
+    registerColumns = tuple(column for column, field in enumerate(fields) if field in FIELD_SHIFTS)
+    writtenColumns = registerColumns[:1] if mnemonic in REGISTER_WRITERS else ()
+    readColumns = registerColumns[len(writtenColumns):]
+
+    if mnemonic == "syscall":
+        kind = "barrier"
+    elif mnemonic == "jr" or mnemonic.endswith("%skip") or "label" in fields or "target" in fields:
+        kind = "control"
+    else:
+        kind = "normal"
+
+    return (writtenColumns, readColumns, FIXED_WRITES.get(mnemonic, ()), FIXED_READS.get(mnemonic, ()),
+            MEMORY_ACCESSES.get(mnemonic), RESULT_LATENCIES.get(mnemonic, 1), kind)
+
+
+# dependence plan of each numbered instruction
+DEPENDENCE_PLANS = [dependencePlan(mnemonic, fields) for mnemonic, (_, fields) in zip(MNEMONICS, INSTRUCTION_PLANS)]
+
+
+def decodeKey(word):
+    '''
+    decodeKey function returns the key of the given instruction word in the decode table,
+    which is made of the opcode and the funct code or the rt selector of REGIMM branches
+
+    Returns Tuple
+    '''
+
+    opcode = word >> 26
+    if opcode == 0:
+        return 0, word & 0x3F
+    elif opcode == 1:
+        return 1, word >> 16 & 0x1F
+    return opcode, 0
+
+
+# mnemonic number of each instruction word key, built from the instruction set. The
+# internal forms of la and noop decode as their real instructions
+DECODE_TABLE = {
+    decodeKey(word): MNEMONIC_NUMBERS[mnemonic]
+    for mnemonic, (word, _) in INSTRUCTION_SET.items()
+    if "%" not in mnemonic and mnemonic != "noop"
+}
+
+def sourceLocation(sourceMap, address):
+    '''
+    sourceLocation function returns the file and the line of the given address in a source
+    map that is read from the JSON of formatSourceMap, or None if it has no line there. An
+    address in the data section gives the last data line at or before it
+
+    Returns Tuple or None
+    '''
+
+    index, remainder = divmod(address - int(sourceMap["origin"], 16), 4)
+    if not remainder and 0 <= index < len(sourceMap["lines"]):
+        return sourceMap["files"][sourceMap["fileIndexes"][index]], sourceMap["lines"][index]
+
+    position = bisect.bisect_right(sourceMap["data"], [address, float("inf")])
+    if not position:
+        return None
+    _, fileIndex, line = sourceMap["data"][position - 1]
+    return sourceMap["files"][fileIndex], line
+
+
+# largest gap in bytes between the text and the data section that is filled with zeros in
+# the memory image, a data section further away is a section of its own
+MAX_SECTION_GAP = 1 << 16
+
+# end of the 32 bit address space, no section may reach past it
+ADDRESS_SPACE = 1 << 32
+
+# execute formats that have no addresses, so they can only hold a single memory image
+SINGLE_IMAGE_FORMATS = {"text", "bin", "logisim"}
+
+# token pattern of the source lines, the name of each alternative is the kind of the token
+TOKEN_PATTERN = re.compile(r'''
+    \s*(?:
+        (?P<comment>[#;].*)
+      | (?P<string>"(?:[^"\\]|\\.)*")
+      | (?P<label>[a-z_.][\w.]*)\s*:
+      | (?P<offset>[-+]?(?:0x[0-9a-f]+|\d+))?\s*\(\s*(?P<base>\$\w+)\s*\)
+      | (?P<register>\$\w+)
+      | (?P<immediate>[-+]?(?:0x[0-9a-f]+|\d+))(?!\w)
+      | (?P<word>[a-z_.][\w.]*)
+      | (?P<comma>,)
+      | (?P<unknown>\S)
+    )''', re.IGNORECASE | re.VERBOSE)
+
+# directives of the preprocessor, the conditional assembly directives and the directives
+# whose operands are not replaced by the .eqv constants
+PREPROCESSOR_DIRECTIVES = (".include", ".macro", ".endm", ".eqv")
+CONDITION_DIRECTIVES = (".if", ".ifdef", ".ifndef", ".else", ".endif")
+LITERAL_DIRECTIVES = (".eqv", ".macro")
+
+# parameter of a macro body such as "\count", and the name and the value of an .eqv line
+MACRO_PARAMETER_PATTERN = re.compile(r'\\(\w+)')
+EQV_PATTERN = re.compile(r'\s*(?:[a-z_.][\w.]*\s*:\s*)?\.eqv\s+([a-z_.][\w.]*)\s*,?(.*?)(?:[#;].*)?$', re.IGNORECASE)
+
+# line number of the first line of the included files, they are numbered after the lines of
+# the source file and mapped back to their files by the assembler
+INCLUDED_LINE_BASE = 1 << 24
+
+# deepest nesting of the macro expansions
+MACRO_DEPTH = 64
+
+# directives that switch between the text and the data section
+SECTION_DIRECTIVES = (".text", ".data")
+
+# size in bytes of each value of the numeric data directives
+DATA_SIZES = {".word": 4, ".half": 2, ".byte": 1}
+
+# directives of the data section
+DATA_DIRECTIVES = (".word", ".half", ".byte", ".ascii", ".asciiz", ".space", ".align", ".org")
+
+# version of the tokens in the token cache files, raised whenever the lexer gives other tokens
+# for a line, and the number of runs appended to a cache file before it is written again
+TOKEN_CACHE_VERSION = 3
+MAX_CACHE_RUNS = 8
+
+# helper functions whose calls are counted while profiling
+PROFILED_HELPERS = ("tokenizeLine", "lexLine", "convertRegister", "convertImmediate", "convertPseudoInstruction",
+                    "encodeLine", "convertLabel")
+
+# file extensions of the target files for each execute format
+OUTPUT_EXTENSIONS = {
+    "text": ".obj",
+    "bin": ".bin",
+    "ihex": ".hex",
+    "verilog": ".mem",
+    "logisim": ".rom"
+}
+
+
+class Register(int):
+    '''
+    Definition: Register object is the number of a register operand. It is encoded like any
+    other integer operand, but it keeps a register apart from an immediate of the same value,
+    so "add $t0, $t1, 5" is not taken as "add $t0, $t1, $a1" \n
+    Usage: Object = Register(8)
+    '''
+
+    __slots__ = ()
+
+
+# register operand of each register name and number, made once so the lexer only looks them up
+REGISTER_TOKENS = {name: Register(number) for name, number in REGISTER_FILE.items()}
+REGISTER_TOKENS.update(("$" + str(number), Register(number)) for number in range(32))
+
+
+def isNumber(value):
+    '''
+    isNumber function checks if the given token is a number and not a register
+
+    Returns Boolean
+    '''
+
+    return isinstance(value, int) and not isinstance(value, Register)
+
+
+def parseAddress(text):
+    '''
+    parseAddress function reads the given hex text as a word aligned address of the 32 bit
+    address space, or returns None if it is not one
+
+    Returns Integer or None
+    '''
+
+    try:
+        address = int(text, 16)
+    except ValueError:
+        return None
+    return address if 0 <= address < ADDRESS_SPACE and not address % 4 else None
+
+
+class Program:
+    '''
+    Definition: Program object keeps the prepared instructions in parallel array columns
+    instead of lists of tokens. Each instruction is a mnemonic number, up to three operand
+    values, its address and its source line number. Label operands keep the number of
+    their symbol \n
+    Usage: Object = Program()
+    '''
+
+    __slots__ = ("mnemonics", "firstOperands", "secondOperands", "thirdOperands",
+                 "addresses", "lineNumbers", "symbols", "symbolNumbers", "invalidTokens")
+
+    def __init__(self):
+
+        self.mnemonics = array('H')
+        self.firstOperands = array('q')
+        self.secondOperands = array('q')
+        self.thirdOperands = array('q')
+        self.addresses = array('I')
+        self.lineNumbers = array('I')
+        self.symbols = []
+        self.symbolNumbers = {}
+        self.invalidTokens = {}
+
+    def __len__(self):
+        return len(self.mnemonics)
+
+    def __getitem__(self, index):
+        '''
+        returns the instruction at the given index as (mnemonic, first, second, third, address)
+        '''
+        return (self.mnemonics[index], self.firstOperands[index], self.secondOperands[index],
+                self.thirdOperands[index], self.addresses[index])
+
+    def __iter__(self):
+        return zip(self.mnemonics, self.firstOperands, self.secondOperands, self.thirdOperands,
+                   self.addresses)
+
+    def symbolNumber(self, name):
+        '''
+        symbolNumber function returns the number of the given symbol, numbering it if it is new
+
+        Returns Integer
+        '''
+
+        number = self.symbolNumbers.get(name)
+        if number is None:
+            number = self.symbolNumbers[name] = len(self.symbols)
+            self.symbols.append(name)
+        return number
+
+    def convertOperands(self, line):
+        '''
+        convertOperands function checks the tokens of the given line against the instruction set
+        and returns its mnemonic number and operand values, or None if it is not an instruction
+
+        Returns Tuple or None
+        '''
+
+        number = MNEMONIC_NUMBERS.get(line[0])
+        if number is None:
+            return None
+
+        fields = INSTRUCTION_PLANS[number][1]
+        values = []
+        for token in line[1:]:
+            if isinstance(token, list):
+                values.extend(token)
+            else:
+                values.append(token)
+        if len(values) != len(fields):
+            return None
+
+        for index, (field, value) in enumerate(zip(fields, values)):
+            if field in SYMBOL_FIELDS:
+                if not isinstance(value, str):
+                    return None
+                values[index] = self.symbolNumber(value)
+            elif not isinstance(value, int) or not -0x80000000 <= value <= 0xFFFFFFFF:
+                return None
+            elif isinstance(value, Register) != (field in FIELD_SHIFTS):
+                return None
+            elif field in FIELD_SHIFTS or field == 'shamt':
+                if not 0 <= value < 32:
+                    return None
+            elif field == 'imm' and not -0x8000 <= value <= 0xFFFF:
+                return None
+
+        return number, values
+
+    def append(self, line, address, lineNumber):
+        '''
+        append function appends the given line of tokens to the columns. A line that is not an
+        instruction is kept as its tokens and encoded as an error
+
+        Returns None
+        '''
+
+        converted = self.convertOperands(line)
+        if converted is None:
+            self.invalidTokens[len(self.mnemonics)] = line
+            number, values = INVALID_MNEMONIC, []
+        else:
+            number, values = converted
+        values.extend([0] * (3 - len(values)))
+
+        self.mnemonics.append(number)
+        self.firstOperands.append(values[0])
+        self.secondOperands.append(values[1])
+        self.thirdOperands.append(values[2])
+        self.addresses.append(address)
+        self.lineNumbers.append(lineNumber)
+        return None
+
+    def tokens(self, index):
+        '''
+        tokens function returns the instruction at the given index as a line of tokens
+
+        Returns Line(List)
+        '''
+
+        if index in self.invalidTokens:
+            return self.invalidTokens[index]
+
+        number = self.mnemonics[index]
+        fields = INSTRUCTION_PLANS[number][1]
+        values = (self.firstOperands[index], self.secondOperands[index], self.thirdOperands[index])
+        return [MNEMONICS[number]] + [self.symbols[value] if field in SYMBOL_FIELDS else
+                                      Register(value) if field in FIELD_SHIFTS else value
+                                      for field, value in zip(fields, values)]
+
+    def reorder(self, order, address):
+        '''
+        reorder function keeps the instructions of the given indexes in their given order and
+        gives them consecutive addresses from the given address
+
+        Returns None
+        '''
+
+        for name in ("mnemonics", "firstOperands", "secondOperands", "thirdOperands", "lineNumbers"):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, [column[index] for index in order]))
+        self.addresses = array('I', range(address, address + 4 * len(order), 4))
+
+        positions = {index: position for position, index in enumerate(order)}
+        self.invalidTokens = {positions[index]: tokens for index, tokens in self.invalidTokens.items()
+                              if index in positions}
+        return None
+
+    def clear(self):
+        '''
+        clear function removes all instructions while keeping the numbered symbols
+
+        Returns None
+        '''
+
+        for column in (self.mnemonics, self.firstOperands, self.secondOperands, self.thirdOperands,
+                       self.addresses, self.lineNumbers):
+            del column[:]
+        self.invalidTokens = {}
+        return None
+
+
+class Diagnostic:
+    '''
+    Definition: Diagnostic object keeps an error or a warning with its location in the source,
+    the line and the column start from one and are None if they are not known \n
+    Usage: Object = Diagnostic("error", "undefined label 'loop'", "code.src", 12, 9)
+    '''
+
+    __slots__ = ("severity", "message", "file", "line", "column")
+
+    def __init__(self, severity, message, file=None, line=None, column=None):
+
+        self.severity = severity
+        self.message = message
+        self.file = file
+        self.line = line
+        self.column = column
+
+    def __str__(self):
+        if self.line is None:
+            location = self.file
+        else:
+            location = ":".join(str(part) for part in (self.file or "<input>", self.line, self.column)
+                                if part is not None)
+        return "{}: {}: {}".format(location, self.severity, self.message) if location else \
+            "{}: {}".format(self.severity, self.message)
+
+    def __repr__(self):
+        return "Diagnostic({!r}, {!r}, {!r}, {!r}, {!r})".format(
+            self.severity, self.message, self.file, self.line, self.column)
+
+
+class Preprocessor:
+    '''
+    Definition: Preprocessor object expands the .include, .macro/.endm, .eqv and conditional
+    assembly directives of the source lines before their labels are taken. The lines of the
+    included files and the expanded macro bodies are kept in LRU caches shared by every
+    preprocessor of the process, keyed by the path, modification time and size of the file
+    and by the macro and its arguments \n
+    Usage: Object = Preprocessor(assembler)
+    '''
+
+    includeCache = OrderedDict()
+    includeCacheSize = 256
+    expansionCache = OrderedDict()
+    expansionCacheSize = 4096
+    cacheHits = 0
+    cacheMisses = 0
+
+    def __init__(self, assembler, diagnose=True):
+
+        self.assembler = assembler
+        self.diagnose = diagnose
+        self.macros = {}
+        self.definition = None
+        self.constants = {}
+        self.constantPattern = None
+        self.conditions = []
+        self.active = True
+        self.includeStack = []
+        self.expansions = 0
+        self.depth = 0
+
+    def report(self, message, lineNumber, token=0):
+        '''
+        report function reports an error of a preprocessor directive to the assembler unless
+        the diagnostics are turned off for this pass
+
+        Returns None
+        '''
+
+        if self.diagnose:
+            self.assembler.report("error", message, lineNumber, token)
+        return None
+
+    def readInclude(self, path):
+        '''
+        readInclude function returns the (line number, text, tokens) items of the non-empty
+        lines of the given file, reusing the cached items while the file has not changed
+
+        Returns Tuple
+        '''
+
+        status = os.stat(path)
+        key = (path, status.st_mtime_ns, status.st_size)
+        self.assembler.includedFiles[path] = key[1:]
+
+        items = self.includeCache.get(key)
+        if items is not None:
+            Preprocessor.cacheHits += 1
+            self.includeCache.move_to_end(key)
+            return items
+
+        Preprocessor.cacheMisses += 1
+        tokenizeLine = self.assembler.tokenizeLine
+        with open(path, 'r') as file:
+            items = tuple((lineNumber, text.rstrip("\n"), tokens) for lineNumber, text in enumerate(file, 1)
+                          for tokens in (tokenizeLine(text),) if tokens)
+
+        self.includeCache[key] = items
+        if len(self.includeCache) > self.includeCacheSize:
+            self.includeCache.popitem(last=False)
+        return items
+
+    def expandMacro(self, macro, arguments):
+        '''
+        expandMacro function returns the (text, tokens) lines of the body of the given macro
+        with its parameters replaced by the given arguments. The lines using "\\@", the number
+        of the expansion, are left to be tokenized for each expansion
+
+        Returns Tuple
+        '''
+
+        key = (macro, arguments)
+        lines = self.expansionCache.get(key)
+        if lines is not None:
+            Preprocessor.cacheHits += 1
+            self.expansionCache.move_to_end(key)
+            return lines
+
+        Preprocessor.cacheMisses += 1
+        _, parameters, body = macro
+        values = dict(zip(parameters, arguments))
+
+        def substitute(match):
+            return values.get(match.group(1).lower(), match.group())
+
+        lines = []
+        for text in body:
+            text = MACRO_PARAMETER_PATTERN.sub(substitute, text)
+            lines.append((text, None if "\\@" in text else self.assembler.tokenizeLine(text)))
+        lines = tuple(lines)
+
+        self.expansionCache[key] = lines
+        if len(self.expansionCache) > self.expansionCacheSize:
+            self.expansionCache.popitem(last=False)
+        return lines
+
+    def splitArguments(self, text):
+        '''
+        splitArguments function returns the comma separated argument texts that follow the
+        macro name of the given line
+
+        Returns Tuple
+        '''
+
+        arguments = []
+        start = end = None
+        nameSeen = False
+        for match in TOKEN_PATTERN.finditer(text):
+            kind = match.lastgroup
+            if kind == 'comment':
+                break
+            elif not nameSeen:
+                nameSeen = kind == 'word'
+            elif kind == 'comma':
+                arguments.append(text[start:end] if start is not None else "")
+                start = end = None
+            else:
+                if start is None:
+                    start = match.end() - len(match.group().lstrip())
+                end = match.end()
+
+        if start is not None or arguments:
+            arguments.append(text[start:end] if start is not None else "")
+        return tuple(arguments)
+
+    def defineConstant(self, text, tokens, lineNumber):
+        '''
+        defineConstant function takes the name and the value text of an .eqv line, the value
+        may use the constants defined before
+
+        Returns None
+        '''
+
+        match = EQV_PATTERN.match(text)
+        if match is None or len(tokens) < 3:
+            self.report("'.eqv' takes a name and a value", lineNumber)
+            return None
+
+        value = match.group(2).strip()
+        if self.constantPattern is not None:
+            value = self.substituteConstants(value)
+        self.constants[match.group(1).lower()] = value
+        names = sorted(self.constants, key=len, reverse=True)
+        self.constantPattern = re.compile(r'(?<![\w$.\\])(?:{})(?![\w.])'.format("|".join(map(re.escape, names))),
+                                          re.IGNORECASE)
+        return None
+
+    def substituteConstants(self, text):
+        '''
+        substituteConstants function replaces the .eqv constants in the given line text by their
+        values, leaving the string literals and the comment of the line as they are
+
+        Returns String
+        '''
+
+        def replace(found):
+            return self.constants[found.group().lower()]
+
+        parts = []
+        position = 0
+        for match in TOKEN_PATTERN.finditer(text):
+            if match.lastgroup in ('string', 'comment'):
+                start = match.start(match.lastgroup)
+                parts.append(self.constantPattern.sub(replace, text[position:start]))
+                parts.append(text[start:match.end()])
+                position = match.end()
+        parts.append(self.constantPattern.sub(replace, text[position:]))
+        return "".join(parts)
+
+    def condition(self, directive, tokens, lineNumber):
+        '''
+        condition function updates the stack of the conditional assembly with the given .if,
+        .ifdef, .ifndef, .else or .endif line
+
+        Returns None
+        '''
+
+        if directive == '.else' or directive == '.endif':
+            if not self.conditions:
+                self.report("'{}' without '.if'".format(directive), lineNumber)
+            elif directive == '.else':
+                active, parentActive, conditionLine = self.conditions[-1]
+                self.conditions[-1] = (parentActive and not active, parentActive, conditionLine)
+            else:
+                self.conditions.pop()
+        else:
+            value = False
+            if directive == '.if' and len(tokens) == 2 and isinstance(tokens[1], str) and tokens[1] in self.constants:
+                tokens = [directive] + self.assembler.tokenizeLine(self.constants[tokens[1]])
+            if self.active:
+                if len(tokens) != 2 or (directive == '.if') != isNumber(tokens[1]):
+                    self.report("'{}' takes {}".format(directive, "a number" if directive == '.if' else "a name"),
+                                lineNumber)
+                elif directive == '.if':
+                    value = tokens[1] != 0
+                else:
+                    value = (tokens[1] in self.constants or tokens[1] in self.macros) == (directive == '.ifdef')
+            self.conditions.append((value, self.active, lineNumber))
+
+        self.active = not self.conditions or self.conditions[-1][0]
+        return None
+
+    def include(self, tokens, lineNumber, path):
+        '''
+        include generator finds the file of an .include line next to the including file or in
+        the include directories and yields its preprocessed lines. The lines of the included
+        file take line numbers of their own that the assembler maps back to the file
+
+        Yields Tuple
+        '''
+
+        if len(tokens) != 2 or not isinstance(tokens[1], bytes):
+            self.report("'.include' takes a quoted file name", lineNumber)
+            return
+
+        name = tokens[1].decode('latin-1')
+        directories = [os.path.dirname(path) if path else os.getcwd()] + list(self.assembler.includeDirectories)
+        candidates = [os.path.abspath(os.path.join(directory, name)) for directory in directories]
+        includePath = next((candidate for candidate in candidates if os.path.isfile(candidate)), None)
+
+        if includePath is None:
+            self.report("include file '{}' can not be found".format(name), lineNumber, 1)
+            return
+        if includePath in self.includeStack:
+            self.report("include file '{}' includes itself".format(name), lineNumber, 1)
+            return
+
+        try:
+            items = self.readInclude(includePath)
+        except OSError as error:
+            self.report("include file '{}' can not be read: {}".format(name, error.strerror), lineNumber, 1)
+            return
+
+        lineLocations = self.assembler.includedLines
+        first = INCLUDED_LINE_BASE + len(lineLocations)
+        for offset, item in enumerate(items):
+            lineLocations[first + offset] = (includePath, item[0])
+
+        self.includeStack.append(includePath)
+        yield from self.process(((first + offset, text, itemTokens)
+                                 for offset, (_, text, itemTokens) in enumerate(items)), includePath)
+        self.includeStack.pop()
+
+    def invoke(self, macro, text, lineNumber, path):
+        '''
+        invoke generator yields the preprocessed lines of the expansion of the given macro with
+        the arguments of the given line, they keep the line number of the line
+
+        Yields Tuple
+        '''
+
+        name, parameters, _ = macro
+        arguments = self.splitArguments(text)
+        if len(arguments) != len(parameters):
+            self.report("macro '{}' takes {} arguments, {} given".format(name, len(parameters), len(arguments)),
+                        lineNumber)
+            return
+        if self.depth >= MACRO_DEPTH:
+            self.report("expansion of macro '{}' is nested too deeply".format(name), lineNumber)
+            return
+
+        self.expansions += 1
+        expansion = str(self.expansions)
+        self.assembler.expandedLines.add(lineNumber)
+
+        lines = self.expandMacro(macro, arguments)
+        self.depth += 1
+        yield from self.process(((lineNumber, text, tokens) if tokens is not None else
+                                 (lineNumber, text.replace("\\@", expansion), None) for text, tokens in lines), path)
+        self.depth -= 1
+
+    def process(self, items, path):
+        '''
+        process generator takes the (line number, text, tokens) items of the file at the given
+        path, the tokens may be None to be tokenized here, and yields the line number and the
+        tokens of each line left after the directives are expanded
+
+        Yields Tuple
+        '''
+
+        tokenizeLine = self.assembler.tokenizeLine
+        for lineNumber, text, tokens in items:
+            if tokens is None:
+                tokens = tokenizeLine(text)
+                if not tokens:
+                    continue
+
+            label = None
+            directive = tokens[0]
+            if type(directive) is str and directive.endswith(":"):
+                label = directive
+                directive = tokens[1] if len(tokens) > 1 else None
+            if type(directive) is not str:
+                directive = None
+
+            if self.definition is not None:
+                if directive == '.endm':
+                    name, parameters, body, _ = self.definition
+                    self.macros[name] = (name, parameters, tuple(body))
+                    self.definition = None
+                elif directive == '.macro':
+                    self.report("macro can not be defined inside '{}'".format(self.definition[0]), lineNumber)
+                else:
+                    self.definition[2].append(text)
+                continue
+
+            if directive in CONDITION_DIRECTIVES:
+                self.condition(directive, tokens if label is None else tokens[1:], lineNumber)
+                continue
+            if not self.active:
+                continue
+
+            if self.constantPattern is not None and directive not in LITERAL_DIRECTIVES and \
+                    self.constantPattern.search(text):
+                text = self.substituteConstants(text)
+                tokens = tokenizeLine(text)
+                directive = tokens[1 if label is not None else 0] if len(tokens) > (label is not None) else None
+                if type(directive) is not str:
+                    directive = None
+
+            if directive not in PREPROCESSOR_DIRECTIVES and directive not in self.macros:
+                yield lineNumber, tokens
+                continue
+
+            if label is not None:
+                yield lineNumber, [label]
+                tokens = tokens[1:]
+
+            if directive == '.include':
+                yield from self.include(tokens, lineNumber, path)
+            elif directive == '.macro':
+                if len(tokens) < 2 or not all(isinstance(token, str) and not token.startswith('$')
+                                              for token in tokens[1:]):
+                    self.report("'.macro' takes a name and the names of its parameters", lineNumber)
+                self.definition = (str(tokens[1]) if len(tokens) > 1 else "", tuple(map(str, tokens[2:])), [],
+                                   lineNumber)
+            elif directive == '.endm':
+                self.report("'.endm' without '.macro'", lineNumber)
+            elif directive == '.eqv':
+                self.defineConstant(text, tokens, lineNumber)
+            else:
+                yield from self.invoke(self.macros[directive], text, lineNumber, path)
+
+    def run(self, items, path):
+        '''
+        run generator preprocesses the items of the source file at the given path and reports
+        the macro definitions and conditions that are not closed at its end
+
+        Yields Tuple
+        '''
+
+        yield from self.process(items, path)
+
+        if self.definition is not None:
+            self.report("macro '{}' is not closed by '.endm'".format(self.definition[0]), self.definition[3])
+        for _, _, lineNumber in self.conditions:
+            self.report("condition is not closed by '.endif'", lineNumber)
+
+
+class Assembler:
+    '''
+    Definition: Assembler object takes a text file that includes MIPS instructions and
+    turn it into machine code and save it as a file
+
+    Usage: Object = Assembler(source=SOURCE_FILE, target=TARGET_FILE)
+    '''
+
+    def __init__(self, **kwargs):
+
+        # defult values of object
+        self.checkPrepare = False
+        self.programMemorySize = None
+        self.programMemoryLocation = 0
+        self.targetDirectory = None
+        self.sourceDirectory = None
+        self.sourceStream = None
+        self.targetStream = None
+        self.programMemoryOrigin = None
+        self.content = None
+        self.symbolTable = {}
+        self.machineWords = None
+        self.invalidLines = set()
+        self.dataLocation = None
+        self.dataSize = 0
+        self.dataLines = []
+        self.dataImage = bytearray()
+        self.dataByteOrder = None
+        self.invalidDataLines = set()
+        self.dataLabels = set()
+        self.dataAlignment = None
+        self.scheduleInstructions = False
+        self.delaySlots = False
+        self.scheduleReport = None
+        self.relaxBranches = True
+        self.relaxedBranches = 0
+        self.diagnostics = []
+        self.includeDirectories = []
+        self.includedFiles = {}
+        self.includedLines = {}
+        self.expandedLines = set()
+        self.externalSymbols = frozenset()
+        self.listingFile = None
+        self.sourceMapFile = None
+        self.symbolFile = None
+        self.previewDetailed = False
+        self.previewLine = "all"
+        self.previewHex = False
+        self.checkSingleLineCommand = False
+        self.checkConvertContent = False
+        self.tokenCache = None
+        self.storedTokens = None
+        self.addedTokens = []
+        self.cacheFileRuns = None
+        self.vectorizedEncoding = False
+        self.cacheHits = 0
+        self.cacheMisses = 0
+        self.profileReport = None
+        self.executeFormatHex = True
+        self.executeFormatLineIndex = False
+        self.executeFormat = "text"
+        self.executeByteOrder = "big"
+        self.streamChunkSize = 4096
+        self.locateColumns = True
+        self.errorMessage = None
+        self.author = "DFA"
+        self.name = "Kompaq"
+        self.version = "1.0"
+        self.description = self.name + " Assembler. Version is " + \
+            self.version + ". It was developed by " + self.author
+
+        for key, value in kwargs.items():
+            if key == 'source':
+                self.sourceDirectory = value
+            elif key == 'target':
+                self.targetDirectory = value
+            elif key == 'origin':
+                self.programMemoryOrigin = value
+
+        self.registerFile = REGISTER_FILE
+
+    def checkFiles(self):
+        '''
+        checkFiles function check if the input and output files are avaible 
+
+        return Boolean
+        '''
+
+        if self.checkSingleLineCommand or self.sourceStream is not None:
+            return True
+        try:
+            file = open(self.sourceDirectory)
+            file.close()
+            return True
+        except (OSError, TypeError) as error:
+            self.report("error", "source file can not be read: " + str(getattr(error, "strerror", error)))
+            return False
+
+    def getISA(self, *line):
+        '''
+        getISA function looks the given line up in the instruction set table and returns it as
+        machine code, or None if it can not be encoded
+
+        return String or None
+        '''
+        word = self.encodeLine(line)
+        return None if word is None else format(word, '032b')
+
+    def encodeLine(self, line):
+        '''
+        encodeLine function assembles the instruction word of the given program line by placing
+        each operand column into its field of the instruction plan. It returns None for the lines
+        that are not instructions and the labels that can not be resolved
+
+        return Integer or None
+        '''
+        if line[0] >= len(INSTRUCTION_PLANS):
+            return None
+        word, fields = INSTRUCTION_PLANS[line[0]]
+        for field, value in zip(fields, line[1:4]):
+            if field in FIELD_SHIFTS:
+                word |= value << FIELD_SHIFTS[field]
+            elif field == 'imm':
+                word |= value & 0xFFFF
+            elif field == 'shamt':
+                word |= (value & 0x1F) << 6
+            elif field in SYMBOL_FIELDS:
+                value = self.convertLabel(line, SYMBOL_FIELDS[field], self.content.symbols[value])
+                if value is None:
+                    return None
+                word |= value
+        return word
+
+    def convertSignedBinary(self, number, width):
+        '''
+        convertSignedBinary function convert the given number into two's complement
+        binary text with the given width, or None if the number does not fit
+
+        return Token(String or None)
+        '''
+
+        if not isinstance(number, int) or not -(1 << width - 1) <= number < 1 << width:
+            return None
+        return format(number & ((1 << width) - 1), '0{}b'.format(width))
+
+    def takeLabels(self, lines):
+        '''
+        takeLabels function takes the labels of the given lines into the symbol table and
+        appends the remaining instructions with their addresses to the program. The lines of
+        the data section are placed at their offsets in the data section, which follows the
+        text section unless ".data ADDRESS" gives its location
+
+        Returns None
+        '''
+
+        address = int(self.programMemoryLocation, 16)
+        program = Program()
+        self.symbolTable = {}
+        self.dataLocation = None
+        self.dataLines = []
+        self.invalidDataLines = set()
+        dataLabels = {}
+        dataOffset = 0
+        dataAlignment = 4
+        section = ".text"
+        overflowed = False
+
+        for lineNumber, line in lines:
+            label = None
+            if str(line[0]).endswith(":"):
+                label = line[0][:-1]
+                line = line[1:]
+
+            if label is not None and (label in self.symbolTable or label in dataLabels):
+                self.report("warning", "label '{}' is redefined, the last definition is used".format(label),
+                            lineNumber, label + ":")
+
+            if line and line[0] in SECTION_DIRECTIVES:
+                section = line[0]
+                if section == ".data" and len(line) == 2 and isNumber(line[1]) and line[1] % 4 == 0 and \
+                        0 <= line[1] < ADDRESS_SPACE:
+                    self.dataLocation = line[1]
+                elif len(line) != 1:
+                    self.invalidDataLines.add(lineNumber)
+                    self.report("error", "'{}' takes only a word aligned address".format(section), lineNumber, 1)
+                line = []
+
+            if section == ".data":
+                placement = self.placeData(line, dataOffset) if line else (dataOffset, dataOffset)
+                if placement is None:
+                    self.invalidDataLines.add(lineNumber)
+                    self.report("error", self.diagnoseData(line), lineNumber, 0)
+                    placement = (dataOffset, dataOffset)
+                elif line and line[0] == '.align':
+                    dataAlignment = max(dataAlignment, 1 << line[1])
+                elif line:
+                    self.dataLines.append((lineNumber, placement[0], line))
+                if label is not None:
+                    dataLabels[label] = placement[0]
+                dataOffset = placement[1]
+                continue
+
+            if label is not None:
+                self.symbolTable[label] = address
+            if line and not overflowed:
+                instructions = self.convertPseudoInstruction(line)
+                # the following lines are still read for their diagnostics but not placed
+                overflowed = not self.checkSectionEnd(".text", address + 4 * len(instructions), lineNumber)
+                if overflowed:
+                    continue
+                for instruction in instructions:
+                    program.append(instruction, address, lineNumber)
+                    address += 4
+
+        self.dataAlignment = None
+        if self.dataLocation is None:
+            self.dataLocation = -(-address // dataAlignment) * dataAlignment
+            self.dataAlignment = dataAlignment
+        elif dataOffset and self.dataLocation < address:
+            self.errorMessage = "Data section at 0x{:08x} overlaps the text section".format(self.dataLocation)
+            self.report("error", self.errorMessage)
+        if dataOffset:
+            self.checkSectionEnd(".data", self.dataLocation + dataOffset)
+
+        for label, offset in dataLabels.items():
+            self.symbolTable[label] = self.dataLocation + offset
+        self.dataLabels = set(dataLabels)
+        self.dataSize = dataOffset
+        self.content = program
+
+        return None
+
+    def placeData(self, line, offset):
+        '''
+        placeData function aligns the given data directive line from the given offset of the
+        data section and returns its offset and the offset following it, or None if the
+        directive is not valid
+
+        Returns Tuple or None
+        '''
+
+        directive, values = line[0], line[1:]
+
+        if directive in DATA_SIZES:
+            size = DATA_SIZES[directive]
+            start = -(-offset // size) * size
+            return (start, start + size * len(values)) if values else None
+
+        if directive == '.ascii' or directive == '.asciiz':
+            if not values or not all(isinstance(value, bytes) for value in values):
+                return None
+            terminators = len(values) if directive == '.asciiz' else 0
+            return offset, offset + sum(len(value) for value in values) + terminators
+
+        if len(values) != 1 or not isNumber(values[0]) or values[0] < 0:
+            return None
+        elif directive == '.space':
+            return offset, offset + values[0]
+        elif directive == '.align' and values[0] < 16:
+            start = -(-offset >> values[0]) << values[0]
+            return start, start
+        elif directive == '.org' and values[0] >= offset:
+            return values[0], values[0]
+        else:
+            return None
+
+    def encodeData(self, image, start, byteOrder):
+        '''
+        encodeData function writes the values of the data section lines in place into the given
+        image from its start offset with the given byte order ("little" or "big"). The labels
+        of the words are replaced by their addresses, the values that can not be written are
+        reported once for each line
+
+        Returns None
+        '''
+
+        for lineNumber, offset, line in self.dataLines:
+            directive, values = line[0], line[1:]
+            offset += start
+            if directive in DATA_SIZES:
+                size = DATA_SIZES[directive]
+                for index, value in enumerate(values, 1):
+                    message = None
+                    if isinstance(value, str) and directive == '.word':
+                        value = self.symbolTable.get(value)
+                        if value is None:
+                            message = "undefined label '{}'".format(values[index - 1])
+                    elif not isNumber(value):
+                        message = "expected a number, found {}".format(self.formatToken(value))
+                    if message is None and not -(1 << 8 * size - 1) <= value < 1 << 8 * size:
+                        message = "value {} does not fit into '{}'".format(value, directive)
+
+                    if message is None:
+                        image[offset:offset + size] = value.to_bytes(size, byteOrder, signed=value < 0)
+                    elif lineNumber not in self.invalidDataLines:
+                        self.invalidDataLines.add(lineNumber)
+                        self.report("error", message, lineNumber, index)
+                    offset += size
+            elif directive == '.ascii' or directive == '.asciiz':
+                terminator = b"\0" if directive == '.asciiz' else b""
+                for value in values:
+                    image[offset:offset + len(value) + len(terminator)] = value + terminator
+                    offset += len(value) + len(terminator)
+
+        return None
+
+    def convertLabel(self, line, type, label):
+        '''
+        convertLabel function convert labels in the instruction to the value of their field
+        by using the symbol table and the address of the line. It returns None if the label is
+        not defined, the branch offset does not fit into 16 bits or the jump target is not in
+        the 256 MB region of the line. The fields of the external symbols are left zero
+
+        Returns Integer or None
+        '''
+
+        labelAddress = self.symbolTable.get(label)
+        if labelAddress is None:
+            return 0 if label in self.externalSymbols else None
+
+        if type == 'I':
+            offset = (labelAddress - line[-1] - 4) >> 2
+            return offset & 0xFFFF if -0x8000 <= offset < 0x8000 else None
+        elif type == 'J':
+            return None if (labelAddress ^ (line[-1] + 4)) & 0xF0000000 else labelAddress >> 2 & 0x3FFFFFF
+        elif type == 'H':
+            return labelAddress >> 16 & 0xFFFF
+        elif type == 'L':
+            return labelAddress & 0xFFFF
+        else:
+            return 0
+
+    def convertPseudoInstruction(self, line):
+        '''
+        convertPseudoInstruction function expands the pseudo instruction of the given line into
+        MIPS instructions with the first expansion whose condition holds. Other lines, and pseudo
+        instructions whose operands do not match, are returned as the only line
+
+        Returns Lines(List)
+        '''
+
+        pseudoInstruction = PSEUDO_INSTRUCTIONS.get(line[0])
+        if pseudoInstruction is None:
+            return [line]
+
+        kinds, expansions = pseudoInstruction
+        operands = line[1:]
+        if len(operands) != len(kinds):
+            return [line]
+        for kind, operand in zip(kinds, operands):
+            if kind == 'symbol':
+                if not isinstance(operand, str):
+                    return [line]
+            elif not isinstance(operand, int) or not -0x80000000 <= operand <= 0xFFFFFFFF:
+                return [line]
+            elif isinstance(operand, Register) != (kind == 'register'):
+                return [line]
+
+        for condition, templates in expansions:
+            if condition is None or IMMEDIATE_CONDITIONS[condition](operands[-1]):
+                break
+
+        def expandOperand(item):
+            if isinstance(item, int):
+                return operands[item]
+            elif isinstance(item, tuple):
+                half, index = item
+                return operands[index] >> 16 & 0xFFFF if half == 'hi' else operands[index] & 0xFFFF
+            else:
+                return Register(REGISTER_FILE[item])
+
+        return [[template[0]] + [expandOperand(item) for item in template[1:]] for template in templates]
+
+    def convertLineToBinary(self, line):
+        '''
+        convertLineToBinary function pass lines through getISA function
+
+        Returns String
+        '''
+
+        return self.getISA(*line)
+
+    def convertLineToHex(self, line):
+        '''
+        convertLineToHex function pass lines through getISA function
+
+        Returns String
+        '''
+
+        word = self.encodeLine(line)
+        return 'errorAtHexConversion' if word is None else format(word, '08X')
+
+    def formatMachineCode(self, hex):
+        '''
+        formatMachineCode function turns the instruction words into hex or binary text
+
+        Returns List
+        '''
+
+        if hex:
+            wordFormat, errorText = '08X', 'errorAtHexConversion'
+        else:
+            wordFormat, errorText = '032b', 'errorAtBinaryConversion'
+
+        return [errorText if lineIndex in self.invalidLines else format(word, wordFormat)
+                for lineIndex, word in enumerate(self.memoryWords())]
+
+    @property
+    def machineCode(self):
+        '''
+        machineCode property returns the converted content as binary text
+        '''
+        return self.formatMachineCode(False)
+
+    @property
+    def machineCodeHex(self):
+        '''
+        machineCodeHex property returns the converted content as hex text
+        '''
+        return self.formatMachineCode(True)
+
+    def storeTokens(self, tokens):
+        '''
+        storeTokens function turns the given tokens into JSON for the token cache file. The
+        registers are written back as "$number" and the strings of .ascii as {"bytes": hex}
+
+        Returns List
+        '''
+
+        return ["$" + str(int(token)) if type(token) is Register else
+                {"bytes": token.hex()} if type(token) is bytes else
+                self.storeTokens(token) if type(token) is list else token for token in tokens]
+
+    def loadTokens(self, tokens):
+        '''
+        loadTokens function turns the given tokens of the token cache file back into tokens,
+        a string that names a register is its Register again
+
+        Returns List
+        '''
+
+        return [REGISTER_TOKENS.get(token, token) if type(token) is str else
+                self.loadTokens(token) if type(token) is list else
+                bytes.fromhex(token["bytes"]) if type(token) is dict else token for token in tokens]
+
+    def loadCache(self, path):
+        '''
+        loadCache function enables the token cache with the lines saved into the given file,
+        which has a JSON object of lines for each run that added some. The saved lines are
+        moved into the token cache when they are used. The cache starts empty if the file does
+        not exist or was written for another version of the tokens
+
+        Returns Boolean
+        '''
+
+        self.tokenCache = {}
+        self.storedTokens = {}
+        self.addedTokens = []
+        self.cacheFileRuns = None
+        try:
+            with open(path, 'r') as file:
+                runs = [json.loads(text) for text in file]
+        except (OSError, ValueError):
+            return False
+
+        if not all(isinstance(run, dict) and run.get("tokens") == TOKEN_CACHE_VERSION and
+                   isinstance(run.get("lines"), dict) for run in runs):
+            return False
+        for run in runs:
+            self.storedTokens.update((text, self.loadTokens(tokens)) for text, tokens in run["lines"].items())
+        self.cacheFileRuns = len(runs)
+        return True
+
+    def saveCache(self, path):
+        '''
+        saveCache function appends the lines that were added to the token cache since it was
+        loaded to the given file. The file is written again with only the lines used by this
+        run if it could not be loaded, has too many runs or its unused lines outnumber the used
+
+        Returns Boolean
+        '''
+
+        if self.tokenCache is None:
+            return False
+        compact = self.cacheFileRuns is None or self.cacheFileRuns >= MAX_CACHE_RUNS or \
+            len(self.storedTokens) > len(self.tokenCache)
+        if not compact and not self.addedTokens:
+            return True
+
+        lines = self.tokenCache.items() if compact else ((line, self.tokenCache[line]) for line in self.addedTokens)
+        text = json.dumps({"tokens": TOKEN_CACHE_VERSION,
+                           "lines": {line: self.storeTokens(tokens) for line, tokens in lines}}) + "\n"
+        try:
+            with open(path, 'w' if compact else 'a') as file:
+                file.write(text)
+        except OSError:
+            return False
+
+        self.cacheFileRuns = 1 if compact else self.cacheFileRuns + 1
+        self.storedTokens = {}
+        self.addedTokens = []
+        return True
+
+    def encodeContent(self):
+        '''
+        encodeContent function encodes every line of the program into the instruction words and
+        records the lines that can not be encoded
+
+        Returns None
+        '''
+
+        if self.vectorizedEncoding and not self.externalSymbols:
+            return self.encodeContentVectorized()
+
+        self.machineWords = array('I', [0]) * len(self.content)
+        self.invalidLines = set()
+        for lineIndex, line in enumerate(self.content):
+            word = self.encodeLine(line)
+            if word is None:
+                self.invalidLines.add(lineIndex)
+            else:
+                self.machineWords[lineIndex] = word
+
+        return None
+
+    def encodeContentVectorized(self):
+        '''
+        encodeContentVectorized function encodes the whole program with a few NumPy array
+        operations for each operand field instead of a loop over the lines. It falls back
+        to encodeContent if NumPy is not installed
+
+        Returns None
+        '''
+
+        try:
+            import numpy as np
+        except ImportError:
+            self.vectorizedEncoding = False
+            return self.encodeContent()
+
+        program = self.content
+        self.machineWords = array('I')
+        if not len(program):
+            self.invalidLines = set()
+            return None
+
+        mnemonics = np.frombuffer(program.mnemonics, dtype=np.uint16).astype(np.intp)
+        invalid = mnemonics >= len(MNEMONICS)
+        mnemonics[invalid] = len(MNEMONICS)
+        addresses = np.frombuffer(program.addresses, dtype=np.uint32).astype(np.int64)
+        symbolAddresses = np.array([self.symbolTable.get(name, -1) for name in program.symbols] + [-1],
+                                   dtype=np.int64)
+
+        words = np.array([word for word, _ in INSTRUCTION_PLANS] + [0], dtype=np.int64)[mnemonics]
+        columns = (program.firstOperands, program.secondOperands, program.thirdOperands)
+
+        fieldMasks = np.array(FIELD_MASKS, dtype=np.int64)
+        fieldShifts = np.array(FIELD_POSITIONS, dtype=np.int64)
+
+        for column, columnFields in zip(columns, COLUMN_FIELDS):
+            values = np.frombuffer(column, dtype=np.int64)
+            fields = np.array(columnFields + [0], dtype=np.intp)[mnemonics]
+
+            # register, shift amount and immediate fields
+            words |= (values & fieldMasks[fields]) << fieldShifts[fields]
+
+            # label fields through the addresses of their symbols
+            isLabel = fields == FIELD_NUMBERS["label"]
+            isTarget = fields == FIELD_NUMBERS["target"]
+            isHigh = fields == FIELD_NUMBERS["high"]
+            isLow = fields == FIELD_NUMBERS["low"]
+            isSymbol = isLabel | isTarget | isHigh | isLow
+            labelAddresses = symbolAddresses[np.where(isSymbol, values, -1)]
+            invalid |= isSymbol & (labelAddresses < 0)
+            offsets = (labelAddresses - addresses - 4) >> 2
+            invalid |= isLabel & ((offsets < -0x8000) | (offsets >= 0x8000))
+            invalid |= isTarget & ((labelAddresses ^ (addresses + 4)) & 0xF0000000 != 0)
+            words |= np.where(isLabel, offsets & 0xFFFF, 0)
+            words |= np.where(isTarget, labelAddresses >> 2 & 0x3FFFFFF, 0)
+            words |= np.where(isHigh, labelAddresses >> 16 & 0xFFFF, 0)
+            words |= np.where(isLow, labelAddresses & 0xFFFF, 0)
+
+        words[invalid] = 0
+        self.machineWords.frombytes(words.astype(np.uint32).tobytes())
+        self.invalidLines = set(np.flatnonzero(invalid).tolist())
+        return None
+
+    def registerAccesses(self, index):
+        '''
+        registerAccesses function returns the registers that the instruction at the given index
+        of the program writes and reads, leaving $zero out
+
+        Returns Tuple(Set, Set)
+        '''
+
+        program = self.content
+        columns = (program.firstOperands, program.secondOperands, program.thirdOperands)
+        writtenColumns, readColumns, fixedWrites, fixedReads = DEPENDENCE_PLANS[program.mnemonics[index]][:4]
+
+        writes = {columns[column][index] for column in writtenColumns}.union(fixedWrites)
+        reads = {columns[column][index] for column in readColumns}.union(fixedReads)
+        writes.discard(0)
+        reads.discard(0)
+        return writes, reads
+
+    def basicBlocks(self, targets):
+        '''
+        basicBlocks generator yields the start and the end index of each basic block of the
+        program and the index of its delay slot or None. A block ends before a label target,
+        after a branch or a jump, and around a barrier or an invalid line. The delay slot is
+        the line after a branch or a jump if delay slots are enabled and it is not a target
+
+        Yields Tuple
+        '''
+
+        program = self.content
+        count = len(program)
+        start = 0
+        index = 0
+
+        while index < count:
+            number = program.mnemonics[index]
+            kind = DEPENDENCE_PLANS[number][6] if number < len(DEPENDENCE_PLANS) else "barrier"
+            if kind == "barrier" and index > start:
+                yield start, index, None
+                start = index
+
+            index += 1
+            if kind != "normal" or index in targets:
+                slot = None
+                if kind == "control" and self.delaySlots and index < count and index not in targets:
+                    slot = index
+                yield start, index, slot
+                start = index if slot is None else index + 1
+                index = start
+
+        if start < count:
+            yield start, count, None
+
+    def dependenceGraph(self, start, end):
+        '''
+        dependenceGraph function returns the successors of each instruction of the given block
+        as (node, latency) pairs, where the nodes are the indexes in the block. Reading a
+        register waits for the latency of its writer, while overwriting it and the memory
+        accesses only keep their order. A branch or a jump follows every other instruction
+
+        Returns Tuple(Successors(List), Accesses(List))
+        '''
+
+        program = self.content
+        successors = [[] for _ in range(start, end)]
+        accesses = []
+        writers = {}
+        readers = {}
+        lastStore = None
+        loads = []
+
+        for node, index in enumerate(range(start, end)):
+            writes, reads = self.registerAccesses(index)
+            accesses.append((writes, reads))
+            memory, _, kind = DEPENDENCE_PLANS[program.mnemonics[index]][4:]
+
+            for register in reads:
+                if register in writers:
+                    writer = writers[register]
+                    successors[writer].append((node, DEPENDENCE_PLANS[program.mnemonics[start + writer]][5]))
+                readers.setdefault(register, []).append(node)
+            for register in writes:
+                for reader in readers.pop(register, ()):
+                    if reader != node:
+                        successors[reader].append((node, 0))
+                if register in writers:
+                    successors[writers[register]].append((node, 0))
+                writers[register] = node
+
+            if memory == "load":
+                if lastStore is not None:
+                    successors[lastStore].append((node, 0))
+                loads.append(node)
+            elif memory == "store":
+                for other in loads if lastStore is None else loads + [lastStore]:
+                    successors[other].append((node, 0))
+                loads = []
+                lastStore = node
+
+            if kind == "control":
+                for other in range(node):
+                    successors[other].append((node, 0))
+
+        return successors, accesses
+
+    def countStalls(self, successors, order):
+        '''
+        countStalls function returns the stall cycles of the given order of the nodes of a
+        dependence graph when one instruction is issued in each cycle
+
+        Returns Integer
+        '''
+
+        ready = [0] * len(successors)
+        cycle = 0
+        stalls = 0
+        for node in order:
+            if ready[node] > cycle:
+                stalls += ready[node] - cycle
+                cycle = ready[node]
+            for successor, latency in successors[node]:
+                ready[successor] = max(ready[successor], cycle + latency)
+            cycle += 1
+        return stalls
+
+    def listSchedule(self, successors):
+        '''
+        listSchedule function orders the nodes of the given dependence graph by issuing in each
+        cycle the ready node with the longest latency path to the end of the block, so that
+        independent instructions fill the cycles that would stall. Ties keep the source order
+
+        Returns List
+        '''
+
+        count = len(successors)
+        priorities = [1] * count
+        indegrees = [0] * count
+        for node in reversed(range(count)):
+            for successor, latency in successors[node]:
+                priorities[node] = max(priorities[node], priorities[successor] + latency)
+                indegrees[successor] += 1
+
+        earliest = [0] * count
+        waiting = [(0, node) for node in range(count) if not indegrees[node]]
+        available = []
+        order = []
+        cycle = 0
+
+        while len(order) < count:
+            while waiting and waiting[0][0] <= cycle:
+                node = heapq.heappop(waiting)[1]
+                heapq.heappush(available, (-priorities[node], node))
+            if not available:
+                cycle = waiting[0][0]
+                continue
+
+            node = heapq.heappop(available)[1]
+            order.append(node)
+            for successor, latency in successors[node]:
+                earliest[successor] = max(earliest[successor], cycle + latency)
+                indegrees[successor] -= 1
+                if not indegrees[successor]:
+                    heapq.heappush(waiting, (earliest[successor], successor))
+            cycle += 1
+
+        return order
+
+    def fillDelaySlot(self, start, order, successors, accesses, stalls):
+        '''
+        fillDelaySlot function takes the latest instruction of the scheduled block from the
+        given start index out of the given order for the delay slot of its branch or jump,
+        which is the last node. The instruction should not be followed by a dependent one in
+        the block, should not touch the registers of the branch and should not make the block
+        stall more than the given stalls, as the one that hides a load-use stall would. It
+        returns the node and the stalls of the filled block, or None and the given stalls
+
+        Returns Tuple
+        '''
+
+        branch = order[-1]
+        branchWrites, branchReads = accesses[branch]
+        noop = MNEMONIC_NUMBERS["noop"]
+
+        for position in range(len(order) - 2, -1, -1):
+            node = order[position]
+            writes, reads = accesses[node]
+            if self.content.mnemonics[start + node] == noop:
+                continue
+            if any(successor != branch for successor, _ in successors[node]):
+                continue
+            if writes & branchReads or (writes | reads) & branchWrites:
+                continue
+            filledStalls = self.countStalls(successors, order[:position] + order[position + 1:] + [node])
+            if filledStalls > stalls:
+                continue
+            del order[position]
+            return node, filledStalls
+
+        return None, stalls
+
+    def schedule(self):
+        '''
+        Definition: Schedule function reorders the instructions of each basic block of the
+        prepared program to hide the load-use and HI/LO latencies of a five stage pipeline,
+        keeping the new order of a block only if it stalls less. If delay slots are enabled,
+        the noop after a branch or a jump is replaced by an instruction of its block. The
+        addresses of the instructions and the text labels are given again afterwards \n
+        Usage: Object.schedule()
+
+        Returns Dictionary
+        '''
+
+        program = self.content
+        count = len(program)
+        origin = int(self.programMemoryLocation, 16)
+        noop = MNEMONIC_NUMBERS["noop"]
+        latencies = [plan[5] for plan in DEPENDENCE_PLANS]
+
+        labels = {label: (address - origin) >> 2 for label, address in self.symbolTable.items()
+                  if label not in self.dataLabels}
+        targets = set(labels.values())
+        positions = {}
+        order = []
+        report = {"blocks": 0, "moved": 0, "delaySlots": 0, "stallsBefore": 0, "stallsAfter": 0}
+
+        for start, end, slot in self.basicBlocks(targets):
+            positions[start] = len(order)
+            report["blocks"] += 1
+            # a block can only stall after a load or the multiplier
+            if slot is None and (end - start < 2 or all(latencies[number] == 1
+                                                          for number in program.mnemonics[start:end])):
+                order.extend(range(start, end))
+                continue
+
+            successors, accesses = self.dependenceGraph(start, end)
+            blockOrder = list(range(end - start))
+            stalls = self.countStalls(successors, blockOrder)
+            report["stallsBefore"] += stalls
+
+            if stalls:
+                scheduled = self.listSchedule(successors)
+                scheduledStalls = self.countStalls(successors, scheduled)
+                if scheduledStalls < stalls:
+                    blockOrder, stalls = scheduled, scheduledStalls
+
+            filled = None
+            if slot is not None and program.mnemonics[slot] == noop and \
+                    DEPENDENCE_PLANS[program.mnemonics[end - 1]][6] == "control":
+                filled, stalls = self.fillDelaySlot(start, blockOrder, successors, accesses, stalls)
+            report["stallsAfter"] += stalls
+
+            report["moved"] += sum(node != position for position, node in enumerate(blockOrder))
+            order.extend(start + node for node in blockOrder)
+            if filled is not None:
+                order.append(start + filled)
+                report["delaySlots"] += 1
+            elif slot is not None:
+                order.append(slot)
+
+        positions[count] = len(order)
+        if order != list(range(count)):
+            program.reorder(order, origin)
+            self.relocateLabels(labels, positions, len(order))
+
+        self.scheduleReport = report
+        return report
+
+    def relocateLabels(self, labels, positions, length):
+        '''
+        relocateLabels function gives the text labels of the given instruction indexes the
+        addresses of their new positions in a text section of the given length, and moves the
+        data section after it unless the source gave its address
+
+        Returns None
+        '''
+
+        origin = int(self.programMemoryLocation, 16)
+        for label, index in labels.items():
+            if index in positions:
+                self.symbolTable[label] = origin + 4 * positions[index]
+
+        end = origin + 4 * length
+        if self.dataAlignment is not None:
+            dataLocation = -(-end // self.dataAlignment) * self.dataAlignment
+            for label in self.dataLabels:
+                self.symbolTable[label] += dataLocation - self.dataLocation
+            self.dataLocation = dataLocation
+            if self.dataSize:
+                self.checkSectionEnd(".data", self.dataLocation + self.dataSize)
+        elif self.dataSize and self.dataLocation < end:
+            self.errorMessage = "Data section at 0x{:08x} overlaps the text section".format(self.dataLocation)
+            self.report("error", self.errorMessage)
+        return None
+
+    def relaxedSize(self, mnemonic, address, target):
+        '''
+        relaxedSize function returns the number of words that the given branch or jump at the
+        given address takes to reach the given target: one for the short form, two for an
+        inverted branch over a jump and three or four if the target is only reached by jr
+
+        Returns Integer
+        '''
+
+        if mnemonic == "j":
+            return 1 if not (target ^ (address + 4)) & 0xF0000000 else 3
+        if -0x8000 <= (target - address - 4) >> 2 < 0x8000:
+            return 1
+        return 2 if not (target ^ (address + 8)) & 0xF0000000 else 4
+
+    def relaxedLines(self, line, size):
+        '''
+        relaxedLines function returns the lines of tokens that replace the given branch or
+        jump in its relaxed form of the given size. The far forms load the target into $at
+
+        Returns List
+        '''
+
+        mnemonic, operands, label = line[0], line[1:-1], line[-1]
+        at = Register(REGISTER_FILE["$at"])
+        far = [["lui%hi", at, label], ["ori%lo", at, at, label], ["jr", at]]
+        if mnemonic == "j":
+            return far
+        skip = INVERTED_BRANCHES[mnemonic] + "%skip"
+        if size == 2:
+            return [[skip] + operands + [1], ["j", label]]
+        return [[skip] + operands + [len(far)]] + far
+
+    def relax(self):
+        '''
+        Definition: Relax function rewrites the branches whose label is out of the 16 bit
+        offset into an inverted branch over a j, and the jumps and branches whose label is out
+        of the 256 MB region into a lui, ori and jr sequence through $at. The addresses are
+        given again until no instruction has to grow, so every other instruction keeps its
+        short form \n
+        Usage: Object.relax()
+
+        Returns Integer
+        '''
+
+        program = self.content
+        count = len(program)
+        origin = int(self.programMemoryLocation, 16)
+        columns = (program.firstOperands, program.secondOperands, program.thirdOperands)
+
+        labels = {label: (address - origin) >> 2 for label, address in self.symbolTable.items()
+                  if label not in self.dataLabels}
+        # the label of a branch or a jump is its last operand
+        relaxable = {MNEMONIC_NUMBERS[mnemonic] for mnemonic in itertools.chain(INVERTED_BRANCHES, ("j",))}
+        candidates = [(index, MNEMONICS[number],
+                       program.symbols[columns[len(INSTRUCTION_PLANS[number][1]) - 1][index]])
+                      for index, number in enumerate(program.mnemonics) if number in relaxable]
+
+        sizes = {}
+        grown, extras = [], [0]
+
+        def position(index):
+            return index + extras[bisect.bisect_left(grown, index)]
+
+        changed = True
+        while changed:
+            end = origin + 4 * position(count)
+            dataShift = 0
+            if self.dataAlignment is not None:
+                dataShift = -(-end // self.dataAlignment) * self.dataAlignment - self.dataLocation
+
+            changed = False
+            for index, mnemonic, label in candidates:
+                if label in labels:
+                    target = origin + 4 * position(labels[label])
+                elif label in self.symbolTable:
+                    target = self.symbolTable[label] + dataShift
+                else:
+                    continue
+                size = self.relaxedSize(mnemonic, origin + 4 * position(index), target)
+                if size > sizes.get(index, 1):
+                    sizes[index] = size
+                    changed = True
+
+            grown = sorted(sizes)
+            extras = [0]
+            for index in grown:
+                extras.append(extras[-1] + sizes[index] - 1)
+
+        if not sizes or not self.checkSectionEnd(".text", origin + 4 * position(count)):
+            return 0
+
+        relaxed = Program()
+        relaxed.symbols = program.symbols
+        relaxed.symbolNumbers = program.symbolNumbers
+        address = origin
+        for index in range(count):
+            line = program.tokens(index)
+            for instruction in self.relaxedLines(line, sizes[index]) if index in sizes else (line,):
+                relaxed.append(instruction, address, program.lineNumbers[index])
+                address += 4
+
+        self.content = relaxed
+        self.relocateLabels(labels, {index: position(index) for index in set(labels.values())},
+                            position(count))
+        return len(sizes)
+
+    def convertContent(self):
+        '''
+        convertContent function converts all content into instruction words, saves it
+
+        Returns Boolean
+        '''
+        if self.checkPrepare:
+
+            if not self.checkConvertContent:
+
+                with self.profilePhase("convertContent"):
+                    self.encodeContent()
+                    if self.invalidLines:
+                        self.diagnoseContent()
+
+                if self.dataSize:
+                    with self.profilePhase("encodeData") as phase:
+                        self.dataImage = bytearray(self.dataSize)
+                        self.dataByteOrder = self.executeByteOrder
+                        self.encodeData(self.dataImage, 0, self.dataByteOrder)
+                        phase["lines"] = len(self.dataLines)
+            else:
+                pass
+
+            self.checkConvertContent = True
+            return True
+        else:
+            return False
+
+    def report(self, severity, message, lineNumber=None, token=None):
+        '''
+        report function appends a diagnostic of the given severity ("error" or "warning") to
+        the diagnostics. The token is the index or the text of the token of the line that the
+        diagnostic points to, its column is found only if the source file can be read again, the
+        line is not expanded from a macro and the source is not streamed
+
+        Returns Diagnostic
+        '''
+
+        file, line = self.lineLocation(lineNumber)
+        column = None if file is None or line is None or token is None or lineNumber in self.expandedLines \
+            or not self.locateColumns else self.locateColumn(file, line, token)
+
+        diagnostic = Diagnostic(severity, message, file, line, column)
+        self.diagnostics.append(diagnostic)
+        return diagnostic
+
+    def lineLocation(self, lineNumber):
+        '''
+        lineLocation function returns the file and the line of the given line number, which may
+        be the number of a line of an included file. The file is None for the source streams
+
+        Returns Tuple
+        '''
+
+        if lineNumber in self.includedLines:
+            return self.includedLines[lineNumber]
+        elif self.sourceStream is None and not self.checkSingleLineCommand:
+            return self.sourceDirectory, lineNumber
+        return None, lineNumber
+
+    def locateColumn(self, file, lineNumber, token):
+        '''
+        locateColumn function scans the given line of the given file again and returns the
+        column of its token with the given index, counting the mnemonic as zero, or with the
+        given text. It returns None if the token is not found
+
+        Returns Integer or None
+        '''
+
+        matches = [match for match in TOKEN_PATTERN.finditer(linecache.getline(file, lineNumber))
+                   if match.lastgroup not in ('comma', 'comment')]
+        if isinstance(token, str):
+            token = token.lower()
+            found = [match for match in matches if match.group().strip().lower() == token]
+        else:
+            found = [match for match in matches if match.lastgroup != 'label'][token:token + 1]
+
+        if not found:
+            return None
+        return found[0].end() - len(found[0].group().lstrip()) + 1
+
+    def formatToken(self, token):
+        '''
+        formatToken function writes the given token back as source text for the diagnostics
+
+        Returns String
+        '''
+
+        if isinstance(token, bytes):
+            return '"{}"'.format(token.decode('latin-1').encode('unicode_escape').decode())
+        elif isinstance(token, list):
+            return "'{}(${})'".format(*token)
+        elif isinstance(token, Register):
+            return "'${}'".format(int(token))
+        return "'{}'".format(token)
+
+    def diagnoseOperand(self, kind, operand):
+        '''
+        diagnoseOperand function returns why the given operand does not fit the given field or
+        operand kind of a pseudo instruction, or None if it fits
+
+        Returns String or None
+        '''
+
+        if kind in FIELD_SHIFTS or kind == 'register':
+            if isinstance(operand, str) and operand.startswith('$'):
+                return "unknown register {}".format(self.formatToken(operand))
+            elif not isinstance(operand, Register) or not 0 <= operand < 32:
+                return "expected a register, found {}".format(self.formatToken(operand))
+        elif kind == 'offset':
+            if not isinstance(operand, list):
+                return "expected an offset such as 4($sp), found {}".format(self.formatToken(operand))
+            return self.diagnoseOperand('imm', operand[0]) or self.diagnoseOperand('rs', operand[1])
+        elif kind in SYMBOL_FIELDS or kind == 'symbol':
+            if not isinstance(operand, str) or operand.startswith('$'):
+                return "expected a label, found {}".format(self.formatToken(operand))
+        elif not isNumber(operand):
+            return "expected an immediate, found {}".format(self.formatToken(operand))
+        elif kind == 'shamt' and not 0 <= operand < 32:
+            return "shift amount {} is out of the range 0 to 31".format(operand)
+        elif kind == 'imm' and not -0x8000 <= operand <= 0xFFFF:
+            return "immediate {} does not fit into 16 bits".format(operand)
+        elif kind == 'immediate' and not -0x80000000 <= operand <= 0xFFFFFFFF:
+            return "immediate {} does not fit into 32 bits".format(operand)
+        return None
+
+    def diagnoseLine(self, line):
+        '''
+        diagnoseLine function finds out why the given line of tokens is not an instruction and
+        returns the message and the index of the token that it points to
+
+        Returns Tuple(String, Integer)
+        '''
+
+        mnemonic = line[0]
+        if not isinstance(mnemonic, str) or mnemonic.startswith('$'):
+            return "expected an instruction, found {}".format(self.formatToken(mnemonic)), 0
+        elif mnemonic in DATA_DIRECTIVES:
+            return "data directive '{}' is outside the data section".format(mnemonic), 0
+        elif mnemonic in PSEUDO_INSTRUCTIONS:
+            kinds = PSEUDO_INSTRUCTIONS[mnemonic][0]
+        elif mnemonic in MNEMONIC_NUMBERS:
+            kinds = INSTRUCTION_FORMATS[mnemonic][3]
+        elif mnemonic.startswith('.'):
+            return "unknown directive '{}'".format(mnemonic), 0
+        else:
+            return "unknown instruction '{}'".format(mnemonic), 0
+
+        operands = line[1:]
+        if len(operands) != len(kinds):
+            return "'{}' takes {} operands, {} given".format(mnemonic, len(kinds), len(operands)), 0
+        for index, (kind, operand) in enumerate(zip(kinds, operands), 1):
+            message = self.diagnoseOperand(kind, operand)
+            if message is not None:
+                return message, index
+        return "line can not be encoded", 0
+
+    def diagnoseData(self, line):
+        '''
+        diagnoseData function returns why the given line of the data section can not be placed
+
+        Returns String
+        '''
+
+        directive = line[0]
+        if directive in DATA_DIRECTIVES:
+            return "invalid operands of '{}'".format(directive)
+        elif isinstance(directive, str) and (directive in MNEMONIC_NUMBERS or directive in PSEUDO_INSTRUCTIONS):
+            return "instruction '{}' is inside the data section".format(directive)
+        elif isinstance(directive, str) and directive.startswith('.'):
+            return "unknown directive '{}'".format(directive)
+        return "expected a data directive, found {}".format(self.formatToken(directive))
+
+    def diagnoseSymbols(self, line):
+        '''
+        diagnoseSymbols function finds out which symbol of the given instruction can not be
+        resolved and returns the message and the symbol
+
+        Returns Tuple(String, String)
+        '''
+
+        for field, value in zip(INSTRUCTION_PLANS[line[0]][1], line[1:4]):
+            if field not in SYMBOL_FIELDS:
+                continue
+            name = self.content.symbols[value]
+            if self.convertLabel(line, SYMBOL_FIELDS[field], name) is not None:
+                continue
+            if name not in self.symbolTable:
+                return "undefined label '{}'".format(name), name
+            elif field == 'label':
+                offset = (self.symbolTable[name] - line[-1] - 4) >> 2
+                return "branch to '{}' is out of range, its offset is {} words".format(name, offset), name
+            return "jump to '{}' leaves the 256 MB region of the instruction".format(name), name
+        return "line can not be encoded", 0
+
+    def diagnoseContent(self):
+        '''
+        diagnoseContent function reports an error for each invalid line of the program in a
+        single pass after it is encoded. The instructions expanded from the same source line
+        are reported once
+
+        Returns None
+        '''
+
+        program = self.content
+        reported = set()
+        for index in sorted(self.invalidLines):
+            if index in program.invalidTokens:
+                message, token = self.diagnoseLine(program.invalidTokens[index])
+            else:
+                message, token = self.diagnoseSymbols(program[index])
+
+            lineNumber = program.lineNumbers[index]
+            if (lineNumber, message) not in reported:
+                reported.add((lineNumber, message))
+                self.report("error", message, lineNumber, token)
+
+        return None
 
-warnings.filterwarnings("ignore")
+    def formatDiagnostics(self):
+        '''
+        formatDiagnostics function writes the diagnostics in the order of their files and lines
 
+        Returns String
+        '''
 
-class Assembler:
-    '''
-    Definition: Assembler object takes a text file that includes MIPS instructions and
-    turn it into machine code and save it as a file
+        diagnostics = sorted(self.diagnostics, key=lambda diagnostic: (
+            diagnostic.line is not None, diagnostic.file or "", diagnostic.line or 0, diagnostic.column or 0))
+        return "".join(str(diagnostic) + "\n" for diagnostic in diagnostics)
 
-    Usage: Object = Assembler(source=SOURCE_FILE, target=TARGET_FILE)
-    '''
+    def errorCount(self):
+        '''
+        errorCount function returns the number of the diagnostics that are errors
 
-    def __init__(self, **kwargs):
+        Returns Integer
+        '''
 
-        # defult values of object
-        self.checkPrepare = False
-        self.programMemorySize = None
-        self.programMemoryLocation = 0
-        self.targetDirectory = None
-        self.sourceDirectory = None
-        self.content = None
-        self.contentLabels = ["None"]
-        self.machineCode = None
-        self.machineCodeHex = None
-        self.commentSeen = False
-        self.previewDetailed = False
-        self.previewLine = "all"
-        self.previewHex = False
-        self.checkSingleLineCommand = False
-        self.checkConvertContent = False
-        self.executeFormatHex = True
-        self.executeFormatLineIndex = False
-        self.errorMessage = None
-        self.labelCount = 0
-        self.author = "DFA"
-        self.name = "Kompaq"
-        self.version = "1.0"
-        self.description = self.name + " Assembler. Version is " + \
-            self.version + ". It was developed by " + self.author
+        return sum(diagnostic.severity == "error" for diagnostic in self.diagnostics)
 
-        for key, value in kwargs.items():
-            if key == 'source':
-                self.sourceDirectory = value
-            elif key == 'target':
-                self.targetDirectory = value
+    def readSource(self, diagnose=True):
+        '''
+        readSource generator reads the source stream or the source file lazily through the
+        preprocessor and yields the line number and the tokens of each non-empty line. The
+        errors of the preprocessor are reported only if diagnose is True
 
-        self.registerFile = {
-            "$0": "00000",
-            "$zero": "00000",
-            "$at": "00001",
-            "$v0": "00010",
-            "$v1": "00011",
-            "$a0": "00100",
-            "$a1": "00101",
-            "$a2": "00110",
-            "$a3": "00111",
-            "$t0": "01000",
-            "$t1": "01001",
-            "$t2": "01010",
-            "$t3": "01011",
-            "$t4": "01100",
-            "$t5": "01101",
-            "$t6": "01110",
-            "$t7": "01111",
-            "$s0": "10000",
-            "$s1": "10001",
-            "$s2": "10010",
-            "$s3": "10011",
-            "$s4": "10100",
-            "$s5": "10101",
-            "$s6": "10110",
-            "$s7": "10111",
-            "$t8": "11000",
-            "$t9": "11001",
-            "$k0": "11010",
-            "$k1": "11011",
-            "$gp": "11100",
-            "$sp": "11101",
-            "$fp": "11110",
-            "$ra": "11111"
-        }
+        Yields Tuple
+        '''
 
-    def checkFiles(self):
+        self.includedFiles = {}
+        self.includedLines = {}
+        self.expandedLines = set()
+        preprocessor = Preprocessor(self, diagnose)
+
+        if self.sourceStream is not None:
+            yield from preprocessor.run(self.readLines(self.sourceStream), None)
+        else:
+            with open(self.sourceDirectory, 'r') as file:
+                yield from preprocessor.run(self.readLines(file), self.sourceDirectory)
+
+    def readLines(self, file):
         '''
-        checkFiles function check if the input and output files are avaible 
+        readLines generator yields the line number, the text and the tokens of each line of
+        the given file that is not empty
 
-        return Boolean
+        Yields Tuple
         '''
 
-        if self.checkSingleLineCommand:
-            return True
-        try:
-            file = open(self.sourceDirectory)
-            file.close()
-            return True
-        except:
-            return False
+        for lineNumber, text in enumerate(file, 1):
+            line = self.tokenizeLine(text)
+            if line:
+                yield lineNumber, text, line
 
-    def getISA(self, *line):
+    def convertRegister(self, name):
         '''
-        getISA function keeps all of MIPS instruction and returns given line as machine code
+        convertRegister function returns the Register of the given register name, or the name
+        itself if it is not a register
 
-        return String
+        Returns Register or String
         '''
-        try:
-            instructions = {
-                "add": "000000{}{}{}00000100000".format(line[2], line[3], line[1]),
-                "addi": "001000{}{}{}".format(line[2], line[1], self.convertSignedBinary(line[3], 16)),
-                "addiu": "001001{}{}{}".format(line[2], line[1], self.convertSignedBinary(line[3], 16)),
-                "addu": "000000{}{}{}00000100001".format(line[2], line[3], line[1]),
-                "and": "000000{}{}{}00000100100".format(line[2], line[3], line[1]),
-                "andi": "001100{}{}{}".format(line[2], line[1], self.convertSignedBinary(line[3], 16)),
-                "beq": "000100{}{}{}".format(line[1], line[2], self.convertLabel(line, 'I')),
-                "bgez": "000001{}00001{}".format(line[1], self.convertLabel(line, 'I')),
-                "bgezal": "000001{}10001{}".format(line[1], self.convertLabel(line, 'I')),
-                "bgtz": "000111{}00000{}".format(line[1], self.convertLabel(line, 'I')),
-                "blez": "000110{}00000{}".format(line[1], self.convertLabel(line, 'I')),
-                "bltz": "000001{}00000{}".format(line[1], self.convertLabel(line, 'I')),
-                "bltzal": "000001{}10000{}".format(line[1], self.convertLabel(line, 'I')),
-                "bne": "000101{}{}{}".format(line[1], line[2], self.convertLabel(line, 'I')),
-                "div": "000000{}{}0000000000011010".format(line[1], line[2]),
-                "divu": "000000{}{}0000000000011011".format(line[1], line[2]),
-                "j": "000010{}".format(self.convertLabel(line, 'J')),
-                "jal": "000011{}".format(self.convertLabel(line, 'J')),
-                "jr": "000000{}000000000000000001000".format(line[1]),
-                "lb": "100011{}{}{}".format(line[2][1], line[1], line[2][0]),
-                "lui": "10001100000{}{}".format(line[1], self.convertSignedBinary(line[2], 16)),
-                "lw": "100011{}{}{}".format(line[2][1], line[1], line[2][0]),
-                "mfhi": "0000000000000000{}00000010000".format(line[1]),
-                "mflo": "0000000000000000{}00000010010".format(line[1]),
-                "mult": "000000{}{}0000000000011000".format(line[1], line[2]),
-                "multu": "000000{}{}0000000000011001".format(line[1], line[2]),
-                "noop": "00000000000000000000000000000000",
-                "or": "000000{}{}{}00000100101".format(line[2], line[3], line[1]),
-                "ori": "0001101{}{}{}".format(line[2], line[1], self.convertSignedBinary(line[3], 16)),
-                "sb": "101000{}{}{}".format(line[2][1], line[1], line[2][0]),
-                "sll": "00000000000{}{}{}000000".format(line[2], line[1], self.convertSignedBinary(line[3], 5)),
-                "sllv": "000000{}{}{}00000000100".format(line[3], line[2], line[1]),
-                "slt": "000000{}{}{}00000101010".format(line[2], line[3], line[1]),
-                "slti": "001010{}{}{}".format(line[2], line[1], self.convertSignedBinary(line[3], 16)),
-                "sltiu": "001011{}{}{}".format(line[2], line[1], self.convertSignedBinary(line[3], 16)),
-                "sltu": "000000{}{}{}00000101011".format(line[2], line[3], line[1]),
-                "sra": "00000000000{}{}{}000010".format(line[2], line[1], self.convertSignedBinary(line[3], 5)),
-                "srlv": "000000{}{}{}00000000110".format(line[2], line[3], line[1]),
-                "sub": "000000{}{}{}00000100010".format(line[2], line[3], line[1]),
-                "subu": "000000{}{}{}00000100011".format(line[2], line[3], line[1]),
-                "sw": "101011{}{}{}".format(line[2][1], line[1], line[2][0]),
-                "syscall": "00000000000000000000000000001100",
-                "xor": "000000{}{}{}00000100110".format(line[2], line[3], line[1]),
-                "xori": "00111000000{}{}{}".format(line[2], line[1], self.convertSignedBinary(line[3], 16))
-            }
-            return instructions[line[0]]
-        except:
-            pass
-
-    def clearCommas(self, line):
-        '''
-        clearCommas function clears the commas in the given line
-
-        return Line(List)
-        '''
-        resultantLine = ["First"]
-        for token in line:
-            self.commentSeen = True if token == "#" else self.commentSeen
-            if not self.commentSeen:
-                resultantLine.append(token.replace(',', ''))
-        resultantLine.pop(0)
-        self.commentSeen = False
-        return resultantLine
-
-    def placeVariables(self, line):
-        '''
-        placeVariables function convert the tokens in the given line into CPU varialbe
-        if it is a CPU variable. Otherwise, turns the original value
-
-        return Line(List)
-        '''
-
-        return list(map(lambda element: self.registerFile.get(element) if self.registerFile.get(element) != None else element, line))
 
-    def convertSignedBinary(self, number, width):
+        name = name.lower()
+        register = REGISTER_TOKENS.get(name)
+        if register is None and name[1:].isdigit() and int(name[1:]) < 32:
+            register = Register(int(name[1:]))
+        return name if register is None else register
+
+    def convertImmediate(self, text):
         '''
-        placeVariables function convert the tokens in the given line into CPU varialbe
-        if it is a CPU variable. Otherwise, turns the original value
+        convertImmediate function converts the given decimal or hex text into integer
 
-        return Token(String or None)
+        Returns Integer
+        '''
+
+        return int(text, 16 if 'x' in text.lower() else 10)
+
+    def convertString(self, text):
+        '''
+        convertString function converts the given quoted text with its escape sequences into
+        bytes, or None if an escape sequence is not valid
+
+        Returns Bytes or None
         '''
 
         try:
-            return np.binary_repr(int(number), width=width)
-        except:
-            return False
+            return text[1:-1].encode('utf-8').decode('unicode_escape').encode('latin-1')
+        except (UnicodeDecodeError, UnicodeEncodeError):
+            return None
 
-    def convertOffset(self, token, *line):
+    def lexLine(self, line):
         '''
-        convertOffset function convert the tokens into array while placing its memory address
-        and decimal offset number to binary number
+        lexLine generator scans the given source line once and yields its typed tokens as
+        (kind, value) pairs. The kinds are label, mnemonic, register, immediate, offset,
+        symbol, string, comment and unknown
 
-        return Token(String or List)
+        Yields Token(Tuple)
         '''
 
-        tempToken = token.replace('(', ' ').replace(')', '')
+        mnemonicSeen = False
+        for match in TOKEN_PATTERN.finditer(line):
+            kind = match.lastgroup
+            if kind == 'word':
+                if mnemonicSeen:
+                    yield 'symbol', match.group('word').lower()
+                else:
+                    mnemonicSeen = True
+                    yield 'mnemonic', match.group('word').lower()
+            elif kind == 'register':
+                yield 'register', self.convertRegister(match.group('register'))
+            elif kind == 'immediate':
+                yield 'immediate', self.convertImmediate(match.group('immediate'))
+            elif kind == 'base':
+                offset = match.group('offset')
+                yield 'offset', [self.convertImmediate(offset) if offset else 0,
+                                 self.convertRegister(match.group('base'))]
+            elif kind == 'string':
+                value = self.convertString(match.group('string'))
+                yield ('unknown', match.group('string')) if value is None else ('string', value)
+            elif kind == 'label':
+                yield 'label', match.group('label').lower()
+            elif kind == 'comment':
+                yield 'comment', match.group('comment')
+                return
+            elif kind == 'unknown':
+                yield 'unknown', match.group('unknown')
+
+    def tokenizeLine(self, line):
+        '''
+        tokenizeLine function turns the given source line into a line of the content, keeping
+        the colon of the labels and leaving the comments out. The tokens are taken from the
+        token cache if it is enabled, so an unchanged line is not scanned again
 
-        if tempToken == token:
-            return token
-        else:
-            tempToken = list(tempToken.split())
-            newToken = []
-            newToken.insert(0, np.binary_repr(int(tempToken[0]), width=16))
-            newToken.insert(1, self.registerFile.get(tempToken[1]))
-            return newToken
+        Returns Line(List)
+        '''
 
-    def placeOffsets(self, line):
+        if self.tokenCache is not None:
+            tokens = self.tokenCache.get(line)
+            if tokens is None and self.storedTokens:
+                tokens = self.storedTokens.pop(line, None)
+                if tokens is not None:
+                    self.tokenCache[line] = tokens
+            if tokens is not None:
+                self.cacheHits += 1
+                return tokens
+            self.cacheMisses += 1
+
+        tokens = [value + ':' if kind == 'label' else value
+                  for kind, value in self.lexLine(line) if kind != 'comment']
+        if self.tokenCache is not None:
+            self.tokenCache[line] = tokens
+            self.addedTokens.append(line)
+        return tokens
+
+    def takeProgramMemoryLocation(self, lines):
         '''
-        placeOffsets function pass tokens of the lines trough convertOffset function
+        takeProgramMemoryLocation function takes the program memory location from the first
+        of the given numbered lines if exist. The program memory origin overrides it if given
 
-        return Line(List)
+        Returns Iterator
         '''
-        return list(map(lambda element: self.convertOffset(element, *line), line))
 
-    def fillInTheBlanks(self, line):
+        lines = iter(lines)
+        firstLine = next(lines, None)
+        origin = self.programMemoryOrigin
+
+        if firstLine is not None and len(firstLine[1]) == 1 and isNumber(firstLine[1][0]):
+            location = firstLine[1][0]
+            if not origin and (location % 4 or not 0 <= location < ADDRESS_SPACE):
+                self.errorMessage = "Program memory location should be a word aligned address from 0x00000000 " \
+                    "to 0xfffffffc"
+                self.report("error", self.errorMessage, firstLine[0], 0)
+                location = 0
+            self.programMemoryLocation = origin if origin else "0x{:08x}".format(location)
+            return lines
+
+        self.programMemoryLocation = origin if origin else '0x00000000'
+        return lines if firstLine is None else itertools.chain([firstLine], lines)
+
+    def checkSectionEnd(self, section, end, lineNumber=None):
         '''
-        fillInTheBlanks function fill the lines with 'None' item to keep regularity
+        checkSectionEnd function reports an error if the given section ends past the 32 bit
+        address space at the given end address
+
+        Returns Boolean
         '''
-        newLine = line.copy()
-        size = len(line)
-        if size <= 4:
-            for _ in range(4 - size):
-                newLine.append('None')
-        return newLine
 
-    def takeLabels(self):
+        if end <= ADDRESS_SPACE:
+            return True
+        self.errorMessage = "Section '{}' passes the end of the 32 bit address space".format(section)
+        self.report("error", self.errorMessage, lineNumber)
+        return False
+
+    def streamLabels(self):
         '''
-        takeLabels function takes the label in the content and stores it if exits
+        streamLabels function is the first pass of streaming, it reads the source file lazily
+        and only records the address of each label into the symbol table. It fails if the
+        source has a data section
 
-        Returns None
+        Returns Boolean
         '''
 
-        for lineIndex, line in enumerate(self.content):
-            if line[0].find(":") != -1:
+        lines = self.takeProgramMemoryLocation(self.readSource())
+        address = int(self.programMemoryLocation, 16)
+        self.symbolTable = {}
+        self.dataSize = 0
+
+        for lineNumber, line in lines:
+            if str(line[0]).endswith(":"):
+                if line[0][:-1] in self.symbolTable:
+                    self.report("warning", "label '{}' is redefined, the last definition is used".format(
+                        line[0][:-1]), lineNumber, line[0])
+                self.symbolTable[line[0][:-1]] = address
+                line = line[1:]
+            if line and line[0] == '.data':
+                self.errorMessage = "Data section can not be streamed"
+                self.report("error", self.errorMessage, lineNumber, 0)
+                return False
+            if line and line[0] != '.text':
+                address += 4 * len(self.convertPseudoInstruction(line))
+                if not self.checkSectionEnd(".text", address, lineNumber):
+                    return False
+
+        return self.errorMessage is None
+
+    def streamContent(self):
+        '''
+        streamContent generator is the second pass of streaming, it reads the source file lazily
+        and yields the program in chunks of the stream chunk size. The chunk is cleared when
+        the next one is requested
 
-                self.contentLabels.append(
-                    [lineIndex, line[0].replace(":", "")])
+        Yields Program
+        '''
 
-                line.pop(0)
+        lines = self.takeProgramMemoryLocation(self.readSource(diagnose=False))
+        address = int(self.programMemoryLocation, 16)
+        program = Program()
 
-                if len(line) < 1:
-                    self.content.pop(lineIndex)
-            else:
-                pass
+        for lineNumber, line in lines:
+            if str(line[0]).endswith(":"):
+                line = line[1:]
+            if line and line[0] != '.text':
+                for instruction in self.convertPseudoInstruction(line):
+                    program.append(instruction, address, lineNumber)
+                    address += 4
 
-        if len(self.contentLabels) != 1:
-            self.contentLabels.pop(0)
+                if len(program) >= self.streamChunkSize:
+                    yield program
+                    program.clear()
 
-        return None
+        if len(program):
+            yield program
 
-    def convertLabel(self, line, type):
+    def stream(self):
         '''
-        convertLabel function convert labels in the instruction to binary values
+        Definition: Stream function assembles the source file into the target file in two lazy
+        passes without keeping the program in memory. Only "text" and "bin" execute formats
+        can be streamed \n
+        Usage: Object.stream()
 
-        Returns String
+        Returns Boolean
         '''
+        self.diagnostics = []
+        if not self.checkFiles() or self.checkSingleLineCommand:
+            return False
+        linecache.checkcache()
 
-        try:
-            lineIndex = int(self.content.index(list(line)))
-            labelIndex = None
-            calculatedIndex = None
-
-            if type == 'I':
-
-                for index, label in self.contentLabels:
-                    if label == line[3]:
-                        labelIndex = index
-                calculatedIndex = labelIndex - lineIndex - 1
-                return self.convertSignedBinary(str(calculatedIndex), 16)
-
-            elif type == 'J':
-
-                for index, label in self.contentLabels:
-                    if label == line[1]:
-                        labelIndex = index
-                calculatedProgramMemoryLocation = self.programMemoryLocation[2:]
-                calculatedProgramMemoryLocation = int(
-                    calculatedProgramMemoryLocation, 16)
-
-                calculatedIndex = calculatedProgramMemoryLocation + 4 * labelIndex
-                calculatedIndex = np.base_repr(calculatedIndex, base=2)
-                calculatedIndex = np.base_repr(
-                    int(calculatedIndex, 2), base=2, padding=32-len(calculatedIndex))
-                calculatedIndex = calculatedIndex[4:-2]
-
-                return calculatedIndex
-            else:
-                return '0'
-        except:
+        if self.sourceStream is not None:
+            self.errorMessage = "Source stream can not be read twice for streaming"
             return False
 
-    def convertPseudoInstruction(self, line):
+        if self.executeFormat not in ("text", "bin"):
+            self.errorMessage = "Execute format can not be streamed: " + str(self.executeFormat)
+            return False
+
+        # the columns of the diagnostics are not looked up, linecache would hold the whole source
+        self.locateColumns = False
+        with self.profilePhase("streamLabels") as phase:
+            streamable = self.streamLabels()
+            phase["lines"] = len(self.symbolTable)
+        if not streamable:
+            self.locateColumns = True
+            return False
+
+        with self.profilePhase("streamContent") as phase, self.openTarget(self.executeFormat == "bin") as file:
+            firstIndex = 0
+            # the invalid lines of each chunk are counted from the first line of the program
+            invalidLines = set()
+
+            for self.content in self.streamContent():
+                self.encodeContent()
+                if self.invalidLines:
+                    self.diagnoseContent()
+                    invalidLines.update(firstIndex + lineIndex for lineIndex in self.invalidLines)
+                self.writeChunk(file, firstIndex)
+                firstIndex += len(self.content)
+
+            phase["lines"] = firstIndex
+
+        self.invalidLines = invalidLines
+        self.content = None
+        self.machineWords = None
+        self.checkConvertContent = False
+        self.locateColumns = True
+        return True
+
+    def writeChunk(self, file, firstIndex):
         '''
-        convertPseudoInstruction function convert the pseudo instruction to possible MIPS instruction if exits
+        writeChunk function writes the instruction words of the chunk into the given file
 
-        Returns Line(List)
+        Returns None
         '''
 
-        tempLine = ['None']
-        if line[0] == 'move':
-            tempLine.append('addu')
-            tempLine.append(line[1])
-            tempLine.append('00000')
-            tempLine.append(line[2])
-            tempLine.pop(0)
+        if self.executeFormat == "bin":
+            file.write(self.packMachineCode(self.executeByteOrder))
         else:
-            tempLine = line
+            file.write(self.formatText(firstIndex))
 
-        return tempLine
+        return None
 
-    def convertLineToBinary(self, line):
+    def enableProfile(self):
         '''
-        convertLineToBinary function pass lines through getISA function
+        enableProfile function starts recording the time, line count and memory allocation of
+        each phase and the number of calls to the helper functions into the profile report
 
-        Returns String
+        Returns None
         '''
 
-        return self.getISA(*line)
+        import tracemalloc
 
-    def convertLineToHex(self, line):
+        self.disableProfile()
+        self.profileReport = {"phases": [], "calls": dict.fromkeys(PROFILED_HELPERS, 0)}
+        for name in PROFILED_HELPERS:
+            setattr(self, name, self.countCalls(name, getattr(self, name)))
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        return None
+
+    def disableProfile(self):
         '''
-        convertLineToHex function pass lines through getISA function
+        disableProfile function stops recording while keeping the profile report
 
-        Returns String
+        Returns None
         '''
 
-        try:
-            hexValue = np.base_repr(int(self.getISA(*line), 2), base=16)
-            hexValue = np.base_repr(
-                int(self.getISA(*line), 2), base=16, padding=(8-len(hexValue)))
-            return hexValue
-        except:
-            return 'errorAtHexConversion'
+        import tracemalloc
 
-    def convertContent(self):
+        for name in PROFILED_HELPERS:
+            self.__dict__.pop(name, None)
+        if self.profileReport is not None and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        return None
+
+    def countCalls(self, name, function):
         '''
-        convertContent function converts all content, saves it
+        countCalls function wraps the given helper function to count its calls into the
+        profile report
 
-        Returns Boolean
+        Returns Function
         '''
-        if self.checkPrepare:
 
-            if not self.checkConvertContent:
+        calls = self.profileReport["calls"]
 
-                self.machineCode = ["FirstElement"]
-                self.machineCodeHex = ["FirstElement"]
-                for line in self.content:
-                    self.machineCode.append(self.convertLineToBinary(line))
-                    self.machineCodeHex.append(self.convertLineToHex(line))
-                self.machineCode.pop(0)
-                self.machineCodeHex.pop(0)
-            else:
-                pass
+        def countedFunction(*args, **kwargs):
+            calls[name] += 1
+            return function(*args, **kwargs)
 
-            self.checkConvertContent = True
-            return True
-        else:
-            return False
+        return countedFunction
 
-    def prepare(self):
+    @contextmanager
+    def profilePhase(self, name):
         '''
-        Definition: Prepare function transforms the given file into meaningful data
-        saving it into array while passing it through inherit functions \n
-        Usage: Object.prepare()
+        profilePhase function records the time, line count and memory allocation of the phase
+        it surrounds if profiling is enabled. The phase may set its own line count
 
-        Returns Boolean
+        Yields Phase(Dictionary)
         '''
-        if self.checkFiles():
 
-            # reading the source file
-            if not self.checkSingleLineCommand:
-                fileContent = ['contentarray']
-                with open(self.sourceDirectory, 'r') as file:
+        phase = {"name": name}
+        if self.profileReport is None:
+            yield phase
+            return
 
-                    lines = filter(None, (line.rstrip() for line in file))
+        import tracemalloc
 
-                    jInstruction = False
-                    jalInstruction = False
+        tracemalloc.reset_peak()
+        startMemory = tracemalloc.get_traced_memory()[0]
+        startTime = time.perf_counter()
+        try:
+            yield phase
+        finally:
+            phase["seconds"] = time.perf_counter() - startTime
+            currentMemory, peakMemory = tracemalloc.get_traced_memory()
+            phase["allocated"] = currentMemory - startMemory
+            phase["peak"] = peakMemory - startMemory
+            if "lines" not in phase:
+                phase["lines"] = None if self.content is None else len(self.content)
+            self.profileReport["phases"].append(phase)
+
+    def formatProfile(self):
+        '''
+        formatProfile function turns the profile report into a text table
 
-                    for line in lines:
-                        line = ''.join(re.findall(
-                            r"^[a-zA-Z0-9,#:$\(\)\+\-\s]+", line))
+        Returns String
+        '''
 
-                        line = line.lower()
+        if self.profileReport is None:
+            return ""
 
-                        if line[:2] == 'j ':
-                            jInstruction = True
-                            line = line[2:]
-                        elif line[:4] == 'jal ':
-                            jalInstruction = True
-                            line = line[4:]
-                        else:
-                            pass
+        lines = ["{:<28}{:>12}{:>10}{:>14}{:>14}".format("phase", "seconds", "lines", "allocated", "peak")]
+        for phase in self.profileReport["phases"]:
+            lines.append("{:<28}{:>12.6f}{:>10}{:>14,}{:>14,}".format(
+                phase["name"], phase["seconds"], "-" if phase["lines"] is None else phase["lines"],
+                phase["allocated"], phase["peak"]))
+        lines.append("")
+        lines.append("{:<28}{:>12}".format("helper", "calls"))
+        for name, calls in self.profileReport["calls"].items():
+            lines.append("{:<28}{:>12,}".format(name, calls))
 
-                        line = line.replace(' ', '').replace(
-                            ':', ': ').replace(',', ', ').replace('#', ' # ').replace('$', ' $').replace('( $', '($')
+        if self.scheduleReport is not None:
+            lines.append("")
+            lines.append("{:<28}{:>12}".format("schedule", "count"))
+            for name, count in self.scheduleReport.items():
+                lines.append("{:<28}{:>12,}".format(name, count))
 
-                        if jInstruction:
-                            line = 'j ' + line
-                        elif jalInstruction:
-                            line = 'jal ' + line
-                        else:
-                            pass
+        return "\n".join(lines) + "\n"
 
-                        jInstruction = False
-                        jalInstruction = False
+    def prepare(self):
+        '''
+        Definition: Prepare function transforms the given file into meaningful data
+        saving it into array while passing it through inherit functions \n
+        Usage: Object.prepare()
 
-                        fileContent.append(line.split())
+        Returns Boolean
+        '''
+        self.diagnostics = []
+        with self.profilePhase("checkFiles"):
+            checkFiles = self.checkFiles()
 
-                    fileContent.pop(0)
-                self.content = fileContent
+        if checkFiles:
+            if self.sourceStream is None and not self.checkSingleLineCommand:
+                linecache.checkcache()
 
-            # taking program memory location from the file if exist
-            if self.content[0][0].find('0x') != -1:
-                self.programMemoryLocation = self.content[0][0]
-                self.content.pop(0)
+            # reading the source file lazily into the program while taking its labels
+            if self.checkSingleLineCommand:
+                lines = enumerate(self.content, 1)
             else:
-                self.programMemoryLocation = '0x00000000'
+                lines = self.readSource()
 
-            # self.makeRegularLabel()
+            self.errorMessage = None
+            with self.profilePhase("readSource"):
+                self.takeLabels(self.takeProgramMemoryLocation(lines))
 
-            # preparing content for execution
-            self.content = list(
-                map(lambda line: self.clearCommas(line), self.content))
-            self.content = list(
-                map(lambda line: self.placeVariables(line), self.content))
-            self.content = list(
-                map(lambda line: self.placeOffsets(line), self.content))
+            # the inverted branch of a relaxed branch would take the delay slot of the branch
+            self.relaxedBranches = 0
+            if self.relaxBranches and not self.delaySlots and self.errorMessage is None:
+                with self.profilePhase("relax"):
+                    self.relaxedBranches = self.relax()
 
-            self.takeLabels()
+            if self.scheduleInstructions and self.errorMessage is None:
+                with self.profilePhase("schedule"):
+                    self.schedule()
 
-            self.content = list(
-                map(lambda line: self.fillInTheBlanks(line), self.content))
-            self.content = list(
-                map(lambda line: self.convertPseudoInstruction(line), self.content))
-
-            self.checkPrepare = True
-            return True
+            self.checkConvertContent = False
+            self.checkPrepare = self.errorMessage is None
+            return self.checkPrepare
         else:
             self.checkPrepare = False
             return False
@@ -461,6 +2655,7 @@ class Assembler:
         if(self.checkPrepare):
 
             self.convertContent()
+            singleImage = self.checkSingleImage()
 
             for key, value in kwargs.items():
                 if key == "detailed":
@@ -470,27 +2665,27 @@ class Assembler:
                 if key == "hex":
                     self.previewHex = value
 
-            # print(self.contentLabels)
+            # print(self.symbolTable)
 
             print("Program Memory Location: ", self.programMemoryLocation)
 
             if self.errorMessage:
                 print("Error Message: ", self.errorMessage)
 
+            # the views are joined and written at once, printing each line is slow on large programs
             if self.previewDetailed:
                 print("------------- Detailed View -------------")
-                for lineIndex, line in enumerate(self.content):
-                    print(lineIndex, line)
+                sys.stdout.write("".join("{} 0x{:08x} {}\n".format(lineIndex, address, self.content.tokens(lineIndex))
+                                         for lineIndex, address in enumerate(self.content.addresses)))
 
-            if self.previewHex:
-                previewContent = self.machineCodeHex
-            else:
-                previewContent = self.machineCode
+            if not singleImage:
+                return False
+            previewContent = self.formatMachineCode(self.previewHex)
 
             print("------------- Assembled Code -------------")
             if self.previewLine == "all":
-                for lineIndex, line in enumerate(previewContent):
-                    print(lineIndex, line)
+                sys.stdout.write("".join("{} {}\n".format(lineIndex, line)
+                                         for lineIndex, line in enumerate(previewContent)))
             elif isinstance(self.previewLine, int):
                 print(previewContent[self.previewLine])
             else:
@@ -500,30 +2695,328 @@ class Assembler:
         else:
             return False
 
+    def dataBytes(self, byteOrder):
+        '''
+        dataBytes function returns the data section in the given byte order ("little" or "big")
+
+        Returns Bytes
+        '''
+
+        if byteOrder == self.dataByteOrder:
+            return self.dataImage
+        image = bytearray(self.dataSize)
+        self.encodeData(image, 0, byteOrder)
+        return image
+
+    def sectionImages(self, byteOrder):
+        '''
+        sectionImages function returns the address and the word aligned memory image of each
+        section with the given byte order ("little" or "big"). The data section is packed
+        after the instruction words with its gap filled by zeros unless the gap is larger than
+        MAX_SECTION_GAP bytes, then it is a section of its own
+
+        Returns List
+        '''
+
+        words = array('I', self.machineWords)
+        if byteOrder != sys.byteorder:
+            words.byteswap()
+        origin = int(self.programMemoryLocation, 16)
+        if not self.dataSize:
+            return [(origin, words.tobytes())]
+
+        textEnd = origin + 4 * len(words)
+        dataStart = self.dataLocation & ~3
+        data = bytes(self.dataLocation - dataStart) + self.dataBytes(byteOrder)
+        data += bytes(-len(data) % 4)
+        if 0 <= dataStart - textEnd <= MAX_SECTION_GAP:
+            return [(origin, words.tobytes() + bytes(dataStart - textEnd) + data)]
+        return [(origin, words.tobytes()), (dataStart, data)]
+
+    def checkSingleImage(self):
+        '''
+        checkSingleImage function checks that the sections fit into a single memory image for
+        the execute formats without addresses, and reports an error if they do not
+
+        Returns Boolean
+        '''
+
+        if len(self.sectionImages(self.executeByteOrder)) == 1:
+            return True
+        self.errorMessage = "Data section at 0x{:08x} is too far from the text section for the {} format".format(
+            self.dataLocation, self.executeFormat)
+        self.report("error", self.errorMessage)
+        return False
+
+    def packMachineCode(self, byteOrder):
+        '''
+        packMachineCode function packs the instruction words and the data section into a memory
+        image with the given byte order ("little" or "big"). The gap between the sections is
+        filled with zeros, so the sections should be checked by checkSingleImage first
+
+        Returns Bytes
+        '''
+
+        sections = self.sectionImages(byteOrder)
+        if len(sections) == 1:
+            return sections[0][1]
+        (textAddress, text), (dataAddress, data) = sections
+        return text + bytes(dataAddress - textAddress - len(text)) + data
+
+    def memoryWords(self):
+        '''
+        memoryWords function returns the words of the memory image, which are the instruction
+        words followed by the words of the data section in the execute byte order
+
+        Returns Words(Array)
+        '''
+
+        if not self.dataSize:
+            return self.machineWords
+
+        words = array('I', self.packMachineCode(self.executeByteOrder))
+        if self.executeByteOrder != sys.byteorder:
+            words.byteswap()
+        return words
+
+    def formatText(self, firstIndex=0):
+        '''
+        formatText function turns the instruction words into hex or binary text lines
+        optionally leading by their line index starting from the first index
+
+        Returns String
+        '''
+
+        executeContent = self.formatMachineCode(self.executeFormatHex)
+        if self.executeFormatLineIndex:
+            executeContent = [str(lineIndex) + " " + line for lineIndex, line in enumerate(executeContent, firstIndex)]
+        return "".join(line + "\n" for line in executeContent)
+
+    def formatIntelHex(self):
+        '''
+        formatIntelHex function turns the memory image into Intel HEX records starting from
+        the program memory location, a data section far from the text section starts with
+        an extended address record of its own
+
+        Returns String
+        '''
+
+        records = []
+        upperAddress = None
+
+        for address, image in self.sectionImages(self.executeByteOrder):
+            for index in range(0, len(image), 16):
+                recordAddress = address + index
+                if recordAddress >> 16 != upperAddress:
+                    upperAddress = recordAddress >> 16
+                    records.append(bytes([2, 0, 0, 4]) + upperAddress.to_bytes(2, "big"))
+                data = image[index:index + 16]
+                records.append(bytes([len(data)]) + (recordAddress & 0xFFFF).to_bytes(2, "big") + b"\x00" + data)
+        records.append(bytes([0, 0, 0, 1]))
+
+        return "".join(":{}{:02X}\n".format(record.hex().upper(), -sum(record) & 0xFF) for record in records)
+
+    def formatVerilogMemory(self):
+        '''
+        formatVerilogMemory function turns the instruction words into a memory file for
+        Verilog $readmemh with one word per line, each section after its word address
+
+        Returns String
+        '''
+
+        lines = ["// {} {}\n".format(self.description, self.programMemoryLocation)]
+        for address, image in self.sectionImages(self.executeByteOrder):
+            words = array('I', image)
+            if self.executeByteOrder != sys.byteorder:
+                words.byteswap()
+            lines.append("@{:08X}\n".format(address >> 2))
+            lines.extend("{:08X}\n".format(word) for word in words)
+        return "".join(lines)
+
+    def formatLogisimImage(self):
+        '''
+        formatLogisimImage function turns the instruction words into a Logisim ROM image
+
+        Returns String
+        '''
+
+        words = ["{:08x}".format(word) for word in self.memoryWords()]
+        return "v2.0 raw\n" + "".join(" ".join(words[index:index + 8]) + "\n"
+                                        for index in range(0, len(words), 8))
+
+    def sourceLine(self, lineNumber):
+        '''
+        sourceLine function returns the location of the given line number as text and the
+        source text of the line, which is empty for the source streams
+
+        Returns Tuple
+        '''
+
+        file, line = self.lineLocation(lineNumber)
+        if file is None:
+            return str(line), ""
+        location = str(line) if lineNumber not in self.includedLines else "{}:{}".format(file, line)
+        return location, linecache.getline(file, line).strip()
+
+    def formatListing(self):
+        '''
+        formatListing function turns the encoded program into a listing of the address, the
+        word, the line and the source text of each instruction word, followed by the data
+        lines with their first bytes. The words after the first one of a line are listed
+        without the source text
+
+        Returns String
+        '''
+
+        program = self.content
+        lines = ["{:<10}{:<10}{:<10}{}".format("address", "word", "line", "source")]
+        previous = None
+        for index, (address, lineNumber, word) in enumerate(zip(program.addresses, program.lineNumbers,
+                                                                self.machineWords)):
+            if lineNumber != previous:
+                location, text = self.sourceLine(lineNumber)
+                previous = lineNumber
+            else:
+                location, text = "", ""
+            word = "--------" if index in self.invalidLines else format(word, "08X")
+            lines.append("{:08x}  {}  {:<8}  {}".format(address, word, location, text))
+
+        ends = sorted({offset for _, offset, _ in self.dataLines} | {self.dataSize})
+        for lineNumber, offset, _ in self.dataLines:
+            following = bisect.bisect_right(ends, offset)
+            end = min(ends[following], offset + 4) if following < len(ends) else offset
+            data = self.dataImage[offset:end].hex().upper()
+            location, text = self.sourceLine(lineNumber)
+            lines.append("{:08x}  {:<8}  {:<8}  {}".format(self.dataLocation + offset, data, location, text))
+
+        return "".join(line.rstrip() + "\n" for line in lines)
+
+    def formatSourceMap(self):
+        '''
+        formatSourceMap function turns the line of each instruction word into a JSON source map.
+        The file index and the line of the word at an address are found at the index
+        (address - origin) / 4 of "fileIndexes" and "lines", and the data lines are listed
+        by their addresses. sourceLocation function reads the map back
+
+        Returns String
+        '''
+
+        files = {}
+        locations = [self.lineLocation(lineNumber) for lineNumber in self.content.lineNumbers]
+        data = [(self.dataLocation + offset, self.lineLocation(lineNumber)) for lineNumber, offset, _ in self.dataLines]
+        for file, _ in itertools.chain(locations, (location for _, location in data)):
+            files.setdefault(file, len(files))
+
+        return json.dumps({
+            "version": 1,
+            "origin": self.programMemoryLocation,
+            "files": list(files),
+            "fileIndexes": [files[file] for file, _ in locations],
+            "lines": [line for _, line in locations],
+            "data": [[address, files[file], line] for address, (file, line) in data]
+        }, separators=(",", ":")) + "\n"
+
+    def formatSymbols(self):
+        '''
+        formatSymbols function turns the label table into lines of the address, the section
+        ("T" for text and "D" for data) and the name of each label, ordered by address
+
+        Returns String
+        '''
+
+        return "".join("{:08x} {} {}\n".format(address, "D" if label in self.dataLabels else "T", label)
+                       for label, address in sorted(self.symbolTable.items(), key=lambda item: (item[1], item[0])))
+
+    def writeDebugFiles(self):
+        '''
+        writeDebugFiles function writes the listing, the source map and the symbol file that are
+        given from the encoded program, each file with a single write
+
+        Returns None
+        '''
+
+        for path, formatter in ((self.listingFile, self.formatListing), (self.sourceMapFile, self.formatSourceMap),
+                                (self.symbolFile, self.formatSymbols)):
+            if path is not None:
+                with open(path, "w") as file:
+                    file.write(formatter())
+        return None
+
+    def openTarget(self, binary):
+        '''
+        openTarget function opens the target file, or returns the target stream without
+        closing it, for writing text or bytes
+
+        Returns File
+        '''
+
+        if self.targetStream is not None:
+            return nullcontext(self.targetStream.buffer if binary and hasattr(self.targetStream, "buffer")
+                               else self.targetStream)
+        return open(self.targetDirectory, "wb" if binary else "w+")
+
+    def takeMachineWords(self, words, programMemoryLocation, invalidLines=(), dataSection=None):
+        '''
+        takeMachineWords function takes instruction words that are assembled elsewhere, such as
+        a linked program, so that execute writes them into the target file. The data section
+        is given as its address and its image in the execute byte order
+
+        Returns None
+        '''
+
+        self.machineWords = array('I', words)
+        self.invalidLines = set(invalidLines)
+        self.dataSize = 0
+        self.dataLines = []
+        self.invalidDataLines = set()
+        if dataSection is not None:
+            self.dataLocation, self.dataImage = dataSection[0], bytes(dataSection[1])
+            self.dataSize = len(self.dataImage)
+            self.dataByteOrder = self.executeByteOrder
+        self.programMemoryLocation = programMemoryLocation
+        self.checkPrepare = True
+        self.checkConvertContent = True
+        return None
+
     def execute(self):
         '''
         Definition: Execute function execute all needed process and save the machine code file
-        into given target file \n
+        into given target file in the execute format ("text", "bin", "ihex", "verilog" or "logisim") \n
         Usage: Object.execute()
         '''
         if(self.checkPrepare):
 
             self.convertContent()
 
-            with open(self.targetDirectory, "w+") as file:
-                executeContent = self.machineCodeHex if self.executeFormatHex else self.machineCode
-                for lineIndex, line in enumerate(executeContent):
-                    if self.executeFormatLineIndex:
-                        file.write(str(lineIndex) + " " + line + "\n")
-                    else:
-                        file.write(line + "\n")
+            with self.profilePhase("execute"):
+                formatters = {
+                    "text": self.formatText,
+                    "ihex": self.formatIntelHex,
+                    "verilog": self.formatVerilogMemory,
+                    "logisim": self.formatLogisimImage
+                }
+                if self.executeFormat in SINGLE_IMAGE_FORMATS and not self.checkSingleImage():
+                    return False
+                if self.executeFormat == "bin":
+                    with self.openTarget(True) as file:
+                        file.write(self.packMachineCode(self.executeByteOrder))
+                elif self.executeFormat in formatters:
+                    with self.openTarget(False) as file:
+                        file.write(formatters[self.executeFormat]())
+                else:
+                    self.errorMessage = "Unknown execute format: " + str(self.executeFormat)
+                    return False
+
+            if self.content is not None and any((self.listingFile, self.sourceMapFile, self.symbolFile)):
+                with self.profilePhase("writeDebugFiles"):
+                    self.writeDebugFiles()
 
             return True
         else:
             return False
 
 
-def main():
+def interactive():
 
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -565,10 +3058,12 @@ def main():
     while True:
 
         command = input(">> ")
-        singleLineCommand = []
-        singleLineCommand.insert(0, list(command.split()))
+        singleLineCommand = [assembler.tokenizeLine(command)]
         command = list(command.split())
 
+        if not command:
+            continue
+
         if command[0] == "convert":
             try:
                 assembler.sourceDirectory = BASE_DIR + '/' + "code.src"
@@ -576,8 +3071,8 @@ def main():
                 assembler.prepare()
                 assembler.execute()
                 assembler.preview(detailed=False)
-            except:
-                print("There is a problem!")
+            except Exception as error:
+                print("There is a problem!", error)
             # exit()
 
         elif command[0] == "source":
@@ -598,12 +3093,23 @@ def main():
             else:
                 print("There is a problem with files!")
 
+        elif command[0] == "stream":
+            if assembler.stream():
+                print("Streaming process is done!")
+            else:
+                print("There is a problem with files!")
+
         elif command[0] == "preview":
             if assembler.preview(detailed=False):
                 pass
             else:
                 print('First, you need to use "prepare" command!')
 
+        elif command[0] == "format":
+            assembler.executeFormat = command[1]
+            if len(command) > 2:
+                assembler.executeByteOrder = command[2]
+
         elif command[0] == "clear":
             os.system('cls' if os.name == 'nt' else 'clear')
 
@@ -616,7 +3122,7 @@ def main():
             temp.content = singleLineCommand
             temp.prepare()
 
-            tempMachineCode = temp.convertLineToHex(temp.content[0])
+            tempMachineCode = " ".join(temp.convertLineToHex(line) for line in temp.content)
 
             if tempMachineCode:
                 print(tempMachineCode)
@@ -626,5 +3132,127 @@ def main():
             del temp
 
 
+def main(arguments=None):
+    '''
+    Definition: main function is the command line interface of the assembler. It returns 0 on
+    success, 1 if the source can not be read or written and 2 if some lines can not be encoded \n
+    Usage: python assembler.py [SOURCE] [-o TARGET] [-f FORMAT] [--origin ADDRESS]
+    '''
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Assemble a MIPS source file into machine code")
+    parser.add_argument("source", nargs="?", default="-",
+                        help="source file, '-' reads the standard input")
+    parser.add_argument("-o", "--output", default="-",
+                        help="target file, '-' writes the standard output")
+    parser.add_argument("-f", "--format", default="text", choices=sorted(OUTPUT_EXTENSIONS),
+                        help="execute format of the target")
+    parser.add_argument("-b", "--binary", action="store_true",
+                        help="write binary text instead of hex text for the text format")
+    parser.add_argument("-n", "--line-index", action="store_true",
+                        help="lead each line of the text format by its line index")
+    parser.add_argument("--byte-order", default="big", choices=["big", "little"],
+                        help="byte order of the bin and ihex formats")
+    parser.add_argument("--origin", default=None,
+                        help="program memory location such as 0x00400000, overrides the source")
+    parser.add_argument("--stream", action="store_true",
+                        help="assemble in two lazy passes without keeping the program in memory")
+    parser.add_argument("-I", "--include-directory", action="append", default=[],
+                        help="directory searched for the .include files after the directory of the including file")
+    parser.add_argument("--schedule", action="store_true",
+                        help="reorder the instructions of each basic block to avoid pipeline stalls")
+    parser.add_argument("--delay-slots", action="store_true",
+                        help="treat the line after each branch or jump as its delay slot and fill its noop "
+                             "while scheduling")
+    parser.add_argument("--no-relax", action="store_true",
+                        help="report the branches and jumps that can not reach their label instead of relaxing them")
+    parser.add_argument("--listing", default=None,
+                        help="file of the address, word and source line of each instruction")
+    parser.add_argument("--source-map", default=None,
+                        help="JSON file of the source file and line of each address")
+    parser.add_argument("--symbols", default=None, help="file of the address and section of each label")
+    parser.add_argument("--cache", default=None,
+                        help="file of the tokens of the source lines that is reused and updated between runs")
+    parser.add_argument("--vectorize", action="store_true",
+                        help="encode the whole program with NumPy array operations if NumPy is installed")
+    parser.add_argument("--profile", action="store_true",
+                        help="print the time, lines and memory of each phase to the standard error")
+    parser.add_argument("-i", "--interactive", action="store_true",
+                        help="start the interactive mode")
+    arguments = parser.parse_args(arguments)
+
+    if arguments.interactive:
+        interactive()
+        return 0
+
+    if arguments.origin is not None and parseAddress(arguments.origin) is None:
+        parser.error("origin should be a word aligned hex address such as 0x00400000")
+    if arguments.stream and (arguments.schedule or arguments.delay_slots):
+        parser.error("scheduling needs the whole program, it can not be streamed")
+    if arguments.stream and (arguments.listing or arguments.source_map or arguments.symbols):
+        parser.error("listings, source maps and symbol files need the whole program, they can not be streamed")
+
+    assembler = Assembler(origin=arguments.origin)
+    assembler.executeFormat = arguments.format
+    assembler.executeFormatHex = not arguments.binary
+    assembler.executeFormatLineIndex = arguments.line_index
+    assembler.executeByteOrder = arguments.byte_order
+    assembler.vectorizedEncoding = arguments.vectorize
+    assembler.includeDirectories = arguments.include_directory
+    assembler.scheduleInstructions = arguments.schedule or arguments.delay_slots
+    assembler.delaySlots = arguments.delay_slots
+    assembler.relaxBranches = not arguments.no_relax
+    assembler.listingFile = arguments.listing
+    assembler.sourceMapFile = arguments.source_map
+    assembler.symbolFile = arguments.symbols
+
+    if arguments.cache:
+        assembler.loadCache(arguments.cache)
+    if arguments.profile:
+        assembler.enableProfile()
+
+    if arguments.source == "-":
+        assembler.sourceStream = sys.stdin
+    else:
+        assembler.sourceDirectory = arguments.source
+    if arguments.output == "-":
+        assembler.targetStream = sys.stdout
+    else:
+        assembler.targetDirectory = arguments.output
+
+    try:
+        if arguments.stream:
+            success = assembler.stream()
+        else:
+            success = assembler.prepare() and assembler.execute()
+    except OSError as error:
+        print("{}: {}".format(parser.prog, error), file=sys.stderr)
+        return 1
+
+    if arguments.cache:
+        assembler.saveCache(arguments.cache)
+    if arguments.profile:
+        assembler.disableProfile()
+        print(assembler.formatProfile(), end="", file=sys.stderr)
+    print(assembler.formatDiagnostics(), end="", file=sys.stderr)
+
+    if not success:
+        if not assembler.errorCount():
+            print("{}: {}".format(parser.prog, assembler.errorMessage or
+                                  "source file can not be read: " + arguments.source), file=sys.stderr)
+        return 1
+
+    # the preprocessor errors leave no invalid line behind, so the errors are counted
+    errors = assembler.errorCount()
+    if errors:
+        invalidLines = len(assembler.invalidLines) + len(assembler.invalidDataLines)
+        print("{}: {}".format(parser.prog, "{} lines could not be encoded".format(invalidLines) if invalidLines
+                              else "{} error{}".format(errors, "" if errors == 1 else "s")), file=sys.stderr)
+        return 2
+
+    return 0
+
+
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
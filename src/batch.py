@@ -0,0 +1,170 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from assembler import Assembler, OUTPUT_EXTENSIONS
+
+
+def collectSources(patterns):
+    '''
+    collectSources function expands the given file names, glob patterns and directories
+    into a sorted list of source files without duplicates
+
+    Returns List
+    '''
+
+    sources = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*.src")
+        matches = glob.glob(pattern, recursive=True)
+        sources.update(matches if matches else [pattern])
+
+    return sorted(sources)
+
+
+def targetOf(source, outputDirectory, executeFormat):
+    '''
+    targetOf function returns the target file of the given source file for the execute format
+
+    Returns String
+    '''
+
+    name = os.path.splitext(os.path.basename(source))[0] + OUTPUT_EXTENSIONS[executeFormat]
+    return os.path.join(outputDirectory if outputDirectory else os.path.dirname(source), name)
+
+
+def assembleFile(source, target, executeFormat="text", executeFormatHex=True, includeDirectories=()):
+    '''
+    assembleFile function assembles a single source file into the target file with an
+    independent Assembler object. The included files are cached by the preprocessor of the
+    worker process, so a shared header is read once by each worker
+
+    Returns Dictionary
+    '''
+
+    startTime = time.perf_counter()
+    result = {"source": source, "target": target, "success": False, "lines": 0, "error": None,
+              "diagnostics": []}
+
+    try:
+        assembler = Assembler(source=source, target=target)
+        assembler.executeFormat = executeFormat
+        assembler.executeFormatHex = executeFormatHex
+        assembler.includeDirectories = list(includeDirectories)
+
+        if not assembler.prepare():
+            result["error"] = assembler.errorMessage or "Source file can not be read"
+        elif not assembler.execute():
+            result["error"] = assembler.errorMessage
+        else:
+            result["lines"] = len(assembler.content)
+            invalidLines = len(assembler.invalidLines) + len(assembler.invalidDataLines)
+            errors = assembler.errorCount()
+            if invalidLines:
+                result["error"] = "{} lines could not be encoded".format(invalidLines)
+            elif errors:
+                result["error"] = "{} error{}".format(errors, "" if errors == 1 else "s")
+            else:
+                result["success"] = True
+        result["diagnostics"] = [str(diagnostic) for diagnostic in assembler.diagnostics]
+        result["includedFiles"] = dict(assembler.includedFiles)
+    except Exception as error:
+        result["error"] = "{}: {}".format(type(error).__name__, error)
+
+    result["seconds"] = time.perf_counter() - startTime
+    return result
+
+
+def assembleBatch(sources, outputDirectory=None, executeFormat="text", executeFormatHex=True,
+                  workers=None, report=None, includeDirectories=()):
+    '''
+    assembleBatch function assembles the given source files across a process pool and
+    calls report with the result of each file as soon as it is finished
+
+    Returns List
+    '''
+
+    if outputDirectory:
+        os.makedirs(outputDirectory, exist_ok=True)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(assembleFile, source, targetOf(source, outputDirectory, executeFormat),
+                                   executeFormat, executeFormatHex, includeDirectories)
+                   for source in sources]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if report:
+                report(result)
+
+    results.sort(key=lambda result: result["source"])
+    return results
+
+
+def summarize(results, seconds):
+    '''
+    summarize function returns the summary text of the batch results
+
+    Returns String
+    '''
+
+    failed = [result for result in results if not result["success"]]
+    lines = sum(result["lines"] for result in results)
+    return "{} files, {} succeeded, {} failed, {} lines in {:.3f} seconds".format(
+        len(results), len(results) - len(failed), len(failed), lines, seconds)
+
+
+def printResult(result):
+    '''
+    printResult function prints the status of a single file of the batch
+    '''
+
+    if result["success"]:
+        print("OK     {} -> {} ({} lines, {:.3f} s)".format(
+            result["source"], result["target"], result["lines"], result["seconds"]))
+    else:
+        print("FAILED {}: {}".format(result["source"], result["error"]))
+    for diagnostic in result["diagnostics"]:
+        print("       " + diagnostic)
+
+
+def main(arguments=None):
+
+    parser = argparse.ArgumentParser(description="Assemble many MIPS source files in parallel")
+    parser.add_argument("sources", nargs="+",
+                        help="source files, glob patterns or directories of .src files")
+    parser.add_argument("-o", "--output", default=None,
+                        help="directory of the target files, next to the sources by default")
+    parser.add_argument("-f", "--format", default="text", choices=sorted(OUTPUT_EXTENSIONS),
+                        help="execute format of the target files")
+    parser.add_argument("-b", "--binary", action="store_true",
+                        help="write binary text instead of hex text for the text format")
+    parser.add_argument("-I", "--include-directory", action="append", default=[],
+                        help="directory searched for the .include files after the directory of the including file")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="number of worker processes, the CPU count by default")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="only print failed files and the summary")
+    arguments = parser.parse_args(arguments)
+
+    sources = collectSources(arguments.sources)
+    startTime = time.perf_counter()
+    results = assembleBatch(sources, arguments.output, arguments.format, not arguments.binary,
+                            arguments.workers,
+                            None if arguments.quiet else printResult, arguments.include_directory)
+    if arguments.quiet:
+        for result in results:
+            if not result["success"]:
+                printResult(result)
+
+    print(summarize(results, time.perf_counter() - startTime))
+    return 0 if all(result["success"] for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
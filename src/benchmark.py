@@ -0,0 +1,243 @@
+import argparse
+import bisect
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from assembler import Assembler
+
+# instructions of each kind of the instruction mix
+INSTRUCTION_MIX = {
+    "r": ["add", "addu", "and", "or", "slt", "sltu", "sub", "subu", "xor", "sllv", "srlv", "sll", "sra"],
+    "i": ["addi", "addiu", "andi", "ori", "slti", "sltiu", "xori", "lui"],
+    "memory": ["lw", "sw", "lb", "sb"],
+    "branch": ["beq", "bne", "bgez", "bltz", "blez", "bgtz"],
+    "j": ["j", "jal"]
+}
+
+# default weights of the instruction mix
+DEFAULT_MIX = {"r": 40, "i": 25, "memory": 20, "branch": 10, "j": 5}
+
+# registers used by the synthetic programs
+REGISTERS = ["$t{}".format(index) for index in range(10)] + ["$s{}".format(index) for index in range(8)]
+
+# largest distance in lines between a branch and its label, kept inside the 16 bit offset
+BRANCH_WINDOW = 4096
+
+
+def generateProgram(size, mix=None, labelDensity=0.05, seed=0, origin=None):
+    '''
+    generateProgram function generates a synthetic MIPS program with the given number of
+    instructions. The mix keeps the weight of each kind of instruction ("r", "i", "memory",
+    "branch" and "j") and the label density is the probability of a line having a label
+
+    Returns Lines(List)
+    '''
+
+    generator = random.Random(seed)
+    mix = mix if mix else DEFAULT_MIX
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+
+    labelLines = [0] + [index for index in range(1, size) if generator.random() < labelDensity]
+    labels = set(labelLines)
+
+    def register():
+        return generator.choice(REGISTERS)
+
+    def nearbyLabel(index):
+        first = bisect.bisect_left(labelLines, index - BRANCH_WINDOW)
+        last = bisect.bisect_right(labelLines, index + BRANCH_WINDOW)
+        return "l{}".format(labelLines[generator.randrange(first, last)])
+
+    lines = [origin] if origin else []
+    for index, kind in enumerate(generator.choices(kinds, weights, k=size)):
+        mnemonic = generator.choice(INSTRUCTION_MIX[kind])
+
+        if mnemonic in ("sll", "sra"):
+            operands = "{}, {}, {}".format(register(), register(), generator.randrange(32))
+        elif kind == "r":
+            operands = "{}, {}, {}".format(register(), register(), register())
+        elif mnemonic == "lui":
+            operands = "{}, {}".format(register(), generator.randrange(0x10000))
+        elif mnemonic in ("andi", "ori", "xori"):
+            operands = "{}, {}, {}".format(register(), register(), generator.randrange(0x10000))
+        elif kind == "i":
+            operands = "{}, {}, {}".format(register(), register(), generator.randrange(-0x8000, 0x8000))
+        elif kind == "memory":
+            operands = "{}, {}({})".format(register(), 4 * generator.randrange(-64, 64), register())
+        elif mnemonic in ("beq", "bne"):
+            operands = "{}, {}, {}".format(register(), register(), nearbyLabel(index))
+        elif kind == "branch":
+            operands = "{}, {}".format(register(), nearbyLabel(index))
+        else:
+            operands = generator.choice(["l{}".format(line) for line in labelLines[-16:]] + [nearbyLabel(index)])
+
+        label = "l{}: ".format(index) if index in labels else ""
+        lines.append("{}{} {}".format(label, mnemonic, operands))
+
+    return lines
+
+
+def writeProgram(path, lines):
+    '''
+    writeProgram function writes the lines of a program into the given file
+    '''
+
+    with open(path, "w") as file:
+        file.write("\n".join(lines) + "\n")
+
+
+def runPhases(source, target, executeFormat, vectorizedEncoding=False):
+    '''
+    runPhases function assembles the source file once and measures the time of each phase
+
+    Returns Dictionary
+    '''
+
+    assembler = Assembler(source=source, target=target)
+    assembler.executeFormat = executeFormat
+    assembler.vectorizedEncoding = vectorizedEncoding
+
+    phases = {}
+    startTime = time.perf_counter()
+    assembler.prepare()
+    phases["prepare"] = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    assembler.convertContent()
+    phases["convertContent"] = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    assembler.execute()
+    phases["execute"] = time.perf_counter() - startTime
+
+    return phases, len(assembler.content)
+
+
+def runBenchmark(source, repeat=5, executeFormat="text", vectorizedEncoding=False):
+    '''
+    runBenchmark function assembles the source file repeatedly and returns the best time of
+    each phase, the throughput and the peak memory of a traced run
+
+    Returns Dictionary
+    '''
+
+    with tempfile.TemporaryDirectory() as directory:
+        target = os.path.join(directory, "result")
+
+        best = None
+        for _ in range(repeat):
+            phases, lines = runPhases(source, target, executeFormat, vectorizedEncoding)
+            best = phases if best is None else {phase: min(best[phase], phases[phase]) for phase in phases}
+
+        tracemalloc.start()
+        runPhases(source, target, executeFormat, vectorizedEncoding)
+        peakMemory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    total = sum(best.values())
+    return {
+        "source": source,
+        "lines": lines,
+        "format": executeFormat,
+        "vectorized": vectorizedEncoding,
+        "repeat": repeat,
+        "phases": best,
+        "total": total,
+        "linesPerSecond": lines / total if total else None,
+        "peakMemory": peakMemory
+    }
+
+
+def compareResults(results, baseline):
+    '''
+    compareResults function returns the speedup of each result against the result of the
+    same benchmark in the baseline, greater than one means faster
+
+    Returns Dictionary
+    '''
+
+    baselineResults = {result["name"]: result for result in baseline["results"]}
+    speedups = {}
+    for result in results:
+        previous = baselineResults.get(result["name"])
+        if previous and result["total"]:
+            speedups[result["name"]] = {
+                phase: previous["phases"][phase] / seconds if seconds else None
+                for phase, seconds in result["phases"].items()
+            }
+            speedups[result["name"]]["total"] = previous["total"] / result["total"]
+    return speedups
+
+
+def main(arguments=None):
+
+    parser = argparse.ArgumentParser(description="Benchmark the assembler on synthetic MIPS programs")
+    parser.add_argument("-s", "--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="number of instructions of the generated programs")
+    parser.add_argument("--mix", default=None,
+                        help="weights of the instruction mix such as r=40,i=25,memory=20,branch=10,j=5")
+    parser.add_argument("--label-density", type=float, default=0.05,
+                        help="probability of a line having a label")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the program generator")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="number of timed runs")
+    parser.add_argument("-f", "--format", default="text", help="execute format of the target")
+    parser.add_argument("--vectorize", action="store_true", help="use the vectorized NumPy encoder")
+    parser.add_argument("--source", nargs="*", default=[], help="also benchmark these source files")
+    parser.add_argument("-o", "--output", default=None, help="JSON file of the results")
+    parser.add_argument("--compare", default=None, help="JSON file of earlier results to compare with")
+    arguments = parser.parse_args(arguments)
+
+    mix = None
+    if arguments.mix:
+        mix = {kind: float(weight) for kind, weight in (item.split("=") for item in arguments.mix.split(","))}
+        unknownKinds = set(mix) - set(INSTRUCTION_MIX)
+        if unknownKinds:
+            parser.error("unknown instruction kinds: " + ", ".join(sorted(unknownKinds)))
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        benchmarks = [("file:" + source, source) for source in arguments.source]
+        for size in arguments.sizes:
+            source = os.path.join(directory, "synthetic{}.src".format(size))
+            writeProgram(source, generateProgram(size, mix, arguments.label_density, arguments.seed))
+            benchmarks.append(("synthetic:{}".format(size), source))
+
+        for name, source in benchmarks:
+            result = runBenchmark(source, arguments.repeat, arguments.format, arguments.vectorize)
+            result["name"] = name
+            results.append(result)
+            print("{:<20} {:>9} lines  prepare {:.4f} s  convert {:.4f} s  execute {:.4f} s  "
+                  "{:>11,.0f} lines/s  peak {:,} bytes".format(
+                      name, result["lines"], result["phases"]["prepare"], result["phases"]["convertContent"],
+                      result["phases"]["execute"], result["linesPerSecond"] or 0, result["peakMemory"]))
+
+    report = {
+        "version": Assembler().version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results
+    }
+
+    if arguments.compare:
+        with open(arguments.compare, "r") as file:
+            report["speedups"] = compareResults(results, json.load(file))
+        for name, speedups in report["speedups"].items():
+            print("{:<20} speedup {:.2f}x".format(name, speedups["total"]))
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(report, file, indent=4)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
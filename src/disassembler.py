@@ -0,0 +1,340 @@
+import argparse
+import os
+import sys
+from array import array
+from contextlib import nullcontext
+
+from assembler import (DECODE_TABLE, FIELD_SHIFTS, INSTRUCTION_FORMATS, MNEMONICS, OUTPUT_EXTENSIONS,
+                       REGISTER_FILE, decodeKey, parseAddress)
+
+# register name of each register number, the names are preferred over the numbers
+REGISTER_NAMES = {number: name for name, number in REGISTER_FILE.items()}
+
+# instructions whose immediate is unsigned and written in hex
+UNSIGNED_IMMEDIATES = {"andi", "ori", "xori", "lui"}
+
+# execute format of each target file extension
+INPUT_FORMATS = {extension: executeFormat for executeFormat, extension in OUTPUT_EXTENSIONS.items()}
+
+# number of bytes read at once from the raw binary images
+CHUNK_SIZE = 1 << 16
+
+
+def readText(file, origin):
+    '''
+    readText generator yields the address and the word of each line of hex or binary text,
+    optionally leading by its line index. The word is None for the lines that could not be
+    encoded
+
+    Yields Tuple
+    '''
+
+    address = origin
+    for line in file:
+        tokens = line.split()
+        if not tokens:
+            continue
+        text = tokens[-1]
+        if text.startswith("error"):
+            yield address, None
+        elif len(text) == 32 and not text.strip("01"):
+            yield address, int(text, 2)
+        else:
+            yield address, int(text, 16)
+        address += 4
+
+
+def readBinary(file, origin, byteOrder):
+    '''
+    readBinary generator yields the address and the word of each four bytes of a raw binary
+    image with the given byte order, reading the image in chunks
+
+    Yields Tuple
+    '''
+
+    address = origin
+    remainder = b""
+    while True:
+        chunk = file.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        chunk = remainder + chunk
+        size = len(chunk) - len(chunk) % 4
+        remainder = chunk[size:]
+
+        words = array('I')
+        words.frombytes(chunk[:size])
+        if byteOrder != sys.byteorder:
+            words.byteswap()
+        for word in words:
+            yield address, word
+            address += 4
+
+
+def readIntelHex(file, byteOrder):
+    '''
+    readIntelHex generator yields the address and the word of each four bytes of the data
+    records of an Intel HEX file with the given byte order
+
+    Yields Tuple
+    '''
+
+    upperAddress = 0
+    pending = bytearray()
+    pendingAddress = None
+
+    for line in file:
+        line = line.strip()
+        if not line.startswith(":"):
+            continue
+        record = bytes.fromhex(line[1:])
+        if sum(record) & 0xFF or len(record) != record[0] + 5:
+            raise ValueError("broken Intel HEX record: " + line)
+
+        kind, data = record[3], record[4:-1]
+        if kind == 1:
+            break
+        elif kind == 4:
+            upperAddress = int.from_bytes(data, "big") << 16
+        elif kind == 0:
+            address = upperAddress | int.from_bytes(record[1:3], "big")
+            if pendingAddress is None or pendingAddress + len(pending) != address:
+                pending = bytearray()
+                pendingAddress = address
+            pending += data
+
+            size = len(pending) - len(pending) % 4
+            for offset in range(0, size, 4):
+                yield pendingAddress + offset, int.from_bytes(pending[offset:offset + 4], byteOrder)
+            pendingAddress += size
+            del pending[:size]
+
+
+def readVerilogMemory(file, origin):
+    '''
+    readVerilogMemory generator yields the address and the word of each word of a Verilog
+    memory file, the "@" lines give the word address of the following words
+
+    Yields Tuple
+    '''
+
+    address = origin
+    for line in file:
+        for token in line.split("//")[0].split():
+            if token.startswith("@"):
+                address = int(token[1:], 16) << 2
+            else:
+                yield address, int(token, 16)
+                address += 4
+
+
+def readLogisimImage(file, origin):
+    '''
+    readLogisimImage generator yields the address and the word of each word of a Logisim ROM
+    image, including the repeated words written as "COUNT*WORD"
+
+    Yields Tuple
+    '''
+
+    address = origin
+    for line in file:
+        if line.startswith("v2.0"):
+            continue
+        for token in line.split("#")[0].split():
+            count, _, text = token.rpartition("*")
+            for _ in range(int(count) if count else 1):
+                yield address, int(text, 16)
+                address += 4
+
+
+def readWords(file, executeFormat, origin=0, byteOrder="big"):
+    '''
+    readWords function returns the generator of the addresses and words of the given file in
+    the execute format ("text", "bin", "ihex", "verilog" or "logisim")
+
+    Returns Iterator
+    '''
+
+    if executeFormat == "text":
+        return readText(file, origin)
+    elif executeFormat == "bin":
+        return readBinary(file, origin, byteOrder)
+    elif executeFormat == "ihex":
+        return readIntelHex(file, byteOrder)
+    elif executeFormat == "verilog":
+        return readVerilogMemory(file, origin)
+    elif executeFormat == "logisim":
+        return readLogisimImage(file, origin)
+    raise ValueError("unknown execute format: " + str(executeFormat))
+
+
+def decodeTarget(word, address, field):
+    '''
+    decodeTarget function returns the address that the label or target field of the given
+    instruction word at the given address points to
+
+    Returns Integer
+    '''
+
+    if field == "label":
+        offset = word & 0xFFFF
+        return address + 4 + ((offset ^ 0x8000) - 0x8000 << 2) & 0xFFFFFFFF
+    return (address + 4) & 0xF0000000 | (word & 0x3FFFFFF) << 2
+
+
+def collectLabels(words):
+    '''
+    collectLabels function returns the addresses that the branches and jumps of the given
+    words point to
+
+    Returns Set
+    '''
+
+    labels = set()
+    for address, word in words:
+        number = None if word is None else DECODE_TABLE.get(decodeKey(word))
+        if number is None:
+            continue
+        for field in INSTRUCTION_FORMATS[MNEMONICS[number]][3]:
+            if field == "label" or field == "target":
+                labels.add(decodeTarget(word, address, field))
+    return labels
+
+
+def labelName(address):
+    '''
+    labelName function returns the name of the label of the given address
+
+    Returns String
+    '''
+
+    return "l_{:08x}".format(address)
+
+
+def formatInstruction(word, address):
+    '''
+    formatInstruction function turns the given instruction word at the given address into
+    its source text, the branch and jump targets are written as labels
+
+    Returns String
+    '''
+
+    if word == 0:
+        return "noop"
+
+    number = DECODE_TABLE.get(decodeKey(word))
+    if number is None:
+        return ".word 0x{:08X}".format(word)
+
+    mnemonic = MNEMONICS[number]
+    immediate = word & 0xFFFF
+    if mnemonic not in UNSIGNED_IMMEDIATES:
+        immediate = (immediate ^ 0x8000) - 0x8000
+
+    operands = []
+    for field in INSTRUCTION_FORMATS[mnemonic][3]:
+        if field in FIELD_SHIFTS:
+            operands.append(REGISTER_NAMES[word >> FIELD_SHIFTS[field] & 0x1F])
+        elif field == "shamt":
+            operands.append(str(word >> 6 & 0x1F))
+        elif field == "imm":
+            operands.append("0x{:04x}".format(immediate) if mnemonic in UNSIGNED_IMMEDIATES else str(immediate))
+        elif field == "offset":
+            operands.append("{}({})".format(immediate, REGISTER_NAMES[word >> 21 & 0x1F]))
+        else:
+            operands.append(labelName(decodeTarget(word, address, field)))
+
+    return mnemonic + (" " + ", ".join(operands) if operands else "")
+
+
+def disassemble(words, labels, file, addresses=False):
+    '''
+    disassemble function writes the source text of the given words into the given file,
+    starting with the address of the first word as the program memory location. Each label
+    of the given addresses is written before its instruction
+
+    Returns Integer
+    '''
+
+    count = 0
+    for address, word in words:
+        if not count:
+            file.write("0x{:08x}\n".format(address))
+        if address in labels:
+            file.write(labelName(address) + ":\n")
+        if word is None:
+            line = "# errorAtHexConversion"
+        else:
+            line = formatInstruction(word, address)
+        if addresses:
+            line = "{:<36}# {:08x} {}".format(line, address, "-" * 8 if word is None else "{:08X}".format(word))
+        file.write("        " + line + "\n")
+        count += 1
+
+    return count
+
+
+def main(arguments=None):
+
+    parser = argparse.ArgumentParser(description="Disassemble MIPS machine code into source text")
+    parser.add_argument("source", nargs="?", default="-",
+                        help="machine code file, '-' reads the standard input")
+    parser.add_argument("-o", "--output", default="-", help="source file, '-' writes the standard output")
+    parser.add_argument("-f", "--format", default=None, choices=sorted(OUTPUT_EXTENSIONS),
+                        help="execute format of the machine code, guessed from the file extension by default")
+    parser.add_argument("--byte-order", default="big", choices=["big", "little"],
+                        help="byte order of the bin and ihex formats")
+    parser.add_argument("--origin", default="0x00000000",
+                        help="address of the first word of the formats without addresses")
+    parser.add_argument("-a", "--addresses", action="store_true",
+                        help="follow each instruction by its address and word")
+    parser.add_argument("--no-labels", action="store_true",
+                        help="read the machine code once and write the targets without label lines")
+    arguments = parser.parse_args(arguments)
+
+    origin = parseAddress(arguments.origin)
+    if origin is None:
+        parser.error("origin should be a word aligned hex address such as 0x00400000")
+
+    executeFormat = arguments.format
+    if executeFormat is None:
+        executeFormat = INPUT_FORMATS.get(os.path.splitext(arguments.source)[1], "text")
+    binary = executeFormat == "bin"
+
+    def openSource():
+        if arguments.source == "-":
+            return nullcontext(sys.stdin.buffer if binary else sys.stdin)
+        return open(arguments.source, "rb" if binary else "r")
+
+    try:
+        words = None
+        labels = set()
+        if not arguments.no_labels:
+            # the labels take a first pass, the standard input can be read only once so its
+            # words are kept in memory
+            with openSource() as file:
+                if arguments.source == "-":
+                    words = list(readWords(file, executeFormat, origin, arguments.byte_order))
+                    labels = collectLabels(words)
+                else:
+                    labels = collectLabels(readWords(file, executeFormat, origin, arguments.byte_order))
+
+        with nullcontext(sys.stdout) if arguments.output == "-" else open(arguments.output, "w") as target:
+            if words is not None:
+                disassemble(words, labels, target, arguments.addresses)
+            else:
+                with openSource() as file:
+                    disassemble(readWords(file, executeFormat, origin, arguments.byte_order), labels, target,
+                                arguments.addresses)
+    except OSError as error:
+        print("{}: {}".format(parser.prog, error), file=sys.stderr)
+        return 1
+    except ValueError as error:
+        print("{}: can not read the machine code: {}".format(parser.prog, error), file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
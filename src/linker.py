@@ -0,0 +1,356 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+from functools import lru_cache
+
+from assembler import Assembler, INSTRUCTION_PLANS, OUTPUT_EXTENSIONS, SYMBOL_FIELDS
+
+# version of the layout of the relocatable objects and the extension of the object files
+OBJECT_FORMAT = 1
+OBJECT_EXTENSION = ".o"
+
+
+def hashFile(path):
+    '''
+    hashFile function returns the SHA-256 digest of the content of the given file
+
+    Returns String
+    '''
+
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def encoderDigest():
+    '''
+    encoderDigest function returns the digest of the assembler module, so the cached objects
+    are assembled again after any change to the encoder
+
+    Returns String
+    '''
+
+    return hashFile(sys.modules[Assembler.__module__].__file__)
+
+
+def assembleObject(source):
+    '''
+    assembleObject function assembles a single source file as a relocatable module starting
+    from address zero. Branches to labels of the module are resolved, while jumps, label
+    addresses of la and branches to other modules are recorded as relocations ("abs26", "hi16",
+    "lo16" or "pc16") for the linker
+
+    Returns Dictionary
+    '''
+
+    assembler = Assembler(source=source, origin="0x00000000")
+    if not assembler.prepare():
+        raise OSError("source file can not be read: " + source)
+    if assembler.dataSize:
+        raise ValueError("data sections can not be linked: " + source)
+
+    program = assembler.content
+    symbols = dict(assembler.symbolTable)
+    relocations = []
+
+    for index, line in enumerate(program):
+        if line[0] >= len(INSTRUCTION_PLANS):
+            continue
+        for field, value in zip(INSTRUCTION_PLANS[line[0]][1], line[1:4]):
+            name = program.symbols[value] if field in SYMBOL_FIELDS else None
+            if field == "target":
+                relocations.append([index, "abs26", name])
+            elif field == "high" or field == "low":
+                relocations.append([index, "hi16" if field == "high" else "lo16", name])
+            elif field == "label" and name not in symbols:
+                relocations.append([index, "pc16", name])
+
+    # symbols of other modules are encoded as zero, their relocations overwrite the fields
+    assembler.externalSymbols = frozenset(name for name in program.symbols if name not in symbols)
+    assembler.convertContent()
+
+    return {
+        "format": OBJECT_FORMAT,
+        "encoder": encoderDigest(),
+        "source": source,
+        "words": assembler.machineWords.tolist(),
+        "invalid": sorted(assembler.invalidLines),
+        "diagnostics": [str(diagnostic) for diagnostic in assembler.diagnostics if diagnostic.severity == "error"],
+        "lineNumbers": program.lineNumbers.tolist(),
+        "includedLines": {str(lineNumber): location for lineNumber, location in assembler.includedLines.items()},
+        "includes": {path: hashFile(path) for path in assembler.includedFiles},
+        "symbols": symbols,
+        "relocations": relocations
+    }
+
+
+def lineLocation(module, index):
+    '''
+    lineLocation function returns the file and the line of the instruction at the given index
+    of the module as text, the instructions of the included files are given their own files
+
+    Returns String
+    '''
+
+    lineNumber = module["lineNumbers"][index]
+    file, line = module.get("includedLines", {}).get(str(lineNumber), (module["source"], lineNumber))
+    return "{}:{}".format(file, line)
+
+
+def includesUnchanged(module):
+    '''
+    includesUnchanged function checks if the files included by the module still have the
+    digests they had when it was assembled
+
+    Returns Boolean
+    '''
+
+    try:
+        return all(hashFile(path) == digest for path, digest in module.get("includes", {}).items())
+    except OSError:
+        return False
+
+
+def loadObject(path):
+    '''
+    loadObject function reads a relocatable object file, returns None if it can not be read
+
+    Returns Dictionary or None
+    '''
+
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def readObject(path):
+    '''
+    readObject function reads the relocatable object file given as an input of the linker, it
+    fails if the file is not an object of this format
+
+    Returns Dictionary
+    '''
+
+    module = loadObject(path)
+    if not isinstance(module, dict) or module.get("format") != OBJECT_FORMAT:
+        raise ValueError("not a relocatable object of format {}: {}".format(OBJECT_FORMAT, path))
+    return module
+
+
+def saveObject(path, module):
+    '''
+    saveObject function writes the relocatable object into the given file
+    '''
+
+    with open(path, "w") as file:
+        json.dump(module, file)
+
+
+def objectFor(source, cacheDirectory=None):
+    '''
+    objectFor function returns the relocatable object of the source file. The object is reused
+    from the cache directory if neither the source nor its included files have changed since
+    it was assembled by the same encoder
+
+    Returns Tuple(Dictionary, Boolean)
+    '''
+
+    if cacheDirectory is None:
+        return assembleObject(source), False
+
+    digest = hashFile(source)
+    path = os.path.join(cacheDirectory, hashlib.sha1(os.path.abspath(source).encode()).hexdigest() + ".json")
+
+    module = loadObject(path)
+    if module and module.get("hash") == digest and module.get("format") == OBJECT_FORMAT and \
+            module.get("encoder") == encoderDigest() and includesUnchanged(module):
+        module["source"] = source
+        return module, True
+
+    module = assembleObject(source)
+    module["hash"] = digest
+    os.makedirs(cacheDirectory, exist_ok=True)
+    saveObject(path, module)
+    return module, False
+
+
+def link(modules, base=0):
+    '''
+    link function places the modules one after another from the base address and patches
+    their relocations. A relocation is resolved with the symbols of its own module first and
+    then with the symbols of the other modules, which should be defined only once
+
+    Returns Tuple(Words, InvalidLines, Symbols, Errors)
+    '''
+
+    globalSymbols = {}
+    duplicateSymbols = set()
+    moduleBases = []
+    address = base
+
+    for module in modules:
+        moduleBases.append(address)
+        for name, offset in module["symbols"].items():
+            if name in globalSymbols:
+                duplicateSymbols.add(name)
+            else:
+                globalSymbols[name] = address + offset
+        address += 4 * len(module["words"])
+
+    words = []
+    invalidLines = []
+    errors = []
+
+    for module, moduleBase in zip(modules, moduleBases):
+        first = len(words)
+        words.extend(module["words"])
+        invalidLines.extend(first + index for index in module["invalid"])
+        if "diagnostics" in module:
+            errors.extend(module["diagnostics"])
+        else:
+            for index in module["invalid"]:
+                errors.append("{}: line can not be encoded".format(lineLocation(module, index)))
+
+        for index, kind, name in module["relocations"]:
+            location = lineLocation(module, index)
+            address = moduleBase + 4 * index
+
+            if name in module["symbols"]:
+                target = moduleBase + module["symbols"][name]
+            elif name in duplicateSymbols:
+                target = None
+                errors.append("{}: symbol '{}' is defined in more than one module".format(location, name))
+            elif name in globalSymbols:
+                target = globalSymbols[name]
+            else:
+                target = None
+                errors.append("{}: undefined symbol '{}'".format(location, name))
+
+            if target is not None and kind == "pc16":
+                offset = (target - address - 4) >> 2
+                if -0x8000 <= offset < 0x8000:
+                    words[first + index] = words[first + index] & 0xFFFF0000 | offset & 0xFFFF
+                    continue
+                errors.append("{}: branch to '{}' is out of range".format(location, name))
+            elif target is not None and kind == "hi16":
+                words[first + index] = words[first + index] & 0xFFFF0000 | target >> 16 & 0xFFFF
+                continue
+            elif target is not None and kind == "lo16":
+                words[first + index] = words[first + index] & 0xFFFF0000 | target & 0xFFFF
+                continue
+            elif target is not None:
+                if not (target ^ (address + 4)) & 0xF0000000:
+                    words[first + index] = words[first + index] & 0xFC000000 | target >> 2 & 0x3FFFFFF
+                    continue
+                errors.append("{}: jump to '{}' leaves the 256 MB region".format(location, name))
+
+            invalidLines.append(first + index)
+
+    for name in duplicateSymbols:
+        globalSymbols.pop(name)
+
+    return words, sorted(set(invalidLines)), globalSymbols, errors
+
+
+def compileObjects(sources, modules, output=None):
+    '''
+    compileObjects function writes the relocatable object of each source next to it, or into
+    the given output for a single source, and prints the errors of the modules
+
+    Returns Integer
+    '''
+
+    failed = False
+    for source, module in zip(sources, modules):
+        for error in module["diagnostics"]:
+            print(error, file=sys.stderr)
+        failed = failed or bool(module["diagnostics"] or module["invalid"])
+
+        if output == "-":
+            json.dump(module, sys.stdout)
+            sys.stdout.write("\n")
+            continue
+        saveObject(output or os.path.splitext(source)[0] + OBJECT_EXTENSION, module)
+
+    return 1 if failed else 0
+
+
+def main(arguments=None):
+
+    parser = argparse.ArgumentParser(description="Assemble MIPS source files as modules and link them")
+    parser.add_argument("sources", nargs="+",
+                        help="source files or relocatable objects ({}) of the modules in link order".format(
+                            OBJECT_EXTENSION))
+    parser.add_argument("-o", "--output", default=None,
+                        help="target file or the object file with --compile, '-' writes the standard output")
+    parser.add_argument("-c", "--compile", action="store_true",
+                        help="write the relocatable object of each source next to it instead of linking")
+    parser.add_argument("-f", "--format", default="text", choices=sorted(OUTPUT_EXTENSIONS),
+                        help="execute format of the target")
+    parser.add_argument("-b", "--binary", action="store_true",
+                        help="write binary text instead of hex text for the text format")
+    parser.add_argument("--byte-order", default="big", choices=["big", "little"],
+                        help="byte order of the bin and ihex formats")
+    parser.add_argument("--base", default="0x00000000", help="address of the first module")
+    parser.add_argument("--cache", default=None,
+                        help="directory of the objects that are reused for unchanged sources")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="print whether each object is reused from the cache")
+    arguments = parser.parse_args(arguments)
+
+    try:
+        base = int(arguments.base, 16)
+    except ValueError:
+        parser.error("base should be a hex address such as 0x00400000")
+    objects = [source for source in arguments.sources if os.path.splitext(source)[1] == OBJECT_EXTENSION]
+    if arguments.compile and objects:
+        parser.error("objects can not be compiled: " + objects[0])
+    if arguments.compile and arguments.output is not None and len(arguments.sources) > 1:
+        parser.error("the object file can only be given for a single source")
+
+    modules = []
+    for source in arguments.sources:
+        try:
+            if source in objects:
+                module, state = readObject(source), "loaded   "
+            else:
+                module, cached = objectFor(source, arguments.cache)
+                state = "cached   " if cached else "assembled"
+        except (OSError, ValueError) as error:
+            print("{}: {}".format(parser.prog, error), file=sys.stderr)
+            return 1
+        modules.append(module)
+        if arguments.verbose:
+            print("{} {}".format(state, source), file=sys.stderr)
+
+    if arguments.compile:
+        try:
+            return compileObjects(arguments.sources, modules, arguments.output)
+        except OSError as error:
+            print("{}: {}".format(parser.prog, error), file=sys.stderr)
+            return 1
+
+    words, invalidLines, _, errors = link(modules, base)
+    for error in errors:
+        print(error, file=sys.stderr)
+
+    writer = Assembler()
+    writer.executeFormat = arguments.format
+    writer.executeFormatHex = not arguments.binary
+    writer.executeByteOrder = arguments.byte_order
+    if arguments.output is None or arguments.output == "-":
+        writer.targetStream = sys.stdout
+    else:
+        writer.targetDirectory = arguments.output
+    writer.takeMachineWords(words, "0x{:08x}".format(base), invalidLines)
+    writer.execute()
+
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,334 @@
+import argparse
+import io
+import json
+import os
+import socketserver
+import sys
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+
+from assembler import OUTPUT_EXTENSIONS, Assembler, parseAddress
+
+# type of each optional field of the requests
+REQUEST_FIELDS = {"text": str, "source": str, "target": str, "format": str, "binary": bool, "lineIndex": bool,
+                  "byteOrder": str, "origin": str, "includeDirectories": list}
+
+
+class AssemblerService:
+    '''
+    Definition: AssemblerService object keeps one warm process that answers assemble requests.
+    Single instructions are kept in an LRU cache of encoded lines and files in an LRU cache
+    keyed by their path, modification time, size and options \n
+    Usage: Object = AssemblerService(lineCacheSize=4096, fileCacheSize=64)
+    '''
+
+    def __init__(self, lineCacheSize=4096, fileCacheSize=64, tokenCacheSize=1 << 20):
+
+        self.fileCacheSize = fileCacheSize
+        self.fileCache = OrderedDict()
+        self.fileHits = 0
+        self.fileMisses = 0
+        self.tokenCacheSize = tokenCacheSize
+        self.tokenCache = {}
+        self.requests = 0
+        self.encodeInstruction = lru_cache(maxsize=lineCacheSize)(self.encodeInstructionUncached)
+
+    def encodeInstructionUncached(self, text):
+        '''
+        encodeInstructionUncached function encodes a single instruction the same way as the
+        line execution of the interactive mode, a pseudo instruction may take several words.
+        It returns the words, or None and the message of the first error
+
+        Returns Tuple
+        '''
+
+        assembler = Assembler()
+        assembler.checkSingleLineCommand = True
+        assembler.content = [assembler.tokenizeLine(text)]
+        if not assembler.content[0]:
+            return None, "empty instruction"
+        assembler.prepare()
+        assembler.convertContent()
+
+        if assembler.invalidLines or not len(assembler.content):
+            return None, next((diagnostic.message for diagnostic in assembler.diagnostics
+                               if diagnostic.severity == "error"), "line can not be encoded")
+        return tuple(assembler.convertLineToHex(line) for line in assembler.content), None
+
+    def checkRequest(self, request):
+        '''
+        checkRequest function checks the types and the values of the fields of the given
+        request and raises ValueError for the first field that does not fit
+
+        Returns None
+        '''
+
+        for field, fieldType in REQUEST_FIELDS.items():
+            value = request.get(field)
+            if value is not None and type(value) is not fieldType:
+                raise ValueError("field '{}' should be {}".format(field, fieldType.__name__))
+        if not all(isinstance(path, str) for path in request.get("includeDirectories", [])):
+            raise ValueError("field 'includeDirectories' should be a list of str")
+        if request.get("format", "text") not in OUTPUT_EXTENSIONS:
+            raise ValueError("unknown format: " + request["format"])
+        if request.get("byteOrder", "big") not in ("big", "little"):
+            raise ValueError("byteOrder should be 'big' or 'little'")
+        if request.get("origin") is not None and parseAddress(request["origin"]) is None:
+            raise ValueError("origin should be a word aligned hex address such as 0x00400000")
+        return None
+
+    def configure(self, assembler, request):
+        '''
+        configure function applies the output options of the request to the assembler
+
+        Returns Assembler
+        '''
+
+        assembler.executeFormat = request.get("format", "text")
+        assembler.executeFormatHex = not request.get("binary", False)
+        assembler.executeFormatLineIndex = request.get("lineIndex", False)
+        assembler.executeByteOrder = request.get("byteOrder", "big")
+        assembler.programMemoryOrigin = request.get("origin")
+        assembler.includeDirectories = list(request.get("includeDirectories", []))
+        return assembler
+
+    def assemble(self, assembler):
+        '''
+        assemble function prepares and converts the source of the assembler with the shared
+        token cache, so the unchanged lines of a changed file are not tokenized again
+
+        Returns Dictionary
+        '''
+
+        if len(self.tokenCache) > self.tokenCacheSize:
+            self.tokenCache.clear()
+        assembler.tokenCache = self.tokenCache
+
+        if not assembler.prepare():
+            if assembler.errorMessage:
+                raise ValueError(assembler.errorMessage)
+            raise OSError(assembler.diagnostics[0].message if assembler.diagnostics else
+                          "source file can not be read: " + str(assembler.sourceDirectory))
+        assembler.convertContent()
+        # a data section far from the text section is kept apart from the words
+        sections = assembler.sectionImages(assembler.executeByteOrder)
+        words = array('I', sections[0][1])
+        if assembler.executeByteOrder != sys.byteorder:
+            words.byteswap()
+
+        return {
+            "words": words,
+            "dataSection": sections[1] if len(sections) > 1 else None,
+            "invalidLines": sorted(assembler.invalidLines),
+            "invalidDataLines": sorted(assembler.invalidDataLines),
+            "errors": assembler.errorCount(),
+            "diagnostics": assembler.formatDiagnostics().splitlines(),
+            "includedFiles": dict(assembler.includedFiles),
+            "programMemoryLocation": assembler.programMemoryLocation,
+            "symbols": dict(assembler.symbolTable)
+        }
+
+    def assembleFile(self, request):
+        '''
+        assembleFile function assembles the source file of the request, reusing the result of
+        an earlier request if neither the file nor the files it includes have changed
+
+        Returns Dictionary
+        '''
+
+        source = request["source"]
+        status = os.stat(source)
+        key = (os.path.abspath(source), status.st_mtime_ns, status.st_size, request.get("origin"),
+               request.get("byteOrder", "big"), tuple(request.get("includeDirectories", [])))
+
+        result = self.fileCache.get(key)
+        if result is not None and not all(self.unchanged(path, stamp)
+                                          for path, stamp in result["includedFiles"].items()):
+            result = None
+        if result is None:
+            self.fileMisses += 1
+            result = self.assemble(self.configure(Assembler(source=source), request))
+            self.fileCache[key] = result
+            if len(self.fileCache) > self.fileCacheSize:
+                self.fileCache.popitem(last=False)
+        else:
+            self.fileHits += 1
+            self.fileCache.move_to_end(key)
+
+        return result
+
+    def unchanged(self, path, stamp):
+        '''
+        unchanged function checks if the given file still has the modification time and size
+        of the given stamp
+
+        Returns Boolean
+        '''
+
+        try:
+            status = os.stat(path)
+        except OSError:
+            return False
+        return (status.st_mtime_ns, status.st_size) == tuple(stamp)
+
+    def respond(self, result, request):
+        '''
+        respond function writes the assembled words into the target of the request if given
+        and returns the response
+
+        Returns Dictionary
+        '''
+
+        writer = self.configure(Assembler(target=request.get("target")), request)
+        writer.takeMachineWords(result["words"], result["programMemoryLocation"], result["invalidLines"],
+                                result["dataSection"])
+
+        response = {
+            "ok": not result["errors"],
+            "lines": len(result["words"]),
+            "invalidLines": result["invalidLines"],
+            "invalidDataLines": result["invalidDataLines"],
+            "diagnostics": result["diagnostics"],
+            "symbols": result["symbols"]
+        }
+        if request.get("target"):
+            if not writer.execute():
+                raise ValueError(writer.errorMessage)
+            response["target"] = request["target"]
+        elif writer.checkSingleImage():
+            response["words"] = writer.formatMachineCode(writer.executeFormatHex)
+        else:
+            raise ValueError(writer.errorMessage)
+        return response
+
+    def handleRequest(self, request):
+        '''
+        handleRequest function answers a single request. The op of the request is "line" for a
+        single instruction, "file" for a source file, "source" for source text, "stats" or
+        "shutdown"
+
+        Returns Dictionary
+        '''
+
+        self.requests += 1
+        op = request.get("op")
+        try:
+            self.checkRequest(request)
+            if op == "line":
+                words, error = self.encodeInstruction(request["text"])
+                response = {"ok": words is not None, "word": words[0] if words else None,
+                            "words": list(words) if words else None}
+                if error is not None:
+                    response["error"] = error
+            elif op == "file":
+                response = self.respond(self.assembleFile(request), request)
+            elif op == "source":
+                assembler = self.configure(Assembler(), request)
+                assembler.sourceStream = io.StringIO(request["text"])
+                response = self.respond(self.assemble(assembler), request)
+            elif op == "stats":
+                lineCache = self.encodeInstruction.cache_info()
+                response = {
+                    "ok": True,
+                    "requests": self.requests,
+                    "lineHits": lineCache.hits,
+                    "lineMisses": lineCache.misses,
+                    "fileHits": self.fileHits,
+                    "fileMisses": self.fileMisses,
+                    "tokenCacheLines": len(self.tokenCache)
+                }
+            elif op == "shutdown":
+                response = {"ok": True}
+            else:
+                response = {"ok": False, "error": "unknown op: " + str(op)}
+        except (KeyError, OSError, ValueError) as error:
+            response = {"ok": False, "error": "{}: {}".format(type(error).__name__, error)}
+        except Exception as error:
+            # a request should never stop the service, whatever goes wrong while answering it
+            response = {"ok": False, "error": "internal error: {}: {}".format(type(error).__name__, error)}
+
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    def handleLine(self, line):
+        '''
+        handleLine function answers a request given as a JSON line
+
+        Returns Tuple(String, Boolean)
+        '''
+
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            return json.dumps({"ok": False, "error": "invalid JSON: {}".format(error)}), False
+        if not isinstance(request, dict):
+            return json.dumps({"ok": False, "error": "request should be a JSON object"}), False
+
+        return json.dumps(self.handleRequest(request)), request.get("op") == "shutdown"
+
+    def serveStream(self, inputStream, outputStream):
+        '''
+        serveStream function answers the JSON line requests of the input stream until it ends
+        or a shutdown request arrives
+
+        Returns Boolean
+        '''
+
+        for line in inputStream:
+            if not line.strip():
+                continue
+            response, shutdown = self.handleLine(line)
+            outputStream.write(response + "\n")
+            outputStream.flush()
+            if shutdown:
+                return True
+        return False
+
+    def serveSocket(self, path):
+        '''
+        serveSocket function answers the JSON line requests of the clients of a Unix socket
+        one connection at a time until a shutdown request arrives
+        '''
+
+        service = self
+
+        class Handler(socketserver.StreamRequestHandler):
+
+            def handle(self):
+                if service.serveStream(io.TextIOWrapper(self.rfile, encoding="utf-8"),
+                                       io.TextIOWrapper(self.wfile, encoding="utf-8", write_through=True)):
+                    self.server.shutdownRequested = True
+
+        if os.path.exists(path):
+            os.unlink(path)
+
+        with socketserver.UnixStreamServer(path, Handler) as server:
+            server.shutdownRequested = False
+            try:
+                while not server.shutdownRequested:
+                    server.handle_request()
+            finally:
+                os.unlink(path)
+
+
+def main(arguments=None):
+
+    parser = argparse.ArgumentParser(
+        description="Serve MIPS assemble requests as JSON lines over the standard streams or a Unix socket")
+    parser.add_argument("--socket", default=None, help="path of the Unix socket to listen on")
+    parser.add_argument("--line-cache", type=int, default=4096, help="number of cached instructions")
+    parser.add_argument("--file-cache", type=int, default=64, help="number of cached files")
+    arguments = parser.parse_args(arguments)
+
+    service = AssemblerService(arguments.line_cache, arguments.file_cache)
+    if arguments.socket:
+        service.serveSocket(arguments.socket)
+    else:
+        service.serveStream(sys.stdin, sys.stdout)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,535 @@
+import argparse
+import struct
+import sys
+import time
+from array import array
+from itertools import repeat
+
+from assembler import (Assembler, DECODE_TABLE, INSTRUCTION_PLANS, MNEMONICS, MNEMONIC_NUMBERS, REGISTER_FILE,
+                       REGISTER_WRITERS, decodeKey, parseAddress)
+
+# cycles taken by the instructions that do not finish in a single cycle
+CYCLE_COSTS = {"mult": 5, "multu": 5, "div": 35, "divu": 35}
+
+# instructions whose immediate is zero extended instead of sign extended
+UNSIGNED_IMMEDIATES = {"andi", "ori", "xori"}
+
+# numbers of the predecoded operations after the mnemonic numbers
+HALT = len(MNEMONICS)
+FAULT = HALT + 1
+ILLEGAL = HALT + 2
+
+# mnemonic number of the instruction words that can not be decoded
+INVALID_NUMBER = 0xFFFF
+
+# big-endian signed word of the memory
+WORD = struct.Struct(">i")
+
+
+class Simulator:
+    '''
+    Definition: Simulator object runs the machine code of an assembled program. The text
+    section is predecoded once into rows of a mnemonic number and three operand values, the
+    same shape as the program columns of the assembler, and the registers and the memory are
+    kept in an array and a bytearray. Branches run without delay slots \n
+    Usage: Object = Simulator(assembler, memorySize=1 << 20)
+    '''
+
+    def __init__(self, assembler, memorySize=1 << 20, output=None):
+
+        assembler.convertContent()
+        sections = assembler.sectionImages("big")
+
+        # the memory after the text section takes the stack, a data section far from it is
+        # mapped at its own address
+        self.base, image = sections[0]
+        self.memory = bytearray(image)
+        self.memory.extend(bytes(memorySize))
+        self.segments = [(self.base, self.memory)] + [(address, bytearray(image)) for address, image in sections[1:]]
+        self.registers = array('i', [0]) * 32
+        self.hi = 0
+        self.lo = 0
+        self.output = output if output is not None else sys.stdout
+        self.errorMessage = None
+        self.exitCode = None
+        self.seconds = 0.0
+        self.branchesTaken = 0
+
+        words = assembler.machineWords
+        self.mnemonics = array('H')
+        self.decoded = [self.decodeWord(word, self.base + 4 * index, len(words))
+                        for index, word in enumerate(words)]
+        self.decoded.append((HALT, 0, 0, 0))
+        self.decoded.append((FAULT, 0, 0, 0))
+        self.counts = [0] * len(self.decoded)
+        self.lineNumbers = assembler.content.lineNumbers if assembler.content is not None else None
+        self.includedLines = assembler.includedLines
+
+        # the program returns to the end of the text section and the stack grows down from
+        # the end of the memory
+        self.endAddress = self.base + 4 * len(words)
+        self.index = (assembler.symbolTable.get("main", self.base) - self.base) >> 2
+        self.registers[REGISTER_FILE["$ra"]] = self.signed(self.endAddress)
+        self.registers[REGISTER_FILE["$sp"]] = self.signed(self.base + len(self.memory))
+
+    def signed(self, value):
+        '''
+        signed function returns the given 32 bit value as a signed integer
+
+        Returns Integer
+        '''
+
+        return ((value & 0xFFFFFFFF) ^ 0x80000000) - 0x80000000
+
+    def mapping(self, address, size):
+        '''
+        mapping function returns the memory of the section that the given access of the given
+        size is mapped into and the offset of the address in it
+
+        Returns Tuple
+        '''
+
+        address &= 0xFFFFFFFF
+        if address % size:
+            raise IndexError("unaligned address 0x{:08x}".format(address))
+        for start, memory in self.segments:
+            if 0 <= address - start <= len(memory) - size:
+                return memory, address - start
+        raise IndexError("unmapped address 0x{:08x}".format(address))
+
+    def decodeWord(self, word, address, length):
+        '''
+        decodeWord function predecodes the given instruction word into its mnemonic number and
+        its operand values in the order of the instruction plan. Immediates are extended, the
+        lui immediate is shifted and the labels become the indexes of their instructions
+
+        Returns Tuple
+        '''
+
+        number = DECODE_TABLE.get(decodeKey(word))
+        if number is None:
+            self.mnemonics.append(INVALID_NUMBER)
+            return ILLEGAL, word, 0, 0
+        self.mnemonics.append(number)
+
+        mnemonic = MNEMONICS[number]
+        values = []
+        for field in INSTRUCTION_PLANS[number][1]:
+            if field == 'rs':
+                values.append(word >> 21 & 0x1F)
+            elif field == 'rt':
+                values.append(word >> 16 & 0x1F)
+            elif field == 'rd':
+                values.append(word >> 11 & 0x1F)
+            elif field == 'shamt':
+                values.append(word >> 6 & 0x1F)
+            elif mnemonic == 'lui':
+                values.append(self.signed(word << 16))
+            elif field == 'imm' and mnemonic in UNSIGNED_IMMEDIATES:
+                values.append(word & 0xFFFF)
+            elif field == 'imm':
+                values.append(self.signed(word << 16) >> 16)
+            else:
+                if field == 'label':
+                    target = address + 4 + ((self.signed(word << 16) >> 16) << 2)
+                else:
+                    target = (address + 4) & 0xF0000000 | (word & 0x3FFFFFF) << 2
+                index = (target - self.base) >> 2
+                values.append(index if 0 <= index <= length else length + 1)
+
+        if mnemonic in REGISTER_WRITERS and values[0] == 0:
+            number = MNEMONIC_NUMBERS["noop"]
+        values.extend([0] * (3 - len(values)))
+        return number, values[0], values[1], values[2]
+
+    def run(self, maxSteps=100000000):
+        '''
+        Definition: Run function executes the program until it returns to the end of the text
+        section, exits with a syscall, faults or takes the given number of steps \n
+        Usage: Object.run(maxSteps=1000000)
+
+        Returns Boolean
+        '''
+
+        decoded = self.decoded
+        counts = self.counts
+        registers = self.registers
+        memory = self.memory
+        base = self.base
+        byteLimit = len(memory)
+        wordLimit = byteLimit - 3
+        end = len(decoded) - 2
+        index = self.index
+        hi, lo = self.hi, self.lo
+        taken = 0
+        unpackWord = WORD.unpack_from
+        signed = self.signed
+        packWord = WORD.pack_into
+
+        (ADD, ADDI, ADDIU, ADDU, AND, ANDI, BEQ, BGEZ, BGEZAL, BGTZ, BLEZ, BLTZ, BLTZAL, BNE, DIV, DIVU,
+         J, JAL, JR, LB, LUI, LW, MFHI, MFLO, MULT, MULTU, NOOP, NOR, OR, ORI, SB, SLL, SLLV, SLT, SLTI,
+         SLTIU, SLTU, SRA, SRLV, SUB, SUBU, SW, SYSCALL, XOR, XORI) = (MNEMONIC_NUMBERS[mnemonic] for mnemonic in (
+            "add", "addi", "addiu", "addu", "and", "andi", "beq", "bgez", "bgezal", "bgtz", "blez",
+            "bltz", "bltzal", "bne", "div", "divu", "j", "jal", "jr", "lb", "lui", "lw", "mfhi",
+            "mflo", "mult", "multu", "noop", "nor", "or", "ori", "sb", "sll", "sllv", "slt", "slti",
+            "sltiu", "sltu", "sra", "srlv", "sub", "subu", "sw", "syscall", "xor", "xori"))
+
+        self.errorMessage = None
+        startTime = time.perf_counter()
+        try:
+            for _ in repeat(None, maxSteps):
+                op, x, y, z = decoded[index]
+                counts[index] += 1
+                index += 1
+
+                # the most frequent instructions are compared first
+                if op == ADDIU:
+                    registers[x] = ((registers[y] + z + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+                elif op == ADDI:
+                    value = registers[y] + z
+                    if not -0x80000000 <= value <= 0x7FFFFFFF:
+                        raise ArithmeticError("arithmetic overflow")
+                    registers[x] = value
+                elif op == LW:
+                    offset = ((registers[z] + y) & 0xFFFFFFFF) - base
+                    if offset & 3 or not 0 <= offset < wordLimit:
+                        registers[x] = unpackWord(*self.mapping(registers[z] + y, 4))[0]
+                    else:
+                        registers[x] = unpackWord(memory, offset)[0]
+                elif op == SW:
+                    offset = ((registers[z] + y) & 0xFFFFFFFF) - base
+                    if offset & 3 or not 0 <= offset < wordLimit:
+                        packWord(*self.mapping(registers[z] + y, 4), registers[x])
+                    else:
+                        packWord(memory, offset, registers[x])
+                elif op == ADDU:
+                    registers[x] = ((registers[y] + registers[z] + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+                elif op == ADD:
+                    value = registers[y] + registers[z]
+                    if not -0x80000000 <= value <= 0x7FFFFFFF:
+                        raise ArithmeticError("arithmetic overflow")
+                    registers[x] = value
+                elif op == BEQ:
+                    if registers[x] == registers[y]:
+                        index = z
+                        taken += 1
+                elif op == BNE:
+                    if registers[x] != registers[y]:
+                        index = z
+                        taken += 1
+                elif op == SLT:
+                    registers[x] = registers[y] < registers[z]
+                elif op == SLTI:
+                    registers[x] = registers[y] < z
+                elif op == SLL:
+                    registers[x] = (((registers[y] << z) + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+                elif op == NOOP:
+                    pass
+                elif op == LUI:
+                    registers[x] = y
+                elif op == ORI:
+                    registers[x] = registers[y] | z
+                elif op == ANDI:
+                    registers[x] = registers[y] & z
+                elif op == J:
+                    index = x
+                elif op == JAL:
+                    registers[31] = signed(base + 4 * index)
+                    index = x
+                elif op == JR:
+                    offset = (registers[x] & 0xFFFFFFFF) - base
+                    if offset & 3 or not 0 <= offset <= 4 * end:
+                        raise IndexError("jump to 0x{:08x} outside the text section".format(registers[x] & 0xFFFFFFFF))
+                    index = offset >> 2
+                elif op == SUB:
+                    value = registers[y] - registers[z]
+                    if not -0x80000000 <= value <= 0x7FFFFFFF:
+                        raise ArithmeticError("arithmetic overflow")
+                    registers[x] = value
+                elif op == SUBU:
+                    registers[x] = ((registers[y] - registers[z] + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+                elif op == AND:
+                    registers[x] = registers[y] & registers[z]
+                elif op == OR:
+                    registers[x] = registers[y] | registers[z]
+                elif op == XOR:
+                    registers[x] = registers[y] ^ registers[z]
+                elif op == NOR:
+                    registers[x] = ~(registers[y] | registers[z])
+                elif op == XORI:
+                    registers[x] = registers[y] ^ z
+                elif op == SLTU:
+                    registers[x] = registers[y] & 0xFFFFFFFF < registers[z] & 0xFFFFFFFF
+                elif op == SLTIU:
+                    registers[x] = registers[y] & 0xFFFFFFFF < z & 0xFFFFFFFF
+                elif op == SRA:
+                    registers[x] = registers[y] >> z
+                elif op == SLLV:
+                    registers[x] = (((registers[y] << (registers[z] & 31)) + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+                elif op == SRLV:
+                    registers[x] = (((registers[y] & 0xFFFFFFFF) >> (registers[z] & 31)) ^ 0x80000000) - 0x80000000
+                elif op == BGEZ:
+                    if registers[x] >= 0:
+                        index = y
+                        taken += 1
+                elif op == BGTZ:
+                    if registers[x] > 0:
+                        index = y
+                        taken += 1
+                elif op == BLEZ:
+                    if registers[x] <= 0:
+                        index = y
+                        taken += 1
+                elif op == BLTZ:
+                    if registers[x] < 0:
+                        index = y
+                        taken += 1
+                elif op == BGEZAL or op == BLTZAL:
+                    registers[31] = signed(base + 4 * index)
+                    if (registers[x] >= 0) == (op == BGEZAL):
+                        index = y
+                        taken += 1
+                elif op == LB:
+                    offset = ((registers[z] + y) & 0xFFFFFFFF) - base
+                    if not 0 <= offset < byteLimit:
+                        segment, offset = self.mapping(registers[z] + y, 1)
+                        registers[x] = (segment[offset] ^ 0x80) - 0x80
+                    else:
+                        registers[x] = (memory[offset] ^ 0x80) - 0x80
+                elif op == SB:
+                    offset = ((registers[z] + y) & 0xFFFFFFFF) - base
+                    if not 0 <= offset < byteLimit:
+                        segment, offset = self.mapping(registers[z] + y, 1)
+                        segment[offset] = registers[x] & 0xFF
+                    else:
+                        memory[offset] = registers[x] & 0xFF
+                elif op == MFHI:
+                    registers[x] = hi
+                elif op == MFLO:
+                    registers[x] = lo
+                elif op == MULT or op == MULTU:
+                    if op == MULT:
+                        product = registers[x] * registers[y]
+                    else:
+                        product = (registers[x] & 0xFFFFFFFF) * (registers[y] & 0xFFFFFFFF)
+                    hi = ((product >> 32 & 0xFFFFFFFF) ^ 0x80000000) - 0x80000000
+                    lo = ((product & 0xFFFFFFFF) ^ 0x80000000) - 0x80000000
+                elif op == DIV or op == DIVU:
+                    if op == DIV:
+                        dividend, divisor = registers[x], registers[y]
+                    else:
+                        dividend, divisor = registers[x] & 0xFFFFFFFF, registers[y] & 0xFFFFFFFF
+                    # the result of a division by zero is unpredictable, hi and lo are kept
+                    if divisor:
+                        quotient = abs(dividend) // abs(divisor)
+                        if (dividend < 0) != (divisor < 0):
+                            quotient = -quotient
+                        hi = self.signed(dividend - quotient * divisor)
+                        lo = self.signed(quotient)
+                elif op == SYSCALL:
+                    if not self.syscall():
+                        break
+                elif op == HALT:
+                    index -= 1
+                    counts[index] -= 1
+                    break
+                elif op == FAULT:
+                    index -= 1
+                    counts[index] -= 1
+                    self.errorMessage = "Branch or jump outside the text section"
+                    break
+                elif op == ILLEGAL:
+                    raise ValueError("illegal instruction 0x{:08X}".format(x))
+            else:
+                self.errorMessage = "Step limit of {} is reached".format(maxSteps)
+        except (ArithmeticError, IndexError, ValueError, struct.error) as error:
+            self.errorMessage = "{} at {}".format(error, self.location(index - 1))
+        finally:
+            self.seconds += time.perf_counter() - startTime
+            self.index = index
+            self.hi, self.lo = hi, lo
+            self.branchesTaken += taken
+
+        return self.errorMessage is None
+
+    def location(self, index):
+        '''
+        location function returns the address and the source line of the instruction at the
+        given index as text
+
+        Returns String
+        '''
+
+        text = "0x{:08x}".format(self.base + 4 * index)
+        if self.lineNumbers is not None and 0 <= index < len(self.lineNumbers):
+            lineNumber = self.lineNumbers[index]
+            if lineNumber in self.includedLines:
+                text += " ({} line {})".format(*self.includedLines[lineNumber])
+            else:
+                text += " (line {})".format(lineNumber)
+        return text
+
+    def syscall(self):
+        '''
+        syscall function runs the system call selected by $v0: 1 prints the integer of $a0,
+        4 prints the string at $a0, 10 exits, 11 prints the character of $a0 and 17 exits with
+        the code of $a0. It returns False if the program exits
+
+        Returns Boolean
+        '''
+
+        service = self.registers[REGISTER_FILE["$v0"]]
+        argument = self.registers[REGISTER_FILE["$a0"]]
+
+        if service == 1:
+            self.output.write(str(argument))
+        elif service == 4:
+            memory, offset = self.mapping(argument, 1)
+            terminator = memory.find(b"\0", offset)
+            if terminator < 0:
+                raise IndexError("unterminated string")
+            self.output.write(memory[offset:terminator].decode("latin-1"))
+        elif service == 11:
+            self.output.write(chr(argument & 0xFF))
+        elif service == 10 or service == 17:
+            self.exitCode = argument if service == 17 else 0
+            return False
+        else:
+            raise ValueError("unknown syscall {}".format(service))
+        return True
+
+    def register(self, name):
+        '''
+        register function returns the value of the given register by its name
+
+        Returns Integer
+        '''
+
+        return self.registers[REGISTER_FILE[name]]
+
+    def statistics(self):
+        '''
+        statistics function returns the instruction counts of each mnemonic, the number of
+        instructions and cycles, the taken branches and the speed of the runs
+
+        Returns Dictionary
+        '''
+
+        mnemonicCounts = {}
+        cycles = 0
+        for number, count in zip(self.mnemonics, self.counts):
+            if count:
+                mnemonic = MNEMONICS[number] if number < len(MNEMONICS) else "illegal"
+                mnemonicCounts[mnemonic] = mnemonicCounts.get(mnemonic, 0) + count
+                cycles += count * CYCLE_COSTS.get(mnemonic, 1)
+
+        instructions = sum(mnemonicCounts.values())
+        return {
+            "instructions": instructions,
+            "cycles": cycles,
+            "branchesTaken": self.branchesTaken,
+            "seconds": self.seconds,
+            "instructionsPerSecond": instructions / self.seconds if self.seconds else None,
+            "mnemonics": dict(sorted(mnemonicCounts.items(), key=lambda item: -item[1]))
+        }
+
+    def formatStatistics(self):
+        '''
+        formatStatistics function turns the statistics into a text table
+
+        Returns String
+        '''
+
+        statistics = self.statistics()
+        lines = [
+            "{:<28}{:>14,}".format("instructions", statistics["instructions"]),
+            "{:<28}{:>14,}".format("cycles", statistics["cycles"]),
+            "{:<28}{:>14,}".format("branches taken", statistics["branchesTaken"]),
+            "{:<28}{:>14.6f}".format("seconds", statistics["seconds"]),
+            "{:<28}{:>14,.0f}".format("instructions per second", statistics["instructionsPerSecond"] or 0),
+            "",
+            "{:<28}{:>14}".format("mnemonic", "count")
+        ]
+        for mnemonic, count in statistics["mnemonics"].items():
+            lines.append("{:<28}{:>14,}".format(mnemonic, count))
+
+        return "\n".join(lines) + "\n"
+
+    def formatRegisters(self):
+        '''
+        formatRegisters function turns the registers into text, four registers on a line
+
+        Returns String
+        '''
+
+        names = {}
+        for name, number in REGISTER_FILE.items():
+            names.setdefault(number, name)
+        cells = ["{:>5} {:08x}".format(names[number], value & 0xFFFFFFFF)
+                 for number, value in enumerate(self.registers)]
+        cells += ["{:>5} {:08x}".format("hi", self.hi & 0xFFFFFFFF), "{:>5} {:08x}".format("lo", self.lo & 0xFFFFFFFF)]
+        return "".join("  ".join(cells[index:index + 4]) + "\n" for index in range(0, len(cells), 4))
+
+
+def main(arguments=None):
+
+    parser = argparse.ArgumentParser(description="Assemble a MIPS source file and run it")
+    parser.add_argument("source", help="source file")
+    parser.add_argument("--origin", default=None,
+                        help="program memory location such as 0x00400000, overrides the source")
+    parser.add_argument("--memory", type=int, default=1 << 20,
+                        help="bytes of memory after the program, the stack starts at its end")
+    parser.add_argument("--max-steps", type=int, default=100000000,
+                        help="largest number of instructions to run")
+    parser.add_argument("--stats", action="store_true",
+                        help="print the instruction counts and cycles to the standard error")
+    parser.add_argument("--registers", action="store_true",
+                        help="print the registers to the standard error when the program stops")
+    parser.add_argument("--schedule", action="store_true",
+                        help="reorder the instructions of each basic block before running, the simulator "
+                             "has no delay slots")
+    arguments = parser.parse_args(arguments)
+
+    if arguments.origin is not None and parseAddress(arguments.origin) is None:
+        parser.error("origin should be a word aligned hex address such as 0x00400000")
+
+    assembler = Assembler(source=arguments.source, origin=arguments.origin)
+    assembler.scheduleInstructions = arguments.schedule
+    try:
+        prepared = assembler.prepare()
+    except OSError as error:
+        print("{}: {}".format(parser.prog, error), file=sys.stderr)
+        return 1
+    if not prepared:
+        print(assembler.formatDiagnostics(), end="", file=sys.stderr)
+        if not assembler.errorCount():
+            print("{}: {}".format(parser.prog, assembler.errorMessage or
+                                  "source file can not be read: " + arguments.source), file=sys.stderr)
+        return 1
+
+    assembler.convertContent()
+    print(assembler.formatDiagnostics(), end="", file=sys.stderr)
+    errors = assembler.errorCount()
+    if errors:
+        invalidLines = len(assembler.invalidLines) + len(assembler.invalidDataLines)
+        print("{}: {}".format(parser.prog, "{} lines could not be encoded".format(invalidLines) if invalidLines
+                              else "{} error{}".format(errors, "" if errors == 1 else "s")), file=sys.stderr)
+        return 2
+
+    simulator = Simulator(assembler, arguments.memory)
+    success = simulator.run(arguments.max_steps)
+    sys.stdout.flush()
+
+    if arguments.registers:
+        print(simulator.formatRegisters(), end="", file=sys.stderr)
+    if arguments.stats:
+        print(simulator.formatStatistics(), end="", file=sys.stderr)
+    if not success:
+        print("{}: {}".format(parser.prog, simulator.errorMessage), file=sys.stderr)
+        return 1
+
+    return simulator.exitCode or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,210 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from assembler import OUTPUT_EXTENSIONS
+from batch import assembleFile, collectSources, printResult, targetOf
+
+
+def stampOf(path):
+    '''
+    stampOf function returns the modification time and size of the given file, or None if
+    it can not be read
+
+    Returns Tuple or None
+    '''
+
+    try:
+        status = os.stat(path)
+    except OSError:
+        return None
+    return status.st_mtime_ns, status.st_size
+
+
+class Watcher:
+    '''
+    Definition: Watcher object polls the source files of the given patterns and the files
+    they include, waits until a changed file has been quiet for the debounce time and then
+    reassembles only the affected sources in a process pool. Each source is a task of its
+    own, so the result of a file is reported as soon as it is finished while slow files keep
+    running \n
+    Usage: Object = Watcher(["src/*.src"], outputDirectory="build", report=printResult)
+    '''
+
+    def __init__(self, patterns, outputDirectory=None, executeFormat="text", executeFormatHex=True,
+                 includeDirectories=(), workers=None, interval=0.2, debounce=0.1, report=None):
+
+        self.patterns = patterns
+        self.outputDirectory = outputDirectory
+        self.executeFormat = executeFormat
+        self.executeFormatHex = executeFormatHex
+        self.includeDirectories = tuple(includeDirectories)
+        self.workers = workers
+        self.interval = interval
+        self.debounce = debounce
+        self.report = report
+        self.stamps = {}
+        self.settling = {}
+        self.running = {}
+        self.scanned = False
+        self.builds = 0
+
+    def scan(self):
+        '''
+        scan function returns the source files that the patterns match now
+
+        Returns List
+        '''
+
+        return [source for source in collectSources(self.patterns) if os.path.isfile(source)]
+
+    def snapshot(self, source):
+        '''
+        snapshot function returns the current stamps of the given source and of the files it
+        included when it was assembled last
+
+        Returns Dictionary
+        '''
+
+        paths = self.stamps.get(source, {source: None})
+        return {path: stampOf(path) for path in paths}
+
+    def changedSources(self, sources):
+        '''
+        changedSources function returns the given sources that are new or whose own or
+        included files have changed since they were assembled, with their current snapshot
+
+        Returns Dictionary
+        '''
+
+        changed = {}
+        for source in sources:
+            snapshot = self.snapshot(source)
+            if source not in self.stamps or snapshot != self.stamps[source]:
+                changed[source] = snapshot
+        return changed
+
+    def settled(self, changed, now):
+        '''
+        settled function returns the changed sources whose snapshot has not changed for the
+        debounce time. The sources found by the first scan are settled at once
+
+        Returns List
+        '''
+
+        ready = []
+        for source, snapshot in changed.items():
+            if not self.scanned:
+                ready.append(source)
+                continue
+
+            previous = self.settling.get(source)
+            if previous is None or previous[0] != snapshot:
+                self.settling[source] = (snapshot, now)
+            elif now - previous[1] >= self.debounce:
+                ready.append(source)
+
+        for source in ready:
+            self.settling.pop(source, None)
+        return ready
+
+    async def build(self, source, snapshot, executor):
+        '''
+        build function assembles the given source in the process pool and reports its result.
+        The stamps are taken before the build, so a change saved while it runs starts another
+
+        Returns Dictionary
+        '''
+
+        self.stamps[source] = snapshot
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                executor, assembleFile, source, targetOf(source, self.outputDirectory, self.executeFormat),
+                self.executeFormat, self.executeFormatHex, self.includeDirectories)
+        finally:
+            self.running.pop(source, None)
+
+        stamps = {source: snapshot.get(source)}
+        stamps.update((path, tuple(stamp)) for path, stamp in result.get("includedFiles", {}).items())
+        self.stamps[source] = stamps
+        self.builds += 1
+        if self.report:
+            self.report(result)
+        return result
+
+    async def watch(self, maxBuilds=None):
+        '''
+        watch function polls the sources until it is cancelled or the given number of builds
+        have finished
+
+        Returns Integer
+        '''
+
+        if self.outputDirectory:
+            os.makedirs(self.outputDirectory, exist_ok=True)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            while maxBuilds is None or self.builds < maxBuilds:
+                sources = self.scan()
+                for source in set(self.stamps) - set(sources):
+                    self.stamps.pop(source)
+
+                changed = self.changedSources(source for source in sources if source not in self.running)
+                for source in self.settled(changed, time.monotonic()):
+                    self.running[source] = asyncio.create_task(self.build(source, changed[source], executor))
+                self.scanned = True
+
+                await asyncio.sleep(self.interval)
+
+            if self.running:
+                await asyncio.gather(*self.running.values(), return_exceptions=True)
+
+        return self.builds
+
+
+def main(arguments=None):
+
+    parser = argparse.ArgumentParser(description="Watch MIPS source files and reassemble them when they change")
+    parser.add_argument("sources", nargs="+",
+                        help="source files, glob patterns or directories of .src files")
+    parser.add_argument("-o", "--output", default=None,
+                        help="directory of the target files, next to the sources by default")
+    parser.add_argument("-f", "--format", default="text", choices=sorted(OUTPUT_EXTENSIONS),
+                        help="execute format of the target files")
+    parser.add_argument("-b", "--binary", action="store_true",
+                        help="write binary text instead of hex text for the text format")
+    parser.add_argument("-I", "--include-directory", action="append", default=[],
+                        help="directory searched for the .include files after the directory of the including file")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="number of worker processes, the CPU count by default")
+    parser.add_argument("--interval", type=float, default=0.2, help="seconds between the polls of the files")
+    parser.add_argument("--debounce", type=float, default=0.1,
+                        help="seconds a changed file should stay unchanged before it is reassembled")
+    parser.add_argument("--json", action="store_true", help="write each result as a JSON line")
+    parser.add_argument("--max-builds", type=int, default=None, help="stop after the given number of builds")
+    arguments = parser.parse_args(arguments)
+
+    def report(result):
+        if arguments.json:
+            print(json.dumps(result))
+        else:
+            printResult(result)
+        sys.stdout.flush()
+
+    watcher = Watcher(arguments.sources, arguments.output, arguments.format, not arguments.binary,
+                      arguments.include_directory, arguments.workers, arguments.interval, arguments.debounce,
+                      report)
+    try:
+        asyncio.run(watcher.watch(arguments.max_builds))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
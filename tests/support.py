@@ -0,0 +1,56 @@
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from assembler import Assembler, REGISTER_FILE
+from simulator import Simulator
+
+
+def assemble(text, **options):
+    '''
+    assemble function prepares the given source text with the given assembler attributes
+
+    Returns Assembler
+    '''
+
+    assembler = Assembler()
+    assembler.sourceStream = io.StringIO(text)
+    for name, value in options.items():
+        setattr(assembler, name, value)
+    assert assembler.prepare(), assembler.diagnostics
+    return assembler
+
+
+def mnemonics(assembler):
+    '''
+    mnemonics function returns the mnemonics of the prepared program in order
+
+    Returns List
+    '''
+
+    program = assembler.content
+    return [program.tokens(index)[0] for index in range(len(program))]
+
+
+def simulate(assembler):
+    '''
+    simulate function runs the given assembler and returns the registers, hi, lo and error message
+
+    Returns Tuple
+    '''
+
+    simulator = Simulator(assembler, 4096, io.StringIO())
+    simulator.run(100000)
+    return list(simulator.registers), simulator.hi, simulator.lo, simulator.errorMessage
+
+
+def register(state, name):
+    '''
+    register function returns the given register of a simulated state
+
+    Returns Integer
+    '''
+
+    return state[0][REGISTER_FILE[name]]
@@ -0,0 +1,54 @@
+import io
+import unittest
+
+from support import Assembler
+
+
+def prepare(text):
+    '''
+    prepare function prepares the given source text and returns the assembler
+
+    Returns Assembler
+    '''
+
+    assembler = Assembler()
+    assembler.sourceStream = io.StringIO(text)
+    assembler.prepare()
+    return assembler
+
+
+class AddressTest(unittest.TestCase):
+
+    def testOriginLine(self):
+        assembler = prepare("0x00400000\nnoop\n")
+        self.assertIsNone(assembler.errorMessage)
+        self.assertEqual(assembler.programMemoryLocation, "0x00400000")
+
+    def testNegativeOriginIsAnError(self):
+        assembler = prepare("-16\nnoop\n")
+        self.assertIn("word aligned address", assembler.errorMessage)
+        self.assertEqual(assembler.diagnostics[0].line, 1)
+
+    def testUnalignedOriginIsAnError(self):
+        self.assertIn("word aligned address", prepare("0x2\nnoop\n").errorMessage)
+
+    def testLastWordOfTheAddressSpace(self):
+        self.assertIsNone(prepare("0xfffffffc\nnoop\n").errorMessage)
+
+    def testTextPastTheAddressSpaceIsAnError(self):
+        assembler = prepare("0xfffffffc\nnoop\nnoop\n")
+        self.assertIn("32 bit address space", assembler.errorMessage)
+        self.assertEqual(assembler.diagnostics[0].line, 3)
+
+    def testDataPastTheAddressSpaceIsAnError(self):
+        assembler = prepare("0xfffffff8\nnoop\nnoop\n.data\n.word 1\n")
+        self.assertIn("'.data' passes the end", assembler.errorMessage)
+
+    def testRelaxedBranchPastTheAddressSpaceIsAnError(self):
+        # the text section ends at the last word, the relaxed branch has no room for its jump
+        assembler = prepare("0xfffd8ef8\nbeq $t0, $t0, far\n" + "noop\n" * 40000 + "far: noop\n")
+        self.assertIn("32 bit address space", assembler.errorMessage)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+import unittest
+
+from support import Assembler
+
+
+class TokenCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.source = os.path.join(directory.name, "main.src")
+        self.cache = os.path.join(directory.name, "main.cache")
+
+    def assembleWithCache(self, text):
+        '''
+        assembleWithCache function assembles the given source text with the cache file and
+        returns the assembler
+
+        Returns Assembler
+        '''
+
+        with open(self.source, "w") as file:
+            file.write(text)
+        assembler = Assembler(source=self.source)
+        assembler.loadCache(self.cache)
+        assembler.prepare()
+        assembler.convertContent()
+        assembler.saveCache(self.cache)
+        return assembler
+
+    def runs(self):
+        '''
+        runs function returns the JSON objects of the runs in the cache file
+
+        Returns List
+        '''
+
+        with open(self.cache) as file:
+            return [json.loads(text) for text in file]
+
+    def testUnchangedLinesAreNotScannedAgain(self):
+        first = self.assembleWithCache("li $t0, 5\naddu $t1, $t0, $t0\n")
+        second = self.assembleWithCache("li $t0, 5\naddu $t1, $t0, $t0\n")
+        self.assertEqual(first.cacheMisses, 2)
+        self.assertEqual((second.cacheHits, second.cacheMisses), (2, 0))
+        self.assertEqual(list(second.machineWords), list(first.machineWords))
+
+    def testEditsKeepTheFileSmall(self):
+        for value in range(30):
+            self.assembleWithCache("addiu $t0, $t0, {}\nnoop\n".format(value))
+        runs = self.runs()
+        self.assertLessEqual(len(runs), 8)
+        self.assertLessEqual(sum(len(run["lines"]) for run in runs), 8)
+
+    def testOtherTokenVersionIsNotUsed(self):
+        with open(self.cache, "w") as file:
+            file.write(json.dumps({"tokens": 0, "lines": {"noop": ["addu", "$8", "$8", "$8"]}}) + "\n")
+        assembler = self.assembleWithCache("noop\n")
+        self.assertEqual(assembler.cacheHits, 0)
+        self.assertEqual(assembler.content.tokens(0)[0], "noop")
+        self.assertEqual(len(self.runs()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+
+import support  # puts the sources on the path
+import assembler
+import disassembler
+from benchmark import generateProgram
+from disassembler import formatInstruction
+
+# one line of each kind of operand, written at 0x00400000
+PROGRAM = """0x00400000
+main: add $t0, $t1, $t2
+lw $t0, -4($sp)
+beq $t0, $zero, main
+jal function
+li $t1, 0x12345678
+function: jr $ra
+sll $t0, $t1, 3
+mult $t0, $t1
+mfhi $t2
+syscall
+lui $t0, 0xffff
+ori $t0, $t0, 0xffff
+lb $t0, 3($t1)
+sb $t0, 3($t1)
+bgezal $t0, function
+bltz $t0, main
+slti $t0, $t1, -5
+j main
+"""
+
+
+class DisassemblerTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def path(self, name):
+        '''
+        path function returns the path of the given file name in the temporary directory
+
+        Returns String
+        '''
+
+        return os.path.join(self.directory, name)
+
+    def roundTrip(self, source, extension, options=(), readOptions=()):
+        '''
+        roundTrip function assembles the given source into a target of the given extension with
+        the given options, disassembles it with the given read options and assembles the result
+        again. It returns the hex text of the original and of the disassembled source
+
+        Returns Tuple(String, String)
+        '''
+
+        with open(self.path("original.src"), "w") as file:
+            file.write(source)
+        image = self.path("image" + extension)
+        self.assertEqual(assembler.main([self.path("original.src"), "-o", self.path("original.obj")]), 0)
+        self.assertEqual(assembler.main([self.path("original.src"), "-o", image] + list(options)), 0)
+        self.assertEqual(disassembler.main([image, "-o", self.path("decoded.src"), "--origin", "0x00400000"] +
+                                           list(readOptions)), 0)
+        self.assertEqual(assembler.main([self.path("decoded.src"), "-o", self.path("decoded.obj")]), 0)
+
+        with open(self.path("original.obj")) as original, open(self.path("decoded.obj")) as decoded:
+            return original.read(), decoded.read()
+
+    def testEveryFormatRoundTrips(self):
+        formats = [(".obj", [], []), (".obj", ["-b"], []), (".obj", ["-n"], []),
+                   (".bin", ["-f", "bin"], []),
+                   (".bin", ["-f", "bin", "--byte-order", "little"], ["--byte-order", "little"]),
+                   (".hex", ["-f", "ihex"], []), (".mem", ["-f", "verilog"], []), (".rom", ["-f", "logisim"], [])]
+        for extension, options, readOptions in formats:
+            with self.subTest(options=options):
+                original, decoded = self.roundTrip(PROGRAM, extension, options, readOptions)
+                self.assertEqual(decoded, original)
+
+    def testGeneratedProgramRoundTrips(self):
+        source = "\n".join(generateProgram(2000, seed=3, origin="0x00400000")) + "\n"
+        original, decoded = self.roundTrip(source, ".obj")
+        self.assertEqual(decoded, original)
+
+    def testLabelsOfBranchesAndJumps(self):
+        self.assertEqual(formatInstruction(0x1100FFFF, 0x00400008), "beq $t0, $zero, l_00400008")
+        self.assertEqual(formatInstruction(0x08100000, 0x00400040), "j l_00400000")
+
+    def testUnknownWords(self):
+        self.assertEqual(formatInstruction(0, 0), "noop")
+        self.assertEqual(formatInstruction(0xFFFFFFFF, 0), ".word 0xFFFFFFFF")
+
+
+if __name__ == "__main__":
+    unittest.main()
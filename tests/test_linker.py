@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+
+import support  # puts the sources on the path
+from linker import OBJECT_EXTENSION, assembleObject, link, main, objectFor, readObject
+
+
+class LinkerTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, text):
+        '''
+        write function writes the given source text into a file of the temporary directory
+
+        Returns String
+        '''
+
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as file:
+            file.write(text)
+        return path
+
+    def linkSources(self, *texts, base=0x00400000):
+        '''
+        linkSources function assembles the given source texts as modules and links them from
+        the given base address
+
+        Returns Tuple(Words, InvalidLines, Symbols, Errors)
+        '''
+
+        modules = [assembleObject(self.write("module{}.src".format(index), text))
+                   for index, text in enumerate(texts)]
+        return link(modules, base)
+
+    def testRelocationsOfOtherModules(self):
+        words, invalidLines, symbols, errors = self.linkSources(
+            "main: jal helper\nla $t0, value\nbeq $t0, $zero, helper\n",
+            "noop\nhelper: jr $ra\nvalue: noop\n")
+        self.assertEqual((invalidLines, errors), ([], []))
+        self.assertEqual(symbols, {"main": 0x00400000, "helper": 0x00400014, "value": 0x00400018})
+        # abs26 of jal, hi16 and lo16 of la and pc16 of beq
+        self.assertEqual(words[0], 0x0C000000 | 0x00400014 >> 2)
+        self.assertEqual(words[1] & 0xFFFF, 0x0040)
+        self.assertEqual(words[2] & 0xFFFF, 0x0018)
+        self.assertEqual(words[3] & 0xFFFF, (0x00400014 - 0x0040000C - 4) >> 2)
+
+    def testLocalBranchesAreResolvedByTheModule(self):
+        module = assembleObject(self.write("main.src", "loop: noop\nbeq $t0, $zero, loop\n"))
+        self.assertEqual(module["relocations"], [])
+        self.assertEqual(module["words"][1] & 0xFFFF, 0xFFFE)
+
+    def testUndefinedAndDuplicateSymbols(self):
+        _, invalidLines, _, errors = self.linkSources("j missing\njal twice\n", "twice: noop\n", "twice: noop\n")
+        self.assertEqual(invalidLines, [0, 1])
+        self.assertIn("undefined symbol 'missing'", errors[0])
+        self.assertIn("symbol 'twice' is defined in more than one module", errors[1])
+
+    def testJumpOutOfRegion(self):
+        _, invalidLines, _, errors = self.linkSources("j far\nnoop\nnoop\n", "far: noop\n", base=0x0FFFFFF4)
+        self.assertEqual(invalidLines, [0])
+        self.assertIn("leaves the 256 MB region", errors[0])
+
+    def testCachedObjectIsReused(self):
+        source = self.write("main.src", "main: j main\n")
+        cache = os.path.join(self.directory, "objects")
+        first, cached = objectFor(source, cache)
+        self.assertFalse(cached)
+        second, cached = objectFor(source, cache)
+        self.assertTrue(cached)
+        self.assertEqual(second["words"], first["words"])
+
+    def testCachedObjectOfAnotherEncoderIsAssembledAgain(self):
+        source = self.write("main.src", "main: j main\n")
+        cache = os.path.join(self.directory, "objects")
+        objectFor(source, cache)
+        path = os.path.join(cache, os.listdir(cache)[0])
+        with open(path) as file:
+            text = file.read()
+        with open(path, "w") as file:
+            file.write(text.replace('"encoder": "', '"encoder": "0'))
+        _, cached = objectFor(source, cache)
+        self.assertFalse(cached)
+
+    def testCompiledObjectsLinkLikeTheirSources(self):
+        first = self.write("first.src", "main: jal helper\nj main\n")
+        second = self.write("second.src", "helper: jr $ra\n")
+        target = os.path.join(self.directory, "linked.obj")
+        objectTarget = os.path.join(self.directory, "objects.obj")
+
+        self.assertEqual(main(["-c", first, second]), 0)
+        objects = [os.path.splitext(path)[0] + OBJECT_EXTENSION for path in (first, second)]
+        self.assertEqual(readObject(objects[0])["symbols"], {"main": 0})
+        self.assertEqual(main([first, second, "-o", target]), 0)
+        self.assertEqual(main(objects + ["-o", objectTarget]), 0)
+        with open(target) as linked, open(objectTarget) as linkedObjects:
+            self.assertEqual(linkedObjects.read(), linked.read())
+
+    def testOtherFilesAreNotObjects(self):
+        with self.assertRaises(ValueError):
+            readObject(self.write("main.o", "{}"))
+
+
+if __name__ == "__main__":
+    unittest.main()
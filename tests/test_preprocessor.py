@@ -0,0 +1,116 @@
+import os
+import tempfile
+import unittest
+
+from support import Assembler, assemble, mnemonics
+
+
+class PreprocessorTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, text):
+        '''
+        write function writes the given text into a file of the temporary directory
+
+        Returns String
+        '''
+
+        path = os.path.join(self.directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write(text)
+        return path
+
+    def assembleFile(self, text, **options):
+        '''
+        assembleFile function prepares the given source text from a file of the temporary
+        directory and converts it
+
+        Returns Assembler
+        '''
+
+        assembler = Assembler(source=self.write("main.src", text), target=os.path.join(self.directory, "main.obj"))
+        for name, value in options.items():
+            setattr(assembler, name, value)
+        assembler.prepare()
+        assembler.convertContent()
+        return assembler
+
+    def testIncludeNextToTheSource(self):
+        self.write("defs.inc", ".eqv SIZE, 8\nhelper: noop\n")
+        assembler = self.assembleFile('.include "defs.inc"\nli $t0, SIZE\n')
+        self.assertEqual(assembler.errorCount(), 0)
+        self.assertEqual(mnemonics(assembler), ["noop", "addiu"])
+        self.assertEqual(assembler.content.tokens(1)[-1], 8)
+        self.assertIn("helper", assembler.symbolTable)
+
+    def testIncludeFromDirectory(self):
+        self.write("inc/defs.inc", ".eqv SIZE, 8\n")
+        assembler = self.assembleFile('.include "defs.inc"\nli $t0, SIZE\n',
+                                      includeDirectories=[os.path.join(self.directory, "inc")])
+        self.assertEqual(assembler.errorCount(), 0)
+        self.assertEqual(assembler.content.tokens(0)[-1], 8)
+
+    def testMissingIncludeIsAnError(self):
+        assembler = self.assembleFile('.include "missing.inc"\nnoop\n')
+        self.assertGreater(assembler.errorCount(), 0)
+        self.assertIn("missing.inc", assembler.diagnostics[0].message)
+
+    def testErrorInIncludedFileKeepsItsLocation(self):
+        path = self.write("defs.inc", "noop\nfrob $t0\n")
+        assembler = self.assembleFile('.include "defs.inc"\nnoop\n')
+        self.assertEqual(assembler.errorCount(), 1)
+        self.assertEqual(assembler.diagnostics[0].file, path)
+        self.assertEqual(assembler.diagnostics[0].line, 2)
+
+    def testMacroArguments(self):
+        assembler = assemble(".macro push reg\naddiu $sp, $sp, -4\nsw \\reg, 0($sp)\n.endm\npush $t1\npush $t2\n")
+        self.assertEqual(mnemonics(assembler), ["addiu", "sw", "addiu", "sw"])
+        self.assertEqual(assembler.content.tokens(1)[1], 9)
+        self.assertEqual(assembler.content.tokens(3)[1], 10)
+
+    def testMacroExpansionNumberGivesUniqueLabels(self):
+        source = (".macro count r\nl\\@: addiu \\r, \\r, -1\nbne \\r, $zero, l\\@\n.endm\n"
+                  "count $t0\ncount $t1\n")
+        assembler = assemble(source)
+        assembler.convertContent()
+        self.assertEqual(assembler.errorCount(), 0)
+        labels = [label for label in assembler.symbolTable if label.startswith("l")]
+        self.assertEqual(len(labels), 2)
+        # each bne branches back over one instruction to its own label
+        self.assertEqual([word & 0xFFFF for word in assembler.machineWords[1::2]], [0xFFFE, 0xFFFE])
+
+    def testUnclosedMacroIsAnError(self):
+        assembler = self.assembleFile(".macro push reg\nsw \\reg, 0($sp)\n")
+        self.assertGreater(assembler.errorCount(), 0)
+
+    def testConstants(self):
+        assembler = assemble(".eqv SIZE, 8\n.eqv COPY, SIZE\nli $t0, COPY\naddiu $t1, $t1, size\n")
+        self.assertEqual(assembler.content.tokens(0)[-1], 8)
+        self.assertEqual(assembler.content.tokens(1)[-1], 8)
+
+    def testConstantsLeaveStringsAndCommentsAlone(self):
+        assembler = assemble('.eqv N, 3\nli $t0, N # N items\n.data\ntext: .asciiz "N items"\n')
+        assembler.convertContent()
+        self.assertEqual(assembler.content.tokens(0)[-1], 3)
+        self.assertEqual(bytes(assembler.dataBytes("big")), b"N items\0")
+
+    def testConditions(self):
+        source = (".eqv DEBUG, 1\n"
+                  ".ifdef DEBUG\naddu $t0, $t0, $t0\n.else\nsubu $t0, $t0, $t0\n.endif\n"
+                  ".ifndef DEBUG\nand $t0, $t0, $t0\n.endif\n"
+                  ".if 0\nor $t0, $t0, $t0\n.else\nxor $t0, $t0, $t0\n.endif\n"
+                  ".if 1\n.if 0\nnor $t0, $t0, $t0\n.endif\nslt $t0, $t0, $t0\n.endif\n")
+        self.assertEqual(mnemonics(assemble(source)), ["addu", "xor", "slt"])
+
+    def testUnclosedConditionIsAnError(self):
+        assembler = self.assembleFile(".if 1\nnoop\n")
+        self.assertGreater(assembler.errorCount(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
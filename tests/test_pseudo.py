@@ -0,0 +1,56 @@
+import unittest
+
+from support import assemble, mnemonics, register, simulate
+
+
+class PseudoInstructionTest(unittest.TestCase):
+
+    def testLoadImmediateTakesTheShortestForm(self):
+        cases = [("li $t0, -5", ["addiu"]), ("li $t0, 0xffff", ["ori"]), ("li $t0, 0x12340000", ["lui"]),
+                 ("li $t0, 0x12345678", ["lui", "ori"]), ("li $t0, -0x12345678", ["lui", "ori"])]
+        for line, expansion in cases:
+            with self.subTest(line=line):
+                self.assertEqual(mnemonics(assemble(line + "\n")), expansion)
+
+    def testLoadImmediateValues(self):
+        values = [-1, -0x8000, 0x7fff, 0x8000, 0xffff, 0x10000, 0x12340000, 0x12345678, 0xffffffff, -0x80000000]
+        source = "".join("li $t{}, {}\n".format(index, value) for index, value in enumerate(values))
+        state = simulate(assemble(source + "li $v0, 10\nsyscall\n"))
+        self.assertIsNone(state[3])
+        for index, value in enumerate(values):
+            self.assertEqual(register(state, "$t{}".format(index)) & 0xFFFFFFFF, value & 0xFFFFFFFF)
+
+    def testImmediateInstructionsWithWideImmediates(self):
+        self.assertEqual(mnemonics(assemble("addi $t0, $t1, 5\n")), ["addi"])
+        self.assertEqual(mnemonics(assemble("addi $t0, $t1, 70000\n")), ["lui", "ori", "add"])
+        self.assertEqual(mnemonics(assemble("ori $t0, $t1, 0xffff\n")), ["ori"])
+        self.assertEqual(mnemonics(assemble("ori $t0, $t1, -1\n")), ["lui", "ori", "or"])
+
+        state = simulate(assemble("li $t1, 5\naddi $t0, $t1, 70000\nxori $t2, $t1, 0x12345678\nli $v0, 10\nsyscall\n"))
+        self.assertEqual(register(state, "$t0"), 70005)
+        self.assertEqual(register(state, "$t2"), 5 ^ 0x12345678)
+
+    def testSingleWordPseudoInstructions(self):
+        source = "move $t0, $t1\nnop\nnot $t0, $t1\nneg $t0, $t1\nnegu $t0, $t1\n"
+        self.assertEqual(mnemonics(assemble(source)), ["addu", "noop", "nor", "sub", "subu"])
+
+    def testLabelsFollowTheExpandedSize(self):
+        assembler = assemble("0x00400000\nli $t0, 0x12345678\nla $t1, data\nblt $t0, $t1, end\nend: noop\n"
+                             ".data\ndata: .word 1\n")
+        self.assertEqual(mnemonics(assembler), ["lui", "ori", "lui%hi", "ori%lo", "slt", "bne", "noop"])
+        self.assertEqual(assembler.symbolTable["end"], 0x00400018)
+        self.assertEqual(assembler.symbolTable["data"], 0x0040001c)
+
+    def testBranchPseudoInstructions(self):
+        for mnemonic, taken in (("blt", (True, False, False)), ("bgt", (False, False, True)),
+                                ("ble", (True, True, False)), ("bge", (False, True, True))):
+            for value, expected in zip((1, 2, 3), taken):
+                with self.subTest(mnemonic=mnemonic, value=value):
+                    source = ("li $t0, {}\nli $t1, 2\n{} $t0, $t1, taken\nli $t2, 1\nj end\n"
+                              "taken: li $t2, 2\nend: li $v0, 10\nsyscall\n").format(value, mnemonic)
+                    state = simulate(assemble(source))
+                    self.assertEqual(register(state, "$t2"), 2 if expected else 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+from support import assemble, mnemonics, register, simulate
+
+# enough words between a branch and its label to leave the 16 bit offset
+FAR_GAP = "noop\n" * 40000
+
+
+class RelaxationTest(unittest.TestCase):
+
+    def testNearBranchKeepsOneWord(self):
+        assembler = assemble("beq $t0, $t1, done\nnoop\ndone: noop\n")
+        self.assertEqual(mnemonics(assembler), ["beq", "noop", "noop"])
+        self.assertEqual(assembler.relaxedBranches, 0)
+
+    def testFarBranchBecomesInvertedBranchOverJump(self):
+        source = "beq $t0, $t0, far\nli $t2, 1\n" + FAR_GAP + "far: li $t1, 7\nli $v0, 10\nsyscall\n"
+        assembler = assemble(source)
+        self.assertEqual(mnemonics(assembler)[:3], ["bne%skip", "j", "addiu"])
+        self.assertEqual(assembler.relaxedBranches, 1)
+
+        state = simulate(assembler)
+        self.assertIsNone(state[3])
+        self.assertEqual(register(state, "$t1"), 7)
+        self.assertEqual(register(state, "$t2"), 0)
+
+    def testFarBranchWithoutRelaxationIsReported(self):
+        source = "beq $t0, $t0, far\n" + FAR_GAP + "far: noop\n"
+        assembler = assemble(source, relaxBranches=False)
+        assembler.convertContent()
+        self.assertEqual(assembler.errorCount(), 1)
+
+    def testJumpOutOfRegionUsesRegister(self):
+        source = ("0x0ffffff0\nj next\nli $t1, 1\nli $t1, 2\nli $t1, 3\n"
+                  "next: li $t2, 5\nli $v0, 10\nsyscall\n")
+        assembler = assemble(source)
+        self.assertEqual(mnemonics(assembler)[:3], ["lui%hi", "ori%lo", "jr"])
+
+        state = simulate(assembler)
+        self.assertIsNone(state[3])
+        self.assertEqual(register(state, "$t1"), 0)
+        self.assertEqual(register(state, "$t2"), 5)
+
+    def testNearBranchAcrossRegionKeepsOneWord(self):
+        assembler = assemble("0x0ffffff0\nbeq $t0, $t0, next\nnoop\nnoop\nnoop\nnext: noop\n")
+        self.assertEqual(mnemonics(assembler)[0], "beq")
+        self.assertEqual(assembler.relaxedBranches, 0)
+
+    def testFarBranchOutOfRegionUsesRegister(self):
+        source = "0x0ffe0000\nbeq $t0, $t0, far\nli $t2, 1\n" + FAR_GAP + "far: li $t1, 7\nli $v0, 10\nsyscall\n"
+        assembler = assemble(source)
+        self.assertEqual(mnemonics(assembler)[:5], ["bne%skip", "lui%hi", "ori%lo", "jr", "addiu"])
+        self.assertEqual(assembler.relaxedBranches, 1)
+
+        state = simulate(assembler)
+        self.assertIsNone(state[3])
+        self.assertEqual(register(state, "$t1"), 7)
+        self.assertEqual(register(state, "$t2"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
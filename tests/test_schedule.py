@@ -0,0 +1,81 @@
+import random
+import unittest
+
+from support import assemble, mnemonics, simulate
+
+
+class ScheduleTest(unittest.TestCase):
+
+    REGISTERS = ("$t0", "$t1", "$t2", "$t3", "$s0", "$s1", "$at", "$ra")
+
+    def testIndependentInstructionHidesLoadUse(self):
+        assembler = assemble("lw $t0, 0($sp)\naddu $t1, $t0, $t0\naddiu $t2, $t3, 1\n", scheduleInstructions=True)
+        self.assertEqual(mnemonics(assembler), ["lw", "addiu", "addu"])
+        self.assertEqual(assembler.scheduleReport["stallsBefore"], 1)
+        self.assertEqual(assembler.scheduleReport["stallsAfter"], 0)
+
+    def testDelaySlotKeepsTheInstructionThatHidesLoadUse(self):
+        source = "main: lw $t0, 0($sp)\naddu $t1, $t0, $t0\naddiu $t2, $t3, 1\nbeq $t1, $zero, main\nnoop\n"
+        assembler = assemble(source, scheduleInstructions=True, delaySlots=True)
+        self.assertEqual(mnemonics(assembler), ["lw", "addiu", "addu", "beq", "noop"])
+        self.assertEqual(assembler.scheduleReport["delaySlots"], 0)
+        self.assertEqual(assembler.scheduleReport["stallsAfter"], 0)
+
+    def testDelaySlotTakesAnIndependentInstruction(self):
+        source = "main: addiu $t2, $t3, 1\naddu $t1, $t0, $t0\nbeq $t1, $zero, main\nnoop\n"
+        assembler = assemble(source, scheduleInstructions=True, delaySlots=True)
+        self.assertEqual(mnemonics(assembler), ["addu", "beq", "addiu"])
+        self.assertEqual(assembler.scheduleReport["delaySlots"], 1)
+
+    def program(self, generator):
+        '''
+        program function returns a random program of loads, stores, multiplications, branches and
+        arithmetic over a small data buffer
+
+        Returns String
+        '''
+
+        count = generator.randint(5, 40)
+        instructions, targets = [], set()
+        for index in range(count):
+            a, b, c = (generator.choice(self.REGISTERS) for _ in range(3))
+            target = generator.randint(index + 1, count)
+            instruction = generator.choice([
+                "lw {}, {}($s7)".format(a, 4 * generator.randint(0, 15)),
+                "sw {}, {}($s7)".format(a, 4 * generator.randint(0, 15)),
+                "lb {}, {}($s7)".format(a, generator.randint(0, 63)),
+                "mult {}, {}".format(a, b),
+                "mflo {}".format(a),
+                "beq {}, {}, l{}".format(a, b, target),
+                "jal l{}".format(target),
+                "addu {}, {}, {}".format(a, b, c),
+                "addiu {}, {}, {}".format(a, b, generator.randint(-100, 100)),
+            ])
+            if instruction.startswith(("beq", "jal")):
+                targets.add(target)
+            instructions.append(instruction)
+
+        # only the targets get a label, so the scheduler still sees long blocks
+        lines = ["main: la $s7, buf"]
+        for index, instruction in enumerate(instructions):
+            lines.append("l{}: {}".format(index, instruction) if index in targets else instruction)
+        lines.append("l{}: li $v0, 10".format(count))
+        lines.append("syscall")
+        lines.append(".data")
+        lines.append("buf: .word " + ", ".join(str(generator.randint(-9, 9)) for _ in range(16)))
+        return "\n".join(lines) + "\n"
+
+    def testScheduledProgramsGiveTheSameResults(self):
+        generator = random.Random(1)
+        moved = 0
+        for _ in range(200):
+            source = self.program(generator)
+            scheduled = assemble(source, scheduleInstructions=True)
+            moved += scheduled.scheduleReport["moved"]
+            with self.subTest(source=source):
+                self.assertEqual(simulate(assemble(source)), simulate(scheduled))
+        self.assertGreater(moved, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+
+from support import Assembler, assemble, mnemonics
+from assembler import Register
+
+
+class TokenTest(unittest.TestCase):
+
+    def setUp(self):
+        self.assembler = Assembler()
+
+    def testRegistersAreKeptApartFromImmediates(self):
+        tokens = self.assembler.tokenizeLine("addi $t0, $8, 8")
+        self.assertEqual(tokens, ["addi", 8, 8, 8])
+        self.assertEqual([type(token) for token in tokens[1:]], [Register, Register, int])
+
+    def testOffsets(self):
+        for text in ("lw $t0, -4($sp)", "lw $t0, -4 ($sp)", "lw $t0,-4( $sp )"):
+            with self.subTest(text=text):
+                self.assertEqual(self.assembler.tokenizeLine(text), ["lw", 8, [-4, 29]])
+        self.assertEqual(self.assembler.tokenizeLine("lw $t0, ($sp)"), ["lw", 8, [0, 29]])
+
+    def testImmediateInPlaceOfRegisterIsReported(self):
+        assembler = assemble("add $t0, $t1, 4\n")
+        assembler.convertContent()
+        self.assertEqual(assembler.errorCount(), 1)
+        self.assertIn("expected a register, found '4'", assembler.diagnostics[0].message)
+
+    def testLabelsAndComments(self):
+        self.assertEqual(self.assembler.tokenizeLine("Loop: jr $ra # back"), ["loop:", "jr", 31])
+        self.assertEqual(mnemonics(assemble("loop: jr $ra # back\n")), ["jr"])
+
+
+if __name__ == "__main__":
+    unittest.main()